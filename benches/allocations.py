@@ -0,0 +1,68 @@
+# MIT License
+#
+# Copyright (c) 2020 wellinthatcase
+#
+# Terms are found in the LICENSE.txt file.
+
+"""Counts the allocations the extension makes per command.
+
+Build the extension with the counting allocator, then run this against a local Redis:
+
+    maturin develop --release --cargo-extra-args="--features count-allocations"
+    python benches/allocations.py [redis://127.0.0.1:6379]
+
+Only allocations made by the extension are counted. The Python objects of each reply are allocated
+by Python itself, and are not. The keys used are prefixed by `suredis:bench:`, and deleted afterwards.
+"""
+
+import sys
+import suredis
+
+from typing import Any, Callable, List, Tuple
+
+URL = sys.argv[1] if len(sys.argv) > 1 else "redis://127.0.0.1:6379"
+CALLS = 10_000
+PREFIX = "suredis:bench:"
+
+def per_call(command: Callable[[], Any]) -> float:
+    """The mean allocations made by one call of `command`, once the client has warmed up."""
+    for _ in range(100):
+        command()
+
+    before = suredis.allocations()
+
+    for _ in range(CALLS):
+        command()
+
+    return (suredis.allocations() - before) / CALLS
+
+def main() -> None:
+    if not hasattr(suredis, "allocations"):
+        sys.exit("suredis was built without the count-allocations feature. See the docstring of this script.")
+
+    client = suredis.RedisClient(URL)
+    client.sset(PREFIX + "string", "value")
+    client.rpush(PREFIX + "list", *map(str, range(100)))
+    client.hset(PREFIX + "hash", {str(i): str(i) for i in range(100)})
+
+    commands: List[Tuple[str, Callable[[], Any]]] = [
+        ("GET", lambda: client.get(PREFIX + "string")),
+        ("SET", lambda: client.sset(PREFIX + "string", "value")),
+        ("SET NX", lambda: client.sset(PREFIX + "string", "value", nx=True)),
+        ("EXPIRE", lambda: client.expire(PREFIX + "string", 60)),
+        ("GETRANGE", lambda: client.getrange(PREFIX + "string", 0, 2)),
+        ("LINDEX", lambda: client.lindex(PREFIX + "list", 50)),
+        ("LRANGE 100", lambda: client.lrange(PREFIX + "list", 0, 99)),
+        ("HGETALL 100", lambda: client.hgetall(PREFIX + "hash")),
+    ]
+
+    try:
+        print(f"{'command':<12} allocations per call")
+
+        for name, command in commands:
+            print(f"{name:<12} {per_call(command):.2f}")
+    finally:
+        client.delete(PREFIX + "string", PREFIX + "list", PREFIX + "hash")
+
+if __name__ == "__main__":
+    main()
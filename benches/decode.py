@@ -0,0 +1,67 @@
+# MIT License
+#
+# Copyright (c) 2020 wellinthatcase
+#
+# Terms are found in the LICENSE.txt file.
+
+"""Times the direct reply decoder against the `redis::Value` path, for small and 100k-element replies.
+
+Replies of LRANGE, HGETALL and SMEMBERS are decoded straight into Python objects by a plain client.
+The copy made by its private `_without_decoders` parses them into a `redis::Value` tree before converting them,
+as every reply once was. The two share one connection pool, so the columns differ only by decoder.
+Run this against a local Redis:
+
+    maturin develop --release
+    python benches/decode.py [redis://127.0.0.1:6379]
+
+The keys used are prefixed by `suredis:bench:`, and deleted afterwards.
+"""
+
+import sys
+import timeit
+import suredis
+
+from typing import Any, Callable, List, Tuple
+
+URL = sys.argv[1] if len(sys.argv) > 1 else "redis://127.0.0.1:6379"
+PREFIX = "suredis:bench:"
+SIZES = (10, 100_000)
+
+def best_of(command: Callable[[], Any], number: int) -> float:
+    """The fastest mean time of one call of `command`, in microseconds, over five runs of `number` calls."""
+    return min(timeit.repeat(command, number=number, repeat=5)) / number * 1e6
+
+def main() -> None:
+    direct = suredis.RedisClient(URL)
+    parsed = direct._without_decoders()
+    keys = []
+
+    for size in SIZES:
+        members = [f"member:{i}" for i in range(size)]
+        keys += [f"{PREFIX}list:{size}", f"{PREFIX}hash:{size}", f"{PREFIX}set:{size}"]
+
+        direct.delete(*keys[-3:])
+        direct.rpush_iter(f"{PREFIX}list:{size}", members)
+        direct.hset_iter(f"{PREFIX}hash:{size}", {member: member for member in members})
+        direct.sadd_iter(f"{PREFIX}set:{size}", members)
+
+    try:
+        print(f"{'command':<16} {'direct (us)':>12} {'redis::Value (us)':>18} {'speedup':>8}")
+
+        for size in SIZES:
+            number = 10_000 if size < 1000 else 10
+            commands: List[Tuple[str, Callable[[Any], Any]]] = [
+                (f"LRANGE {size}", lambda client: client.lrange(f"{PREFIX}list:{size}", 0, size)),
+                (f"HGETALL {size}", lambda client: client.hgetall(f"{PREFIX}hash:{size}")),
+                (f"SMEMBERS {size}", lambda client: client.smembers(f"{PREFIX}set:{size}")),
+            ]
+
+            for name, command in commands:
+                fast = best_of(lambda: command(direct), number)
+                slow = best_of(lambda: command(parsed), number)
+                print(f"{name:<16} {fast:>12.1f} {slow:>18.1f} {slow / fast:>7.2f}x")
+    finally:
+        direct.delete(*keys)
+
+if __name__ == "__main__":
+    main()
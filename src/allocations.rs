@@ -0,0 +1,49 @@
+//! A global allocator that counts every allocation the extension makes.
+//!
+//! Only built with the `count-allocations` feature, for `benches/allocations.py`.
+//! Counts are shared by every thread, so the I/O threads of asynchronous and multiplexed clients add to them.
+use pyo3::prelude::*;
+use std::alloc::{GlobalAlloc, Layout, System};
+use std::sync::atomic::{AtomicUsize, Ordering};
+
+/// Allocations and reallocations made since the extension was loaded.
+static ALLOCATIONS: AtomicUsize = AtomicUsize::new(0);
+
+/// The system allocator, counting each allocation.
+struct Counting;
+
+unsafe impl GlobalAlloc for Counting {
+    #[inline]
+    unsafe fn alloc(&self, layout: Layout) -> *mut u8 {
+        ALLOCATIONS.fetch_add(1, Ordering::Relaxed);
+        System.alloc(layout)
+    }
+
+    #[inline]
+    unsafe fn alloc_zeroed(&self, layout: Layout) -> *mut u8 {
+        ALLOCATIONS.fetch_add(1, Ordering::Relaxed);
+        System.alloc_zeroed(layout)
+    }
+
+    #[inline]
+    unsafe fn realloc(&self, ptr: *mut u8, layout: Layout, new_size: usize) -> *mut u8 {
+        ALLOCATIONS.fetch_add(1, Ordering::Relaxed);
+        System.realloc(ptr, layout, new_size)
+    }
+
+    #[inline]
+    unsafe fn dealloc(&self, ptr: *mut u8, layout: Layout) {
+        System.dealloc(ptr, layout)
+    }
+}
+
+#[global_allocator]
+static GLOBAL: Counting = Counting;
+
+/// How many times the extension has allocated, or reallocated, memory since it was loaded.
+/// Objects allocated by Python itself, such as the `str` of a reply, are not counted.
+#[pyfunction]
+#[text_signature = "()"]
+pub fn allocations() -> usize {
+    ALLOCATIONS.load(Ordering::Relaxed)
+}
@@ -0,0 +1,211 @@
+//! Implementation of the asynchronous client.
+//!
+//! Commands are packed on the event loop, then handed to a single I/O thread per client.
+//! The thread writes the commands waiting for it in one batch, reads the replies in order,
+//! and resolves each future on its event loop with `call_soon_threadsafe`.
+//! Copies made by `with_timeout`, `raw` and `noreply` share the thread of the client they were made from.
+use crate::*;
+use crate::connection::Timeouts;
+use crate::pipeline::Converter;
+use pyo3::wrap_pyfunction;
+use std::sync::mpsc::{self, Receiver, Sender};
+use std::thread;
+
+/// The most commands the I/O thread writes in a single batch.
+const MAX_BATCH: usize = 1024;
+
+/// A command waiting to be sent by the I/O thread.
+struct Job {
+    packed: Vec<u8>,                   // The command, already packed into the Redis protocol.
+    converter: Converter,              // Converts the reply into the type its method would return.
+    timeouts: Option<Timeouts>,        // The timeouts of the client that sent the command, if overridden.
+    noreply: bool,                     // Whether the command is preceded by `pool::REPLY_SKIP`, so has no reply.
+    future: PyObject,                  // The `asyncio.Future` awaiting the reply.
+    event_loop: PyObject,              // The event loop that owns the future.
+}
+
+impl Job {
+    /// Jobs are only written in the same batch when they agree on how they are sent.
+    #[inline]
+    fn sent_as(&self) -> (Option<Timeouts>, bool) {
+        (self.timeouts, self.noreply)
+    }
+}
+
+/// Hands commands from the event loop to the I/O thread of a client.
+pub struct Dispatcher {
+    jobs: Mutex<Sender<Job>>,          // Feeds the I/O thread. It exits once this is dropped.
+    get_running_loop: PyObject,        // `asyncio.get_running_loop`, looked up once.
+}
+
+impl Dispatcher {
+    fn new(py: Python, pool: Arc<pool::Pool>) -> PyResult<Self> {
+        let (jobs, receiver) = mpsc::channel();
+        let get_running_loop = py.import("asyncio")?.get("get_running_loop")?.to_object(py);
+        let resolve = wrap_pyfunction!(resolve)(py);
+
+        let spawned = thread::Builder::new()
+            .name("suredis-io".to_string())
+            .spawn(move || run(receiver, pool, resolve));
+
+        match spawned {
+            Ok(_) => Ok(Self { jobs: Mutex::new(jobs), get_running_loop }),
+            Err(e) => exceptions::IOError::into(e.to_string())
+        }
+    }
+
+    /// Queue a packed command for the I/O thread. Must be called with an event loop running.
+    ///
+    /// # Arguments
+    /// * `timeouts` - The timeouts of the client sending the command, if overridden.
+    /// * `noreply` - Whether the command is preceded by `pool::REPLY_SKIP`. Its future resolves to None once written.
+    ///
+    /// # Returns
+    /// An `asyncio.Future` of the converted reply.
+    pub fn submit(
+        &self, py: Python, packed: Vec<u8>, converter: Converter, timeouts: Option<Timeouts>, noreply: bool
+    ) -> PyResult<PyObject> {
+        let event_loop = self.get_running_loop.call0(py)?;
+        let future = event_loop.call_method0(py, "create_future")?;
+
+        let job = Job { packed, converter, timeouts, noreply, future: future.clone_ref(py), event_loop };
+
+        match self.jobs.lock().unwrap().send(job) {
+            Ok(_) => Ok(future),
+            Err(_) => exceptions::IOError::into("the I/O thread of this client has stopped")
+        }
+    }
+}
+
+/// Settle a future from its own event loop, unless it was cancelled in the meantime.
+#[pyfunction]
+fn resolve(future: &PyAny, value: PyObject, failed: bool) -> PyResult<()> {
+    if future.call_method0("done")?.is_true()? {
+        return Ok(());
+    }
+
+    future.call_method1(if failed { "set_exception" } else { "set_result" }, (value,))?;
+    Ok(())
+}
+
+/// The body of the I/O thread. Runs until the dispatcher is dropped.
+fn run(jobs: Receiver<Job>, pool: Arc<pool::Pool>, resolve: PyObject) {
+    let mut carried = None;
+
+    loop {
+        let first = match carried.take() {
+            Some(job) => job,
+            None => match jobs.recv() {
+                Ok(job) => job,
+                Err(_) => break
+            }
+        };
+
+        let (timeouts, noreply) = first.sent_as();
+        let mut batch = vec![first];
+
+        // A job sent differently starts the next batch.
+        while batch.len() < MAX_BATCH {
+            match jobs.try_recv() {
+                Ok(job) if job.sent_as() == (timeouts, noreply) => batch.push(job),
+                Ok(job) => {
+                    carried = Some(job);
+                    break;
+                },
+                Err(_) => break
+            }
+        }
+
+        let mut packed = Vec::with_capacity(batch.iter().map(|job| job.packed.len()).sum());
+
+        for job in &batch {
+            packed.extend_from_slice(&job.packed);
+        }
+
+        let replies: Vec<RedisResult<Option<Value>>> = if noreply {
+            match pool.send_only(&packed, timeouts) {
+                Ok(_) => batch.iter().map(|_| Ok(None)).collect(),
+                Err(e) => batch.iter().map(|_| Err(pool::replicate(&e))).collect()
+            }
+        } else {
+            pool.send_batch(&packed, batch.len(), timeouts).into_iter().map(|reply| reply.map(Some)).collect()
+        };
+
+        let gil = Python::acquire_gil();
+        let py = gil.python();
+
+        for (job, reply) in batch.into_iter().zip(replies.into_iter()) {
+            let outcome = match reply {
+                Ok(Some(v)) => (job.converter)(py, v),
+                Ok(None) => Ok(py.None()),
+                Err(v) => redis_error(v)
+            };
+
+            let (value, failed) = match outcome {
+                Ok(v) => (v, false),
+                Err(e) => (e.to_object(py), true)
+            };
+
+            // Fails only once the event loop is closed, when nobody is left to await the future.
+            let _ = job.event_loop.call_method1(py, "call_soon_threadsafe", (resolve.clone_ref(py), job.future, value, failed));
+        }
+    }
+}
+
+/// The asynchronous client for suredis. Every method of `RedisClient` returns an awaitable instead.
+///
+/// Arguments
+/// =========
+/// `url` - The URL of the Redis server.
+/// `pool_size` - The most connections the client may open at once. Defaults to 1.
+/// `lazy` - Whether to wait for the first command before connecting. Defaults to False.
+/// `retries` - How many times to retry a connection that could not be made, or a command the socket refused
+/// before any of it was written. Commands are never sent twice. Defaults to 3.
+/// `nodelay`, `keepalive`, `send_buffer_size`, `recv_buffer_size` - Tune the sockets. See `RedisClient`.
+/// `connect_timeout`, `read_timeout`, `write_timeout` - Bound the time spent on the sockets. See `RedisClient`.
+/// `decode_responses` - Whether Redis strings are returned as `str` rather than `bytes`. Defaults to True.
+///
+/// Example
+/// =======
+/// ```python
+/// client = AsyncRedisClient("url")
+///
+/// async def main():
+///     await client.sset("key", "value")
+///     await client.get("key") == "value"
+/// ```
+///
+/// Note
+/// ====
+/// 1. Commands awaited at the same time are written to Redis in a single batch.
+/// 2. Pipelines cannot be created from this client, as their `execute` would block the event loop.
+/// 3. Commands must be sent from a coroutine, or a callback, running on an event loop.
+#[pyclass(extends=RedisClient)]
+pub struct AsyncRedisClient {}
+
+#[pymethods]
+impl AsyncRedisClient {
+    #[new]
+    #[args(
+        pool_size="1", lazy="false", retries="3",
+        nodelay="true", keepalive="None", send_buffer_size="None", recv_buffer_size="None",
+        connect_timeout="None", read_timeout="None", write_timeout="None", decode_responses="true"
+    )]
+    fn __new__(
+        url: &str, pool_size: usize, lazy: bool, retries: usize,
+        nodelay: bool, keepalive: Option<f64>, send_buffer_size: Option<usize>, recv_buffer_size: Option<usize>,
+        connect_timeout: Option<f64>, read_timeout: Option<f64>, write_timeout: Option<f64>, decode_responses: bool
+    ) -> PyResult<PyClassInitializer<Self>> {
+        let gil = Python::acquire_gil();
+        let socket = connection::Settings::new(
+            nodelay, keepalive, send_buffer_size, recv_buffer_size,
+            connect_timeout, read_timeout, write_timeout
+        )?;
+        let options = Options { pool_size, multiplexed: false, lazy, retries, socket, decode: decode_responses };
+        let mut base = RedisClient::open(url, options)?;
+
+        base.dispatcher = Some(Arc::new(Dispatcher::new(gil.python(), Arc::clone(&base.pool))?));
+
+        Ok(PyClassInitializer::from(base).add_subclass(Self {}))
+    }
+}
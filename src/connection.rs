@@ -0,0 +1,374 @@
+//! Implementation of the connections held by the pool.
+//!
+//! Connections are made over TCP or, for servers on the same host, over a unix domain socket.
+//! Making them here rather than through `redis::Client` gives control over the socket itself.
+use crate::*;
+use socket2::Socket;
+use std::io::{self, BufReader, Read, Write};
+use std::net::{TcpStream, ToSocketAddrs};
+use std::time::Duration;
+
+#[cfg(unix)]
+use std::os::unix::net::UnixStream;
+
+/// How the socket of every connection is tuned. Gathered from the keyword arguments of the constructors.
+pub struct Settings {
+    pub nodelay: bool,                       // Whether to disable Nagle's algorithm on TCP sockets.
+    pub keepalive: Option<Duration>,         // The idle time before TCP keepalive probes are sent, if any.
+    pub send_buffer_size: Option<usize>,     // The size of the kernel's send buffer, if not the default.
+    pub recv_buffer_size: Option<usize>,     // The size of the kernel's receive buffer, if not the default.
+    pub connect_timeout: Option<Duration>,   // How long to wait for each attempt to connect, if bounded.
+    pub timeouts: Timeouts,                  // How long commands wait on the socket, unless overridden.
+}
+
+impl Settings {
+    /// Validate the socket options passed to a constructor. Durations are in seconds.
+    pub fn new(
+        nodelay: bool, keepalive: Option<f64>, send_buffer_size: Option<usize>, recv_buffer_size: Option<usize>,
+        connect_timeout: Option<f64>, read_timeout: Option<f64>, write_timeout: Option<f64>
+    ) -> PyResult<Self> {
+        Ok(Self {
+            nodelay,
+            keepalive: duration("keepalive", keepalive)?,
+            send_buffer_size,
+            recv_buffer_size,
+            connect_timeout: duration("connect_timeout", connect_timeout)?,
+            timeouts: Timeouts {
+                read: duration("read_timeout", read_timeout)?,
+                write: duration("write_timeout", write_timeout)?
+            }
+        })
+    }
+}
+
+/// How long a command may wait on the socket. None waits forever.
+#[derive(Clone, Copy, PartialEq)]
+pub struct Timeouts {
+    pub read: Option<Duration>,              // How long to wait for a reply.
+    pub write: Option<Duration>,             // How long to wait for the socket to accept a command.
+}
+
+impl Timeouts {
+    /// How long a command may wait for a pooled connection to be returned.
+    /// The write timeout bounds it, or the read timeout when only that is set.
+    #[inline]
+    pub fn checkout(&self) -> Option<Duration> {
+        self.write.or(self.read)
+    }
+}
+
+/// Convert a number of seconds passed from Python into a duration.
+///
+/// # Arguments
+/// * `name` - The name of the argument, for the error message.
+/// * `seconds` - The number of seconds, if any.
+pub fn duration(name: &str, seconds: Option<f64>) -> PyResult<Option<Duration>> {
+    match seconds {
+        Some(v) if !(v > 0.0 && v.is_finite()) => {
+            exceptions::ValueError::into(format!("{} must be a positive number of seconds", name))
+        },
+        Some(v) => Ok(Some(Duration::from_secs_f64(v))),
+        None => Ok(None)
+    }
+}
+
+/// The socket under a connection.
+enum Stream {
+    Tcp(TcpStream),
+    #[cfg(unix)]
+    Unix(UnixStream),
+}
+
+impl Read for Stream {
+    /// Reaching the end of the stream fails as a reset connection, rather than as a reply cut short.
+    /// The command may already have run, so the pool surfaces the error rather than sending it again.
+    #[inline]
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        let read = match self {
+            Stream::Tcp(stream) => stream.read(buf)?,
+            #[cfg(unix)]
+            Stream::Unix(stream) => stream.read(buf)?
+        };
+
+        if read == 0 && !buf.is_empty() {
+            return Err(io::Error::new(io::ErrorKind::ConnectionReset, "the server closed the connection"));
+        }
+
+        Ok(read)
+    }
+}
+
+impl Write for Stream {
+    #[inline]
+    fn write(&mut self, buf: &[u8]) -> io::Result<usize> {
+        match self {
+            Stream::Tcp(stream) => stream.write(buf),
+            #[cfg(unix)]
+            Stream::Unix(stream) => stream.write(buf)
+        }
+    }
+
+    #[inline]
+    fn flush(&mut self) -> io::Result<()> {
+        match self {
+            Stream::Tcp(stream) => stream.flush(),
+            #[cfg(unix)]
+            Stream::Unix(stream) => stream.flush()
+        }
+    }
+}
+
+/// A connection to Redis.
+pub struct Connection {
+    reader: BufReader<Stream>,         // The socket, buffered for reading replies.
+    parser: Parser,                    // Parses replies out of the socket.
+    open: bool,                        // Cleared once the socket fails, so the pool discards the connection.
+    timeouts: Timeouts,                // The timeouts the socket currently has.
+}
+
+impl Connection {
+    /// Connect, tune the socket, then authenticate and select the database of `info`.
+    pub fn connect(info: &ConnectionInfo, settings: &Settings) -> RedisResult<Self> {
+        let stream = match *info.addr {
+            ConnectionAddr::Tcp(ref host, port) => Stream::Tcp(connect_tcp(host, port, settings)?),
+            #[cfg(unix)]
+            ConnectionAddr::Unix(ref path) => Stream::Unix(UnixStream::connect(path)?),
+            #[allow(unreachable_patterns)]
+            _ => return Err(RedisError::from((ErrorKind::InvalidClientConfig, "this kind of address is not supported")))
+        };
+
+        let mut connection = Self {
+            reader: BufReader::new(stream),
+            parser: Parser::new(),
+            open: true,
+            timeouts: Timeouts { read: None, write: None }
+        };
+
+        // The handshake is bounded by the connect timeout, if any.
+        connection.set_timeouts(Timeouts { read: settings.connect_timeout, write: settings.connect_timeout })?;
+
+        if let Some(ref password) = info.passwd {
+            connection.handshake("AUTH", password.as_str())?;
+        }
+
+        if info.db != 0 {
+            connection.handshake("SELECT", &info.db)?;
+        }
+
+        Ok(connection)
+    }
+
+    /// Send a command that sets the connection up. Error replies fail the connection.
+    fn handshake<Args: resp::Arguments + ?Sized>(&mut self, cmd: &str, args: &Args) -> RedisResult<()> {
+        let mut packed = Vec::new();
+
+        if resp::pack(&mut packed, cmd, args).is_err() {
+            return Err(RedisError::from((ErrorKind::InvalidClientConfig, "could not pack the handshake")));
+        }
+
+        self.req_packed_command(&packed).map(drop)
+    }
+
+    /// Write packed commands without reading their replies.
+    pub fn send_packed_command(&mut self, packed: &[u8]) -> RedisResult<()> {
+        self.write_packed(packed).map_err(|(e, _)| e)
+    }
+
+    /// Write packed commands without reading their replies, counting the bytes the socket accepted.
+    ///
+    /// # Returns
+    /// On failure, the error and how many bytes of `packed` were written before it.
+    /// When none were, Redis cannot have run any of the commands.
+    pub fn write_packed(&mut self, packed: &[u8]) -> Result<(), (RedisError, usize)> {
+        let mut written = 0;
+
+        let result = loop {
+            if written == packed.len() {
+                break Ok(());
+            }
+
+            match self.reader.get_mut().write(&packed[written..]) {
+                Ok(0) => break Err(io::Error::from(io::ErrorKind::WriteZero)),
+                Ok(n) => written += n,
+                Err(ref e) if e.kind() == io::ErrorKind::Interrupted => (),
+                Err(e) => break Err(e)
+            }
+        };
+
+        self.check(result.map_err(RedisError::from)).map_err(|e| (e, written))
+    }
+
+    /// Read the next reply. Error replies are returned as errors.
+    pub fn recv_response(&mut self) -> RedisResult<Value> {
+        let result = self.parser.parse_value(&mut self.reader);
+        self.check(result)
+    }
+
+    /// Read the bytes of the next reply, for a `decode::Decoder`. Error replies are returned as errors.
+    ///
+    /// Replies are read whole by both this and `recv_response`, so the two never split a reply between them.
+    pub fn recv_frame(&mut self) -> RedisResult<Vec<u8>> {
+        let mut frame = Vec::new();
+        let result = decode::read_frame(&mut self.reader, &mut frame);
+
+        self.check(result)?;
+
+        if frame.first() == Some(&b'-') {
+            Parser::new().parse_value(&frame[..])?;
+        }
+
+        Ok(frame)
+    }
+
+    /// Send one packed command and read its reply.
+    pub fn req_packed_command(&mut self, packed: &[u8]) -> RedisResult<Value> {
+        self.send_packed_command(packed)?;
+        self.recv_response()
+    }
+
+    /// Send one packed command and read the bytes of its reply.
+    pub fn req_packed_frame(&mut self, packed: &[u8]) -> RedisResult<Vec<u8>> {
+        self.send_packed_command(packed)?;
+        self.recv_frame()
+    }
+
+    /// Change how long commands may wait on the socket. Does nothing if they are unchanged.
+    pub fn set_timeouts(&mut self, timeouts: Timeouts) -> RedisResult<()> {
+        if timeouts == self.timeouts {
+            return Ok(());
+        }
+
+        let result = match self.reader.get_ref() {
+            Stream::Tcp(stream) => stream.set_read_timeout(timeouts.read).and(stream.set_write_timeout(timeouts.write)),
+            #[cfg(unix)]
+            Stream::Unix(stream) => stream.set_read_timeout(timeouts.read).and(stream.set_write_timeout(timeouts.write))
+        };
+
+        result?;
+        self.timeouts = timeouts;
+        Ok(())
+    }
+
+    /// Whether the connection can still be used.
+    #[inline]
+    pub fn is_open(&self) -> bool {
+        self.open
+    }
+
+    /// Whether the connection is still usable, checked without a round trip. Used when it is checked out.
+    ///
+    /// The socket is read without blocking. If the server closed the connection while it sat idle, the read finds
+    /// the end of the stream. If it is alive, nothing is waiting to be read. Any bytes that are, such as a reply
+    /// left unread, mean the connection is out of step, so it cannot be used either.
+    pub fn is_alive(&mut self) -> bool {
+        if !self.open || !self.reader.buffer().is_empty() {
+            return false;
+        }
+
+        let mut byte = [0u8; 1];
+        let result = match self.reader.get_mut() {
+            // Blocking is restored whatever the read finds, since a live connection finds nothing.
+            Stream::Tcp(stream) => stream.set_nonblocking(true).and_then(|_| {
+                let read = stream.peek(&mut byte);
+                stream.set_nonblocking(false).and(read)
+            }),
+            #[cfg(unix)]
+            Stream::Unix(stream) => stream.set_nonblocking(true).and_then(|_| {
+                let read = stream.read(&mut byte);
+                stream.set_nonblocking(false).and(read)
+            })
+        };
+
+        let alive = match result {
+            Err(ref e) => e.kind() == io::ErrorKind::WouldBlock,
+            Ok(_) => false
+        };
+
+        if !alive {
+            self.open = false;
+        }
+
+        alive
+    }
+
+    /// Mark the connection closed if `result` shows the socket failed or timed out.
+    /// Replies may be left half read, so the connection cannot be trusted afterwards.
+    #[inline]
+    fn check<T>(&mut self, result: RedisResult<T>) -> RedisResult<T> {
+        if let Err(ref e) = result {
+            if e.kind() == ErrorKind::IoError || e.is_connection_dropped() {
+                self.open = false;
+            }
+        }
+
+        result
+    }
+}
+
+/// Connect to a TCP address, then tune the socket.
+/// Every address the host resolves to is tried in turn, each bounded by the connect timeout.
+fn connect_tcp(host: &str, port: u16, settings: &Settings) -> io::Result<TcpStream> {
+    let stream = match settings.connect_timeout {
+        None => TcpStream::connect((host, port))?,
+        Some(timeout) => {
+            let mut last = io::Error::new(io::ErrorKind::NotFound, "the host did not resolve to any address");
+            let mut connected = None;
+
+            for address in (host, port).to_socket_addrs()? {
+                match TcpStream::connect_timeout(&address, timeout) {
+                    Ok(stream) => {
+                        connected = Some(stream);
+                        break;
+                    },
+                    Err(e) => last = e
+                }
+            }
+
+            connected.ok_or(last)?
+        }
+    };
+
+    let socket = Socket::from(stream);
+
+    socket.set_nodelay(settings.nodelay)?;
+    socket.set_keepalive(settings.keepalive)?;
+
+    if let Some(size) = settings.send_buffer_size {
+        socket.set_send_buffer_size(size)?;
+    }
+
+    if let Some(size) = settings.recv_buffer_size {
+        socket.set_recv_buffer_size(size)?;
+    }
+
+    Ok(socket.into_tcp_stream())
+}
+
+#[pymethods]
+impl RedisClient {
+    /// A copy of this client whose commands wait at most `timeout` seconds on the socket.
+    /// The copy shares this client's connection pool, so it is cheap to create for a single call.
+    ///
+    /// Arguments
+    /// =========
+    /// `timeout` - Seconds each command may wait for a pooled connection and to be written, then again to be answered.
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url", read_timeout=1.0)
+    /// client.with_timeout(0.05).get("key")  # Raises suredis.TimeoutError after 50ms.
+    /// ```
+    ///
+    /// Returns
+    /// =======
+    /// A client of the same kind, an `AsyncRedisClient` when created from one.
+    #[text_signature = "($self, timeout)"]
+    pub fn with_timeout(&self, timeout: f64) -> PyResult<PyObject> {
+        let gil = Python::acquire_gil();
+        let timeout = duration("timeout", Some(timeout))?;
+        let client = Self { timeouts: Some(Timeouts { read: timeout, write: timeout }), ..self.fork() };
+
+        Self::wrap_fork(gil.python(), client)
+    }
+}
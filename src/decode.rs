@@ -0,0 +1,478 @@
+//! Decoding of replies straight into Python objects.
+//!
+//! Replies of the types with a direct path are never parsed into a `redis::Value` tree.
+//! The bytes of the reply are read off the socket while the GIL is released, then decoded under the GIL,
+//! building each `str`, `bytes`, `int` and `list` in place from the bytes it spans.
+use crate::*;
+use pyo3::{ffi, AsPyPointer};
+use std::io::{self, BufRead};
+use std::os::raw::c_char;
+
+/// Decodes the bytes of one reply into its Python object. Redis strings become `str` when `decode` is set.
+/// The bytes are passed by value, so a decoder may keep them. Ex, `reply::Lazy`.
+pub type Decoder = for<'p> fn(Python<'p>, Vec<u8>, bool) -> PyResult<PyObject>;
+
+/// Read the bytes of one complete reply from `reader` into `out`.
+///
+/// Nested arrays are followed by counting the replies still expected, so only the bytes themselves are kept.
+/// Headers are validated here, so decoding the reply afterwards cannot run past its end.
+pub fn read_frame<R: BufRead>(reader: &mut R, out: &mut Vec<u8>) -> RedisResult<()> {
+    let mut pending = 1usize;
+
+    while pending > 0 {
+        let start = out.len();
+
+        // A line cut short by the end of the stream is as much a closed connection as no line at all.
+        if reader.read_until(b'\n', out)? == 0 || out.last() != Some(&b'\n') {
+            return Err(RedisError::from(io::Error::new(io::ErrorKind::ConnectionReset, "the server closed the connection")));
+        }
+
+        pending -= 1;
+
+        let line = &out[start..];
+
+        if line.len() < 3 || line[line.len() - 2] != b'\r' {
+            return Err(invalid());
+        }
+
+        let kind = line[0];
+        let length = match kind {
+            b'+' | b'-' | b':' => continue,
+            b'$' | b'*' => parse_int(&line[1..line.len() - 2]).ok_or_else(invalid)?,
+            _ => return Err(invalid())
+        };
+
+        if length < 0 {
+            continue;
+        }
+
+        if kind == b'*' {
+            pending += length as usize;
+        } else {
+            // The data and its trailing CRLF.
+            let at = out.len();
+            out.resize(at + length as usize + 2, 0);
+            reader.read_exact(&mut out[at..])?;
+
+            if &out[out.len() - 2..] != b"\r\n" {
+                return Err(invalid());
+            }
+        }
+    }
+
+    Ok(())
+}
+
+/// Decodes an array reply into a `list`. Nil, as replied for a missing key, becomes an empty one.
+pub fn list(py: Python, frame: Vec<u8>, decode: bool) -> PyResult<PyObject> {
+    let mut cursor = Cursor { frame: &frame, pos: 0 };
+
+    match cursor.array()? {
+        Some(length) => cursor.list(py, length, decode),
+        None => Ok(PyList::empty(py).into_py(py))
+    }
+}
+
+/// Decodes an array reply of alternating fields and values into a `dict`. Ex, HGETALL.
+pub fn dict(py: Python, frame: Vec<u8>, decode: bool) -> PyResult<PyObject> {
+    let mut cursor = Cursor { frame: &frame, pos: 0 };
+    let dict = PyDict::new(py);
+
+    for _ in 0..cursor.array()?.unwrap_or(0) / 2 {
+        let field = cursor.value(py, decode)?;
+        let value = cursor.value(py, decode)?;
+
+        dict.set_item(field, value)?;
+    }
+
+    Ok(dict.into_py(py))
+}
+
+/// Decodes an array reply of distinct members into a `set`. Ex, SMEMBERS.
+pub fn set(py: Python, frame: Vec<u8>, decode: bool) -> PyResult<PyObject> {
+    let mut cursor = Cursor { frame: &frame, pos: 0 };
+    let set = PySet::empty(py)?;
+
+    for _ in 0..cursor.array()?.unwrap_or(0) {
+        set.add(cursor.value(py, decode)?)?;
+    }
+
+    Ok(set.into_py(py))
+}
+
+/// Decodes an array reply of numbers straight into a vector of `T`, allocated once at its full size.
+/// Bulk strings are parsed in place, and nil elements, or any other kind of reply, become `T::MISSING`.
+pub fn numbers<T: reply::Element>(frame: &[u8]) -> PyResult<Vec<T>> {
+    let mut cursor = Cursor { frame, pos: 0 };
+    let count = cursor.array()?.unwrap_or(0);
+    let mut parsed = Vec::with_capacity(count);
+
+    for _ in 0..count {
+        let start = cursor.pos;
+
+        parsed.push(match cursor.header()? {
+            (b'$', line) => match length(line)? {
+                Some(length) => {
+                    let data = &frame[cursor.pos..cursor.pos + length];
+                    cursor.pos += length + 2;
+
+                    match T::parse(data) {
+                        Some(n) => n,
+                        None => return exceptions::ValueError::into(format!("an element is not a valid {}", T::DTYPE))
+                    }
+                },
+                None => T::MISSING
+            },
+            (b':', line) => match parse_int(line) {
+                Some(n) => T::from_int(n),
+                None => return exceptions::ValueError::into("the server replied with an invalid integer")
+            },
+            (b'-', _) => return cursor.error(start),
+            _ => {
+                cursor.pos = start;
+                cursor.skip()?;
+                T::MISSING
+            }
+        });
+    }
+
+    Ok(parsed)
+}
+
+/// Where each element of an array reply starts in its frame, for decoding the elements one at a time.
+/// Empty when the reply is nil.
+pub fn offsets(frame: &[u8]) -> PyResult<Vec<usize>> {
+    let mut cursor = Cursor { frame, pos: 0 };
+    let length = cursor.array()?.unwrap_or(0);
+    let mut offsets = Vec::with_capacity(length);
+
+    for _ in 0..length {
+        offsets.push(cursor.pos);
+        cursor.skip()?;
+    }
+
+    Ok(offsets)
+}
+
+/// Decodes the reply starting at `offset` of a frame, as found by `offsets`.
+#[inline]
+pub fn value_at(py: Python, frame: &[u8], offset: usize, decode: bool) -> PyResult<PyObject> {
+    Cursor { frame, pos: offset }.value(py, decode)
+}
+
+/// The bytes of a reply that was already parsed, such as one read by a pipeline.
+pub fn frame(reply: &Value) -> Vec<u8> {
+    let mut out = Vec::new();
+    write_value(&mut out, reply);
+    out
+}
+
+fn write_value(out: &mut Vec<u8>, reply: &Value) {
+    match reply {
+        Value::Nil => out.extend_from_slice(b"$-1\r\n"),
+        Value::Int(n) => {
+            out.push(b':');
+            out.extend_from_slice(itoa::Buffer::new().format(*n).as_bytes());
+            out.extend_from_slice(b"\r\n");
+        },
+        Value::Data(data) => resp::write_bulk(out, data),
+        Value::Bulk(replies) => {
+            out.push(b'*');
+            out.extend_from_slice(itoa::Buffer::new().format(replies.len()).as_bytes());
+            out.extend_from_slice(b"\r\n");
+
+            for reply in replies {
+                write_value(out, reply);
+            }
+        },
+        Value::Status(status) => {
+            out.push(b'+');
+            out.extend_from_slice(status.as_bytes());
+            out.extend_from_slice(b"\r\n");
+        },
+        Value::Okay => out.extend_from_slice(b"+OK\r\n")
+    }
+}
+
+#[pymethods]
+impl RedisClient {
+    /// A copy of this client that parses every reply into `redis::Value` before converting it, skipping the decoders here.
+    /// Only meant for `benches/decode.py`, to time the decoders against the path they replace on the same client.
+    #[text_signature = "($self)"]
+    pub fn _without_decoders(&self) -> PyResult<PyObject> {
+        let gil = Python::acquire_gil();
+        Self::wrap_fork(gil.python(), Self { decoders: false, ..self.fork() })
+    }
+}
+
+/// Reads replies out of a frame filled by `read_frame`.
+struct Cursor<'a> {
+    frame: &'a [u8],                   // The bytes of the whole reply.
+    pos: usize,                        // Where the next reply starts.
+}
+
+impl<'a> Cursor<'a> {
+    /// The kind of the next reply and the rest of its header line, without the CRLF.
+    #[inline]
+    fn header(&mut self) -> PyResult<(u8, &'a [u8])> {
+        let frame = self.frame;
+        let rest = &frame[self.pos..];
+
+        match rest.iter().position(|&b| b == b'\n') {
+            Some(end) if end >= 2 => {
+                self.pos += end + 1;
+                Ok((rest[0], &rest[1..end - 1]))
+            },
+            _ => exceptions::ValueError::into("the reply ended early")
+        }
+    }
+
+    /// The length of the next reply, which must be an array. None when it is nil.
+    fn array(&mut self) -> PyResult<Option<usize>> {
+        let start = self.pos;
+
+        match self.header()? {
+            (b'*', line) => Ok(length(line)?),
+            (b'-', _) => self.error(start),
+            _ => exceptions::TypeError::into("expected an array reply")
+        }
+    }
+
+    /// Move past the next reply, nested replies included, without decoding it.
+    fn skip(&mut self) -> PyResult<()> {
+        let mut pending = 1usize;
+
+        while pending > 0 {
+            pending -= 1;
+
+            match self.header()? {
+                (b'$', line) => self.pos += length(line)?.map_or(0, |length| length + 2),
+                (b'*', line) => pending += length(line)?.unwrap_or(0),
+                _ => ()
+            }
+        }
+
+        Ok(())
+    }
+
+    /// Decodes the next reply. Arrays become lists, nil becomes None, and status replies become `str`.
+    fn value(&mut self, py: Python, decode: bool) -> PyResult<PyObject> {
+        let start = self.pos;
+        let (kind, line) = self.header()?;
+
+        match kind {
+            b'$' => match length(line)? {
+                Some(length) => {
+                    let frame = self.frame;
+                    let data = &frame[self.pos..self.pos + length];
+                    self.pos += length + 2;
+                    string(py, data, decode)
+                },
+                None => Ok(py.None())
+            },
+            b'*' => match length(line)? {
+                Some(length) => self.list(py, length, decode),
+                None => Ok(py.None())
+            },
+            b':' => match parse_int(line) {
+                Some(n) => Ok(n.into_py(py)),
+                None => exceptions::ValueError::into("the server replied with an invalid integer")
+            },
+            b'+' => string(py, line, true),
+            b'-' => self.error(start),
+            _ => exceptions::ValueError::into("the server replied with an unknown kind of reply")
+        }
+    }
+
+    /// The next `length` replies, in a list allocated once at its full size.
+    fn list(&mut self, py: Python, length: usize, decode: bool) -> PyResult<PyObject> {
+        let list = unsafe { PyObject::from_owned_ptr_or_err(py, ffi::PyList_New(length as ffi::Py_ssize_t))? };
+
+        for index in 0..length {
+            let element = self.value(py, decode)?;
+
+            // Steals the reference. Slots left empty by an error are skipped when the list is freed.
+            unsafe { ffi::PyList_SetItem(list.as_ptr(), index as ffi::Py_ssize_t, element.into_ptr()) };
+        }
+
+        Ok(list)
+    }
+
+    /// Raise the error reply starting at `start`, mapped as any other error replied by Redis.
+    #[cold]
+    fn error<T>(&mut self, start: usize) -> PyResult<T> {
+        match Parser::new().parse_value(&self.frame[start..self.pos]) {
+            Err(e) => redis_error(e),
+            Ok(_) => exceptions::ValueError::into("the server replied with an invalid error")
+        }
+    }
+}
+
+/// A Redis string, as `str` when `decode` is set, otherwise as `bytes`.
+#[inline]
+fn string(py: Python, data: &[u8], decode: bool) -> PyResult<PyObject> {
+    if !decode {
+        return Ok(PyBytes::new(py, data).into_py(py));
+    }
+
+    unsafe {
+        PyObject::from_owned_ptr_or_err(py, ffi::PyUnicode_DecodeUTF8(
+            data.as_ptr() as *const c_char,
+            data.len() as ffi::Py_ssize_t,
+            b"strict\0".as_ptr() as *const c_char
+        ))
+    }
+}
+
+/// The length in the header of a bulk string or an array. None when it is nil.
+#[inline]
+fn length(line: &[u8]) -> PyResult<Option<usize>> {
+    match parse_int(line) {
+        Some(n) if n < 0 => Ok(None),
+        Some(n) => Ok(Some(n as usize)),
+        None => exceptions::ValueError::into("the server replied with an invalid length")
+    }
+}
+
+#[inline]
+fn parse_int(digits: &[u8]) -> Option<i64> {
+    std::str::from_utf8(digits).ok()?.parse().ok()
+}
+
+#[cold]
+fn invalid() -> RedisError {
+    RedisError::from((ErrorKind::ResponseError, "the server replied with invalid data"))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// Read one frame from `input`, returning it along with the bytes left unread.
+    fn read(input: &[u8]) -> RedisResult<(Vec<u8>, Vec<u8>)> {
+        let mut reader = input;
+        let mut frame = Vec::new();
+
+        read_frame(&mut reader, &mut frame)?;
+        Ok((frame, reader.to_vec()))
+    }
+
+    /// Errors raised by the decoders are Python exceptions, so the interpreter must be running.
+    fn with_gil<T>(f: impl FnOnce() -> T) -> T {
+        pyo3::prepare_freethreaded_python();
+        let _gil = Python::acquire_gil();
+        f()
+    }
+
+    #[test]
+    fn reads_simple_replies() {
+        for reply in &[&b"+OK\r\n"[..], b":-42\r\n", b"$5\r\nhello\r\n", b"$0\r\n\r\n", b"$-1\r\n", b"-ERR no such key\r\n"] {
+            assert_eq!(read(reply).unwrap(), (reply.to_vec(), Vec::new()));
+        }
+    }
+
+    #[test]
+    fn reads_one_reply_at_a_time() {
+        let (frame, rest) = read(b":1\r\n:2\r\n").unwrap();
+
+        assert_eq!(frame, b":1\r\n".to_vec());
+        assert_eq!(rest, b":2\r\n".to_vec());
+    }
+
+    #[test]
+    fn reads_nested_arrays() {
+        let reply = b"*3\r\n*2\r\n:1\r\n*1\r\n$1\r\na\r\n$-1\r\n*0\r\n";
+        let (frame, rest) = read(&[&reply[..], b"+OK\r\n"].concat()).unwrap();
+
+        assert_eq!(frame, reply.to_vec());
+        assert_eq!(rest, b"+OK\r\n".to_vec());
+    }
+
+    #[test]
+    fn reads_nil_arrays() {
+        assert_eq!(read(b"*-1\r\n").unwrap().0, b"*-1\r\n".to_vec());
+    }
+
+    #[test]
+    fn reads_bulk_strings_by_length() {
+        // Newlines, and anything that looks like a header, inside the data are not read as replies.
+        let reply = b"*2\r\n$6\r\na\nb\r\n*\r\n:1\r\n";
+        assert_eq!(read(reply).unwrap().0, reply.to_vec());
+    }
+
+    #[test]
+    fn fails_truncated_frames_as_dropped_connections() {
+        for reply in &[&b""[..], b"+OK", b"$5\r\nhel", b"*2\r\n:1\r\n", b"*2\r\n$1\r\na\r\n"] {
+            let e = read(reply).unwrap_err();
+            assert!(e.is_connection_dropped() || e.kind() == ErrorKind::IoError, "{:?}", reply);
+        }
+    }
+
+    #[test]
+    fn fails_invalid_frames() {
+        for reply in &[&b"?1\r\n"[..], b"+\n", b"$3\r\nabcd\r\n", b"$x\r\n", b"*1\r\n:1\n"] {
+            assert_eq!(read(reply).unwrap_err().kind(), ErrorKind::ResponseError, "{:?}", reply);
+        }
+    }
+
+    #[test]
+    fn finds_array_offsets() {
+        assert_eq!(offsets(b"*3\r\n$1\r\na\r\n*2\r\n:1\r\n$-1\r\n+OK\r\n").unwrap(), vec![4, 11, 24]);
+        assert_eq!(offsets(b"*2\r\n$4\r\n*1\r\n\r\n:7\r\n").unwrap(), vec![4, 14]);
+        assert_eq!(offsets(b"*0\r\n").unwrap(), Vec::<usize>::new());
+        assert_eq!(offsets(b"*-1\r\n").unwrap(), Vec::<usize>::new());
+    }
+
+    #[test]
+    fn fails_offsets_of_other_replies() {
+        with_gil(|| {
+            assert!(offsets(b"-ERR wrong type\r\n").is_err());
+            assert!(offsets(b"$1\r\na\r\n").is_err());
+            assert!(offsets(b"*2\r\n:1\r\n").is_err());
+        });
+    }
+
+    #[test]
+    fn skips_whole_replies() {
+        let frame = b"*2\r\n*2\r\n$2\r\n\r\n\r\n$-1\r\n*-1\r\n-ERR x\r\n";
+        let mut cursor = Cursor { frame, pos: 0 };
+
+        cursor.skip().unwrap();
+        assert_eq!(cursor.pos, frame.len() - b"-ERR x\r\n".len());
+
+        cursor.skip().unwrap();
+        assert_eq!(cursor.pos, frame.len());
+    }
+
+    #[test]
+    fn writes_parsed_replies_back() {
+        let reply = Value::Bulk(vec![
+            Value::Int(-1),
+            Value::Nil,
+            Value::Data(b"a\r\nb".to_vec()),
+            Value::Bulk(vec![Value::Okay, Value::Status("QUEUED".to_string())]),
+        ]);
+        let bytes = frame(&reply);
+
+        assert_eq!(read(&bytes).unwrap(), (bytes.clone(), Vec::new()));
+        assert_eq!(Parser::new().parse_value(&bytes[..]).unwrap(), reply);
+    }
+
+    #[test]
+    fn parses_numbers_in_place() {
+        let parsed = numbers::<i64>(b"*4\r\n$2\r\n12\r\n:-5\r\n$-1\r\n*1\r\n:1\r\n").unwrap();
+        assert_eq!(parsed, vec![12, -5, i64::MIN, i64::MIN]);
+
+        let parsed = numbers::<f64>(b"*2\r\n$3\r\n1.5\r\n$-1\r\n").unwrap();
+        assert_eq!(parsed[0], 1.5);
+        assert!(parsed[1].is_nan());
+    }
+
+    #[test]
+    fn fails_invalid_numbers() {
+        with_gil(|| {
+            assert!(numbers::<i64>(b"*1\r\n$1\r\nx\r\n").is_err());
+            assert!(numbers::<i64>(b"*1\r\n-ERR x\r\n").is_err());
+        });
+    }
+}
@@ -0,0 +1,131 @@
+//! Implementation of bulk metadata lookups over many keys.
+//!
+//! Every lookup of a chunk of keys is written in a single batch, and the replies are gathered into one
+//! list per field, so auditing many keys costs one round trip per chunk rather than one per lookup.
+use crate::*;
+
+/// The fields `inspect` can look up, along with the command, and subcommand, looking each one up.
+const FIELDS: &[(&str, &str, Option<&str>)] = &[
+    ("type", "TYPE", None),
+    ("ttl", "TTL", None),
+    ("pttl", "PTTL", None),
+    ("exists", "EXISTS", None),
+    ("memory", "MEMORY", Some("USAGE")),
+    ("encoding", "OBJECT", Some("ENCODING")),
+    ("idletime", "OBJECT", Some("IDLETIME")),
+];
+
+/// The fields looked up when none are given.
+const DEFAULT_FIELDS: &[&str] = &["type", "ttl", "memory", "encoding"];
+
+#[pymethods]
+impl RedisClient {
+    /// Look up metadata about many keys at once.
+    /// The lookups of a chunk of keys are sent in one round trip, instead of one round trip per key and field.
+    ///
+    /// Arguments
+    /// =========
+    /// `keys` - Any iterable of key names, such as a generator.
+    ///
+    /// `fields` - The metadata to look up. Any of `type`, `ttl`, `pttl`, `exists`, `memory`, `encoding` and `idletime`.
+    /// Defaults to `("type", "ttl", "memory", "encoding")`.
+    ///
+    /// `chunk_size` - The most keys looked up in one round trip. Defaults to 1000.
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// info = client.inspect(client.scan_iter(pattern="session:*"), fields=("ttl", "memory"))
+    ///
+    /// for key, ttl in zip(info["key"], info["ttl"]):
+    ///     if ttl == -1:
+    ///         print(f"{key} never expires")
+    /// ```
+    ///
+    /// Returns
+    /// =======
+    /// A dictionary of parallel lists, in the order of `keys`. `key` holds the keys, and every field holds its values.
+    /// Lookups of missing keys give what their command replies with. Ex, `none` for `type`, -2 for `ttl`, None for `memory`.
+    ///
+    /// Note
+    /// ====
+    /// `memory` requires Redis 4 or later. Any error replied by Redis raises, discarding the lookups made so far.
+    ///
+    /// [Read about TYPE](https://redis.io/commands/type), [TTL](https://redis.io/commands/ttl),
+    /// [MEMORY USAGE](https://redis.io/commands/memory-usage) and [OBJECT](https://redis.io/commands/object).
+    #[args(fields="None", chunk_size="1000")]
+    #[text_signature = "($self, keys, fields=None, chunk_size=1000)"]
+    pub fn inspect(&self, keys: &PyAny, fields: Option<Vec<&str>>, chunk_size: usize) -> PyResult<PyObject> {
+        self.require_direct("inspect", Some(chunk_size))?;
+
+        stream::require_elements(keys, "keys")?;
+
+        let lookups = fields
+            .as_deref()
+            .unwrap_or(DEFAULT_FIELDS)
+            .iter()
+            .map(|name| match FIELDS.iter().find(|field| field.0 == *name) {
+                Some(field) => Ok(field),
+                None => exceptions::ValueError::into(format!("{} is not a field inspect can look up", name))
+            })
+            .collect::<PyResult<Vec<_>>>()?;
+
+        let gil = Python::acquire_gil();
+        let py = gil.python();
+        let pool = &self.pool;
+        let timeouts = self.timeouts;
+
+        let names = PyList::empty(py);
+        let columns: Vec<&PyList> = lookups.iter().map(|_| PyList::empty(py)).collect();
+        let mut iterator = keys.iter()?;
+        let mut chunk = Vec::with_capacity(chunk_size);
+
+        loop {
+            chunk.clear();
+
+            for key in iterator.by_ref().take(chunk_size) {
+                chunk.push(key?);
+            }
+
+            if chunk.is_empty() {
+                break;
+            }
+
+            let packed = resp::with_buffer(|packed| {
+                for key in &chunk {
+                    for &&(_, cmd, subcommand) in &lookups {
+                        resp::pack(packed, cmd, &(subcommand, *key))?;
+                    }
+                }
+
+                Ok(packed.to_vec())
+            })?;
+
+            let count = chunk.len() * lookups.len();
+            let replies = py.allow_threads(|| pool.send_batch(&packed, count, timeouts));
+
+            for (index, reply) in replies.into_iter().enumerate() {
+                let reply = match reply {
+                    Ok(v) => v,
+                    Err(v) => return redis_error(v)
+                };
+
+                columns[index % lookups.len()].append(reply::element(py, &reply, self.decode)?)?;
+            }
+
+            for key in &chunk {
+                names.append(*key)?;
+            }
+        }
+
+        let result = PyDict::new(py);
+        result.set_item("key", names)?;
+
+        for (lookup, column) in lookups.iter().zip(columns) {
+            result.set_item(lookup.0, column)?;
+        }
+
+        Ok(result.into_py(py))
+    }
+}
@@ -8,74 +8,140 @@
 use redis::*;
 use std::borrow::Cow;
 use std::collections::HashMap;
+use std::sync::{Arc, Mutex};
 
 use pyo3::{
     Python, types::*,
     PyTraverseError, PyVisit,
     PyNativeType, prelude::*, exceptions,
-    class::basic::PyObjectProtocol, PyGCProtocol
+    class::basic::PyObjectProtocol, PyGCProtocol,
+    create_exception
 };
 
+// Raised when Redis does not respond within a timeout. Catchable as the builtin `TimeoutError`. 
+create_exception!(suredis, TimeoutError, exceptions::TimeoutError);
+
+/// Sends a command and converts the reply. 
+/// Pipelines queue the command instead, and asynchronous clients return a future of the reply. 
+/// Clients made by `RedisClient.noreply` only write the command. 
+/// 
+/// The GIL is released while waiting on the connection pool and the network, 
+/// so other Python threads keep running during the round trip. 
+/// 
+/// # Type Parameters
+/// * `Args` - The arguments of the command. 
+/// * `ReturnType` - The type the reply is converted into before it reaches Python. 
 #[inline]
-fn route_command<Args, ReturnType>(inst: &mut RedisClient, cmd: &str, args: Option<Args>) -> PyResult<ReturnType>
+fn route_command<Args, ReturnType>(inst: &RedisClient, cmd: &str, args: &Args) -> PyResult<PyObject>
 where 
-    Args: ToRedisArgs,
-    ReturnType: FromRedisValue
+    Args: resp::Arguments + ?Sized,
+    ReturnType: reply::ReplyType
 {
-    let mut call = redis::cmd(cmd);
-    call.arg(args);
-
-    match call.query(&mut inst.connection) as RedisResult<ReturnType> {
-        Ok(v) => Ok(v),
-        Err(v) => {
-            let detail = Cow::from(v.detail().unwrap_or_else(|| "Unknown exception!").to_string());
-            
-            match v.kind() {
-                ErrorKind::ExtensionError => exceptions::TypeError::into(detail),
-                ErrorKind::TypeError => exceptions::TypeError::into(detail),
-                ErrorKind::IoError => exceptions::IOError::into(detail),
-                _ => exceptions::Exception::into(detail)
+    let gil = Python::acquire_gil();
+    let py = gil.python();
+    let convert = inst.converter::<ReturnType>();
+
+    resp::with_buffer(|packed| {
+        if inst.noreply {
+            packed.extend_from_slice(pool::REPLY_SKIP);
+        }
+
+        resp::pack(packed, cmd, args)?;
+
+        if let Some(ref queue) = inst.queue {
+            queue.lock().unwrap().push(packed, convert);
+            return Ok(py.None());
+        }
+
+        if let Some(ref dispatcher) = inst.dispatcher {
+            return dispatcher.submit(py, packed.to_vec(), convert, inst.timeouts, inst.noreply);
+        }
+
+        let packed = &*packed;
+        let pool = &inst.pool;
+        let timeouts = inst.timeouts;
+        let multiplexer = &inst.multiplexer;
+
+        if inst.noreply {
+            return match py.allow_threads(|| pool.send_only(packed, timeouts)) {
+                Ok(_) => Ok(py.None()),
+                Err(v) => redis_error(v)
+            };
+        }
+
+        // Replies with a direct path skip `redis::Value`. The multiplexer only deals in parsed replies.
+        if let (Some(decoder), None, true) = (ReturnType::DECODER, multiplexer, inst.decoders) {
+            return match py.allow_threads(|| pool.query_frame(packed, timeouts)) {
+                Ok(frame) => decoder(py, frame, inst.decode),
+                Err(v) => redis_error(v)
+            };
+        }
+
+        let reply = py.allow_threads(|| {
+            match multiplexer {
+                Some(ref multiplexer) => multiplexer.send(packed),
+                None => pool.query(packed, timeouts)
             }
+        });
+
+        match reply.or_else(ReturnType::recover) {
+            Ok(v) => convert(py, v),
+            Err(v) => redis_error(v)
         }
-    }
+    })
+}
+
+/// Converts a raw Redis reply into the Python object of `ReturnType`. 
+#[inline]
+fn convert_reply<ReturnType: reply::ReplyType>(py: Python, reply: Value) -> PyResult<PyObject> {
+    ReturnType::convert(py, reply)
 }
 
-/// Converts a `Cow<[&PyAny]>` into a Redis applicable format. 
+/// Maps a `RedisError` onto the matching Python exception. 
 #[inline]
-fn construct_vector(capacity: usize, other: Cow<[&PyAny]>) -> PyResult<Vec<String>> {
-    let mut vector = Vec::with_capacity(capacity);
+fn redis_error<T>(v: RedisError) -> PyResult<T> {
+    let detail = Cow::from(v.detail().unwrap_or_else(|| "Unknown exception!").to_string());
     
-    vector.extend(other.iter().map(|element| element.to_string()).collect::<Vec<String>>());
+    match v.kind() {
+        ErrorKind::ExtensionError => exceptions::TypeError::into(detail),
+        ErrorKind::TypeError => exceptions::TypeError::into(detail),
+        ErrorKind::IoError if v.is_timeout() => TimeoutError::into("the Redis server did not respond in time"),
+        ErrorKind::IoError => exceptions::IOError::into(detail),
+        _ => exceptions::Exception::into(detail)
+    }
+}
+
+/// A reply that falls back to the default of `T` when it cannot be converted. 
+/// For example, a nil `GET` becomes an empty string.
+struct OrDefault<T>(T);
 
-    Ok(vector)
+impl<T: FromRedisValue + Default> FromRedisValue for OrDefault<T> {
+    fn from_redis_value(v: &Value) -> RedisResult<Self> {
+        Ok(OrDefault(T::from_redis_value(v).unwrap_or_default()))
+    }
+}
+
+impl<T: IntoPy<PyObject>> IntoPy<PyObject> for OrDefault<T> {
+    fn into_py(self, py: Python) -> PyObject {
+        self.0.into_py(py)
+    }
 }
 
 /// Decides whether a command should be the NX/X varient.
 /// 
 /// # Arguments 
 /// * `base` - The original command. Ex, `SET` being the original of `SETNX`. 
-/// * `additive` - What to add if `no_overwrite` is true. NX/X. 
+/// * `variant` - The command to use if `no_overwrite` is true. Ex, `SETNX`.
 /// * `choice` - The choice the user may of passed. 
 /// 
 /// # Returns 
 /// The corrected command. Whether NX/X or not. 
 #[inline]
-fn nx_x_decider(base: &'static str, additive: &'static str, choice: Option<&PyDict>) -> String {
-    let gil = Python::acquire_gil();
-    let mut res = String::with_capacity(base.len() + additive.len());
-    let raw_choice = choice.unwrap_or_else(|| PyDict::new(gil.python())).get_item("no_overwrite"); 
-
-    res.push_str(base);
-
-    if let Some(val) = raw_choice {
-        match val.to_string().to_ascii_lowercase().parse::<bool>() {
-            Ok(val) => { 
-                if val { res.push_str(additive); } else {};
-                res
-            }, 
-            Err(_) => res
-        }
-    } else { res }
+fn nx_x_decider(base: &'static str, variant: &'static str, choice: Option<&PyDict>) -> &'static str {
+    match choice.and_then(|choice| choice.get_item("no_overwrite")) {
+        Some(val) if val.extract::<bool>().unwrap_or(false) => variant,
+        _ => base
+    }
 } 
 
 /// The main client for suredis. 
@@ -84,54 +150,191 @@ fn nx_x_decider(base: &'static str, additive: &'static str, choice: Option<&PyDi
 /// ==========
 /// `db` - The DB the connection interacts with. See [SELECT](https://redis.io/commands/select).
 /// `url` - The URL you passed to establish the Redis client.
-/// `supports_pipelining` - Whether the connection supports pipelines. 
+/// `supports_pipelining` - Whether the connection supports pipelines. See `RedisClient.pipeline`.
+/// 
+/// Arguments
+/// =========
+/// `url` - The URL of the Redis server.
+/// `pool_size` - The most connections the client may open at once. Defaults to 1. 
+/// Raise it when the client is shared by many threads. See `RedisClient.pool_stats`.
+/// `multiplexed` - Whether threads sharing the client write onto one connection. Defaults to False. 
+/// Commands sent at the same time by different threads are then coalesced into a single write.
+/// `lazy` - Whether to wait for the first command before connecting. Defaults to False. 
+/// `retries` - How many times to retry a connection that could not be made, or a command the socket refused
+/// before any of it was written. Commands are never sent twice. Defaults to 3. 
+/// Attempts are spaced out by a jittered, exponential backoff.
+/// `nodelay` - Whether to disable Nagle's algorithm on TCP connections. Defaults to True. 
+/// `keepalive` - Seconds a TCP connection may sit idle before keepalive probes are sent. Defaults to None, no probes. 
+/// `send_buffer_size` - The size of the kernel's send buffer for each connection, in bytes. Defaults to the system's. 
+/// `recv_buffer_size` - The size of the kernel's receive buffer for each connection, in bytes. Defaults to the system's. 
+/// `connect_timeout` - Seconds to wait for each attempt to connect. Defaults to None, waiting forever. 
+/// `read_timeout` - Seconds to wait for a reply. Defaults to None, waiting forever. See `RedisClient.with_timeout`.
+/// `write_timeout` - Seconds to wait for the socket to accept a command, and for a pooled connection when the pool is exhausted. Defaults to None, waiting forever. 
+/// `decode_responses` - Whether Redis strings are returned as `str` rather than `bytes`. Defaults to True. 
+/// Leave it on for text, and turn it off for binary values. See `RedisClient.raw`.
 /// 
 /// Note 
 /// ====
 /// 1. Unsupported Redis operations can be accessed with the `manual` method.
-/// 2. It is preferred to prefix your URL with `redis://`.
-#[pyclass(gc)]
+/// 2. It is preferred to prefix your URL with `redis://`. Use `unix:///path/to/redis.sock` for a unix domain socket,
+/// which has about half the latency of TCP when Redis runs on the same host.
+/// 3. The client may be shared between threads. The GIL is released during network I/O.
+/// 4. Unless `lazy` is set, the client connects right away and raises if the server cannot be reached.
+/// 5. A command that runs out of time raises `suredis.TimeoutError`, a subclass of the builtin `TimeoutError`.
+/// 6. Values may be `bytes`, `bytearray` or `memoryview`. Their bytes are stored as they are. 
+#[pyclass(gc, subclass)]
 struct RedisClient {
-    #[pyo3(get)]                       //
-    db: i64,                           // The DB the connection interacts with. 
-    #[pyo3(get)]                       //
-    url: String,                       // The URL used to establish the Redis client.
-    o: Option<PyObject>,               // Used to support the CPython Garbage Collection protocol.
-    client: redis::Client,             // The internal Redis client.
-    connection: Connection,            // The internal Redis connection.
-    #[pyo3(get)]                       //
-    supports_pipelining: bool,         // Whether the connection supports pipelining. 
+    #[pyo3(get)]                                 //
+    db: i64,                                     // The DB the connection interacts with.
+    #[pyo3(get)]                                 //
+    url: String,                                 // The URL used to establish the Redis client.
+    o: Option<PyObject>,                         // Used to support the CPython Garbage Collection protocol.
+    pool: Arc<pool::Pool>,                       // The internal Redis connections. Shared with pipelines.
+    queue: Option<Mutex<pipeline::Queue>>,       // The queued commands when this instance is a pipeline.
+    dispatcher: Option<Arc<asyncio::Dispatcher>>, // Sends commands off the event loop when this instance is asynchronous.
+    multiplexer: Option<multiplex::Multiplexer>, // Coalesces the commands of concurrent threads when multiplexed.
+    timeouts: Option<connection::Timeouts>,      // Overrides the timeouts of the pool. See `RedisClient.with_timeout`.
+    noreply: bool,                               // Whether commands are sent without waiting for a reply.
+    decode: bool,                                // Whether Redis strings are decoded into `str`, rather than left as `bytes`.
+    decoders: bool,                              // Whether replies with a direct path skip `redis::Value`. See `decode`.
+    #[pyo3(get)]                                 //
+    supports_pipelining: bool,                   // Whether the connection supports pipelining.
 }
 
 #[pymethods]
 impl RedisClient {
     #[new]
-    fn __new__(url: &str) -> PyResult<PyClassInitializer<Self>> {
-        let protected_url = if url.starts_with("redis://") {
+    #[args(
+        pool_size="1", multiplexed="false", lazy="false", retries="3",
+        nodelay="true", keepalive="None", send_buffer_size="None", recv_buffer_size="None",
+        connect_timeout="None", read_timeout="None", write_timeout="None", decode_responses="true"
+    )]
+    fn __new__(
+        url: &str, pool_size: usize, multiplexed: bool, lazy: bool, retries: usize,
+        nodelay: bool, keepalive: Option<f64>, send_buffer_size: Option<usize>, recv_buffer_size: Option<usize>,
+        connect_timeout: Option<f64>, read_timeout: Option<f64>, write_timeout: Option<f64>, decode_responses: bool
+    ) -> PyResult<PyClassInitializer<Self>> {
+        let socket = connection::Settings::new(
+            nodelay, keepalive, send_buffer_size, recv_buffer_size,
+            connect_timeout, read_timeout, write_timeout
+        )?;
+        let options = Options { pool_size, multiplexed, lazy, retries, socket, decode: decode_responses };
+        Ok(PyClassInitializer::from(Self::open(url, options)?))
+    }
+}
+
+/// How a client connects. Gathered from the keyword arguments of the constructors. 
+struct Options {
+    pool_size: usize,                        // The most connections the client may open at once.
+    multiplexed: bool,                       // Whether threads sharing the client write onto one connection.
+    lazy: bool,                              // Whether to wait for the first command before connecting.
+    retries: usize,                          // How many times to retry a connection that failed or dropped.
+    socket: connection::Settings,            // How the socket of every connection is tuned.
+    decode: bool,                            // Whether Redis strings are decoded into `str`.
+}
+
+impl RedisClient {
+    /// Establish a client, along with its connection pool. 
+    fn open(url: &str, options: Options) -> PyResult<Self> {
+        let protected_url = if url.contains("://") {
             url.to_string()
         } else {
             format!("redis://{}", url)
         };
 
-        let client = Client::open(protected_url)
-            .expect("could not establish a Redis client");
+        let info = match protected_url.as_str().into_connection_info() {
+            Ok(v) => v,
+            Err(v) => return redis_error(v)
+        };
+
+        let db = info.db;
+        let pool = Arc::new(pool::Pool::new(info, options.socket, options.pool_size, options.retries));
 
-        let connection = client.get_connection()
-            .expect("could not establish a connection. Is the server running?");
+        if !options.lazy {
+            let gil = Python::acquire_gil();
+
+            if let Err(v) = gil.python().allow_threads(|| pool.get(None).map(drop)) {
+                return redis_error(v);
+            }
+        }
 
-        let db = connection.get_db();
         let supports_pipelining = true;
+        let multiplexer = if options.multiplexed {
+            Some(multiplex::Multiplexer::new(Arc::clone(&pool)))
+        } else { None };
 
         let instance: Self = Self {
             db,
-            client,
+            pool,
             o: None,
-            connection,
+            queue: None,
+            dispatcher: None,
+            multiplexer,
+            timeouts: None,
+            noreply: false,
+            decode: options.decode,
+            decoders: true,
             supports_pipelining,
             url: url.to_string()
         };
 
-        Ok(PyClassInitializer::from(instance))
+        Ok(instance)
+    }
+
+    /// How replies of `ReturnType` are converted, depending on whether this client decodes them. 
+    #[inline]
+    fn converter<ReturnType: reply::ReplyType>(&self) -> pipeline::Converter {
+        if self.decode {
+            convert_reply::<ReturnType>
+        } else {
+            ReturnType::convert_raw
+        }
+    }
+
+    /// A copy of this client that shares its connection pool, and its I/O thread when it is asynchronous. 
+    fn fork(&self) -> Self {
+        Self {
+            db: self.db,
+            o: None,
+            url: self.url.clone(),
+            pool: Arc::clone(&self.pool),
+            queue: None,
+            dispatcher: self.dispatcher.clone(),
+            multiplexer: None,
+            timeouts: self.timeouts,
+            noreply: self.noreply,
+            decode: self.decode,
+            decoders: self.decoders,
+            supports_pipelining: self.supports_pipelining
+        }
+    }
+
+    /// Raise unless this client sends commands right away, rather than queueing them in a pipeline or
+    /// handing them to an I/O thread. Operations that read replies as they go, such as scans, require it.
+    /// 
+    /// # Arguments
+    /// * `what` - The operation, used in the error. Ex, `scans`.
+    /// * `chunk_size` - The chunk size passed to the operation, if it takes one. Must be at least 1.
+    fn require_direct(&self, what: &str, chunk_size: Option<usize>) -> PyResult<()> {
+        if self.queue.is_some() || self.dispatcher.is_some() {
+            return exceptions::TypeError::into(format!("{} cannot be used by pipelines or asynchronous clients", what));
+        }
+
+        if chunk_size == Some(0) {
+            return exceptions::ValueError::into("chunk_size must be at least 1");
+        }
+
+        Ok(())
+    }
+
+    /// Hand a copy made by `fork` to Python, as an `AsyncRedisClient` when it is asynchronous. 
+    fn wrap_fork(py: Python, client: Self) -> PyResult<PyObject> {
+        if client.dispatcher.is_some() {
+            let initializer = PyClassInitializer::from(client).add_subclass(asyncio::AsyncRedisClient {});
+            Ok(Py::new(py, initializer)?.into_py(py))
+        } else {
+            Ok(Py::new(py, client)?.into_py(py))
+        }
     }
 }
 
@@ -163,10 +366,31 @@ impl PyObjectProtocol for RedisClient {
 }
 
 mod ops; 
+mod asyncio;
+mod connection;
+mod decode;
+mod inspect;
+mod multiplex;
+mod pipeline;
+mod pool;
+mod reply;
+mod resp;
+mod scan;
+mod stream;
+
+#[cfg(feature = "count-allocations")]
+mod allocations;
 
 /// A speedy & simplistic library at runtime for an incredibly straightforward Redis interface.
 #[pymodule]
-fn suredis(_py: Python, module: &PyModule) -> PyResult<()> {
+fn suredis(py: Python, module: &PyModule) -> PyResult<()> {
     module.add_class::<RedisClient>()?;
+    module.add_class::<pipeline::Pipeline>()?;
+    module.add_class::<asyncio::AsyncRedisClient>()?;
+    module.add("TimeoutError", py.get_type::<TimeoutError>())?;
+
+    #[cfg(feature = "count-allocations")]
+    module.add_wrapped(pyo3::wrap_pyfunction!(allocations::allocations))?;
+
     Ok(())
 }
\ No newline at end of file
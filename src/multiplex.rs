@@ -0,0 +1,93 @@
+//! Implementation of automatic pipelining for clients shared by many threads.
+//!
+//! Every thread appends its packed command to one shared batch. Whichever thread finds no
+//! batch in flight becomes the leader: it writes the whole batch on a single connection,
+//! reads the replies in order, and hands each reply back to the thread that sent it.
+//! Commands sent while a batch is in flight are coalesced into the next one.
+use crate::*;
+use std::sync::Condvar;
+
+/// The mutable state of a multiplexer. Guarded by the multiplexer's lock.
+struct State {
+    packed: Vec<u8>,                           // The commands waiting for the next batch, back to back.
+    waiting: usize,                            // How many commands are in `packed`.
+    next_ticket: u64,                          // The ticket of the next command to join a batch.
+    in_flight: bool,                           // Whether a leader is writing a batch right now.
+    replies: HashMap<u64, RedisResult<Value>>, // Replies read, but not yet picked up by their sender.
+    batches: usize,                            // Batches written over the life of the multiplexer.
+    commands: usize,                           // Commands written over the life of the multiplexer.
+}
+
+/// Coalesces the commands of concurrent callers onto one connection.
+pub struct Multiplexer {
+    pool: Arc<pool::Pool>,             // Provides the connection each batch is written on.
+    state: Mutex<State>,               // The waiting commands and unclaimed replies.
+    settled: Condvar,                  // Signalled whenever a batch has been read.
+}
+
+impl Multiplexer {
+    pub fn new(pool: Arc<pool::Pool>) -> Self {
+        let state = State {
+            packed: Vec::new(),
+            waiting: 0,
+            next_ticket: 0,
+            in_flight: false,
+            replies: HashMap::new(),
+            batches: 0,
+            commands: 0
+        };
+
+        Self { pool, state: Mutex::new(state), settled: Condvar::new() }
+    }
+
+    /// Send a packed command along with any others waiting, and wait for its reply.
+    pub fn send(&self, packed: &[u8]) -> RedisResult<Value> {
+        let mut state = self.state.lock().unwrap();
+        let ticket = state.next_ticket;
+
+        state.next_ticket += 1;
+        state.waiting += 1;
+        state.packed.extend_from_slice(packed);
+
+        loop {
+            if let Some(reply) = state.replies.remove(&ticket) {
+                return reply;
+            }
+
+            if !state.in_flight && state.waiting > 0 {
+                let count = state.waiting;
+                let first = state.next_ticket - count as u64;
+                let batch = std::mem::replace(&mut state.packed, Vec::new());
+
+                state.in_flight = true;
+                state.waiting = 0;
+                state.batches += 1;
+                state.commands += count;
+                drop(state);
+
+                let replies = self.pool.send_batch(&batch, count, None);
+
+                state = self.state.lock().unwrap();
+                state.in_flight = false;
+                state.replies.extend((first..).zip(replies.into_iter()));
+
+                // Keep the allocation of the batch for the next leader.
+                if state.packed.is_empty() {
+                    state.packed = batch;
+                    state.packed.clear();
+                }
+
+                self.settled.notify_all();
+                continue;
+            }
+
+            state = self.settled.wait(state).unwrap();
+        }
+    }
+
+    /// How many batches and commands have been written so far.
+    pub fn stats(&self) -> (usize, usize) {
+        let state = self.state.lock().unwrap();
+        (state.batches, state.commands)
+    }
+}
@@ -25,9 +25,8 @@ impl RedisClient {
     /// 
     #[args(args="*")]
     #[text_signature = "($self, cmd, *args)"]
-    pub fn manual(&mut self, cmd: &str, args: Vec<&PyAny>) -> PyResult<String> {
-        let args = construct_vector(args.len(), Cow::from(&args))?;
-        Ok(route_command(self, cmd, Some(args))?)
+    pub fn manual(&self, cmd: &str, args: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, String>(self, cmd, &args)
     }
 
     /// Delete the specified keys. Keys will be ignored if they do not exist.
@@ -60,9 +59,34 @@ impl RedisClient {
     /// [Read about DEL in the Redis documentation.](https://redis.io/commands/del)
     #[args(keys="*")]
     #[text_signature = "($self, keys, /)"]
-    pub fn delete(&mut self, keys: Vec<&PyAny>) -> PyResult<usize> {
-        let args = construct_vector(keys.len(), Cow::from(&keys))?;
-        Ok(route_command(self, "DEL", Some(args))?)
+    pub fn delete(&self, keys: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "DEL", &keys)
+    }
+
+    /// Delete the keys of an iterable, streamed in chunks. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `keys` - Any iterable of key names, such as a generator. 
+    /// 
+    /// `chunk_size` - The most keys sent in one DEL. Defaults to 1000. 
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.delete_iter(f"session:{i}" for i in range(1_000_000))
+    /// ```
+    ///
+    /// Integer Reply
+    /// =============
+    /// The amount of keys that were removed, over every chunk. 
+    /// 
+    /// [Read about DEL in the Redis documentation.](https://redis.io/commands/del)
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, keys, chunk_size=1000)"]
+    pub fn delete_iter(&self, keys: &PyAny, chunk_size: usize) -> PyResult<PyObject> {
+        stream::stream_command::<usize>(self, "DEL", None, keys, false, chunk_size, stream::Aggregate::Sum)
     }
 
     /// Check if a key exists. 
@@ -91,9 +115,8 @@ impl RedisClient {
     /// [Read about EXISTS in the Redis documentation.](https://redis.io/commands/exists)
     #[args(keys="*")]
     #[text_signature = "($self, keys, /)"]
-    pub fn exists(&mut self, keys: Vec<&PyAny>) -> PyResult<usize> {
-        let args = construct_vector(keys.len(), Cow::from(&keys))?;
-        Ok(route_command(self, "EXISTS", Some(args))?)
+    pub fn exists(&self, keys: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "EXISTS", &keys)
     }
 
     /// Set a timeout on a key. After the timeout expires, the key will be deleted.
@@ -129,9 +152,41 @@ impl RedisClient {
     ///
     /// [Read about EXPIRE in the Redis documentation.](https://redis.io/commands/expire)
     #[text_signature = "($self, key, seconds, /)"]
-    pub fn expire(&mut self, key: &str, seconds: usize) -> PyResult<u8> {
-        let time = seconds.to_string();
-        Ok(route_command(self, "EXPIRE", Some(&[key, &time]))?)
+    pub fn expire(&self, key: &str, seconds: usize) -> PyResult<PyObject> {
+        route_command::<_, u8>(self, "EXPIRE", &(key, seconds))
+    }
+
+    /// Set a timeout on many keys, sending one EXPIRE per key in pipelined chunks. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `keys` - Any iterable of key names, or a dictionary of key names to their own timeout in seconds. 
+    /// 
+    /// `seconds` - The timeout set on every key, when `keys` is not a dictionary. 
+    /// 
+    /// `chunk_size` - The most commands sent in one round trip. Defaults to 1000. 
+    /// 
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.expire_many(sessions, 3600)
+    /// client.expire_many({"short": 60, "long": 86400})
+    /// ```
+    /// 
+    /// Sequence Reply
+    /// ==============
+    /// A list of booleans, in the order of `keys`. False where the timeout was not set, such as for a missing key. 
+    /// 
+    /// [Read about EXPIRE in the Redis documentation.](https://redis.io/commands/expire)
+    #[args(seconds="None", chunk_size="1000")]
+    #[text_signature = "($self, keys, seconds=None, chunk_size=1000)"]
+    pub fn expire_many(&self, keys: &PyAny, seconds: Option<&PyAny>, chunk_size: usize) -> PyResult<PyObject> {
+        if seconds.is_none() && keys.downcast::<PyDict>().is_err() {
+            return exceptions::TypeError::into("seconds is required unless keys is a dictionary");
+        }
+
+        stream::each_command(self, "EXPIRE", keys, seconds, chunk_size)
     }
 
     /// Set a timeout on a key with a UNIX timestamp. After the timeout expires, the key will be deleted.
@@ -167,13 +222,13 @@ impl RedisClient {
     ///
     /// [Read about EXPIREAT in the Redis documenation.](https://redis.io/commands/expireat)
     #[text_signature = "($self, key, timestamp, /)"]
-    pub fn expireat(&mut self, key: &str, timestamp: usize) -> PyResult<u8> {
-        let time = timestamp.to_string();
-        Ok(route_command(self, "EXPIREAT", Some(&[key, &time]))?)
+    pub fn expireat(&self, key: &str, timestamp: usize) -> PyResult<PyObject> {
+        route_command::<_, u8>(self, "EXPIREAT", &(key, timestamp))
     }
 
     /// Return all the keys matching the passed pattern.
     /// While the time complexity is O(n), the constant times are quite fast. ~40ms for a 1 million key database.
+    /// The server is blocked meanwhile, so prefer `scan_iter` on large databases.
     ///
     /// Arguments
     /// =========
@@ -205,8 +260,8 @@ impl RedisClient {
     ///
     /// [Read about KEYS in the Redis documentation.](https://redis.io/commands/keys)
     #[text_signature = "($self, pattern, /)"]
-    pub fn keys(&mut self, pattern: &str) -> PyResult<Vec<String>> {
-        Ok(route_command(self, "KEYS", Some(pattern))?)
+    pub fn keys(&self, pattern: &str) -> PyResult<PyObject> {
+        route_command::<_, Vec<String>>(self, "KEYS", pattern)
     }
 
     /// Move the key to another database.
@@ -240,9 +295,8 @@ impl RedisClient {
     ///
     /// [Read about MOVE in the Redis documentation.](https://redis.io/commands/move)
     #[text_signature = "($self, key, db, /)"]
-    pub fn r#move(&mut self, key: &str, db: u8) -> PyResult<u8> {
-        let id = db.to_string();
-        Ok(route_command(self, "MOVE", Some(&[key, &id]))?)
+    pub fn r#move(&self, key: &str, db: u8) -> PyResult<PyObject> {
+        route_command::<_, u8>(self, "MOVE", &(key, db))
     }
 
     /// Remove the existing timeout on a key, turning the key from volatile (a key with an expire set) 
@@ -271,8 +325,38 @@ impl RedisClient {
     ///
     /// [Read about PERSIST in the Redis documentation.](https://redis.io/commands/persist)
     #[text_signature = "($self, key, /)"]
-    pub fn persist(&mut self, key: &str) -> PyResult<i8> {
-        Ok(route_command(self, "PERSIST", Some(key))?)
+    pub fn persist(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, i8>(self, "PERSIST", key)
+    }
+
+    /// Remove the timeout of many keys, sending one PERSIST per key in pipelined chunks. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `keys` - Any iterable of key names. 
+    /// 
+    /// `chunk_size` - The most commands sent in one round trip. Defaults to 1000. 
+    /// 
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.persist_many(["a", "b", "c"]) == [True, False, True]
+    /// ```
+    /// 
+    /// Sequence Reply
+    /// ==============
+    /// A list of booleans, in the order of `keys`. False where there was no timeout to remove. 
+    /// 
+    /// [Read about PERSIST in the Redis documentation.](https://redis.io/commands/persist)
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, keys, chunk_size=1000)"]
+    pub fn persist_many(&self, keys: &PyAny, chunk_size: usize) -> PyResult<PyObject> {
+        if keys.downcast::<PyDict>().is_ok() {
+            return exceptions::TypeError::into("keys must be an iterable of key names");
+        }
+
+        stream::each_command(self, "PERSIST", keys, None, chunk_size)
     }
 
     /// Works exactly like EXPIRE but the time to live of the key is specified in milliseconds instead of seconds.
@@ -302,9 +386,40 @@ impl RedisClient {
     ///
     /// [Read about PEXPIRE in the Redis documentation.](https://redis.io/commands/pexpire)
     #[text_signature = "($self, key, timeout, /)"]
-    pub fn pexpire(&mut self, key: &str, timeout: usize) -> PyResult<u8> {
-        let time = timeout.to_string();
-        Ok(route_command(self, "PEXPIRE", Some(&[key, &time]))?)
+    pub fn pexpire(&self, key: &str, timeout: usize) -> PyResult<PyObject> {
+        route_command::<_, u8>(self, "PEXPIRE", &(key, timeout))
+    }
+
+    /// Set a timeout in milliseconds on many keys, sending one PEXPIRE per key in pipelined chunks. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `keys` - Any iterable of key names, or a dictionary of key names to their own timeout in milliseconds. 
+    /// 
+    /// `milliseconds` - The timeout set on every key, when `keys` is not a dictionary. 
+    /// 
+    /// `chunk_size` - The most commands sent in one round trip. Defaults to 1000. 
+    /// 
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.pexpire_many(client.scan_iter(pattern="cache:*"), 30_000)
+    /// ```
+    /// 
+    /// Sequence Reply
+    /// ==============
+    /// A list of booleans, in the order of `keys`. False where the timeout was not set, such as for a missing key. 
+    /// 
+    /// [Read about PEXPIRE in the Redis documentation.](https://redis.io/commands/pexpire)
+    #[args(milliseconds="None", chunk_size="1000")]
+    #[text_signature = "($self, keys, milliseconds=None, chunk_size=1000)"]
+    pub fn pexpire_many(&self, keys: &PyAny, milliseconds: Option<&PyAny>, chunk_size: usize) -> PyResult<PyObject> {
+        if milliseconds.is_none() && keys.downcast::<PyDict>().is_err() {
+            return exceptions::TypeError::into("milliseconds is required unless keys is a dictionary");
+        }
+
+        stream::each_command(self, "PEXPIRE", keys, milliseconds, chunk_size)
     }
 
     /// Has the same effect and semantic as EXPIREAT, 
@@ -334,9 +449,8 @@ impl RedisClient {
     ///
     /// [Read about PEXPIREAT in the Redis documentation.](https://redis.io/commands/pexpireat)
     #[text_signature = "($self, key, timeout, /)"]
-    pub fn pexpireat(&mut self, key: &str, timeout: usize) -> PyResult<i8> {
-        let time = timeout.to_string();
-        Ok(route_command(self, "PEXPIREAT", Some(&[key, &time]))?)
+    pub fn pexpireat(&self, key: &str, timeout: usize) -> PyResult<PyObject> {
+        route_command::<_, i8>(self, "PEXPIREAT", &(key, timeout))
     }
 
     /// Like TTL this command returns the remaining time to live of a key that has an expire set, 
@@ -368,8 +482,8 @@ impl RedisClient {
     ///
     /// [Read about PTTL in the Redis documentation.](https://redis.io/commands/pttl)
     #[text_signature = "($self, key, /)"]
-    pub fn pttl(&mut self, key: &str) -> PyResult<i64> {
-        Ok(route_command(self, "PTTL", Some(key))?)
+    pub fn pttl(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, i64>(self, "PTTL", key)
     }
 
     /// Return a random key name. 
@@ -395,11 +509,11 @@ impl RedisClient {
     ///
     /// [Read about RANDOMKEY on the Redis documentation.](https://redis.io/commands/randomkey)
     #[text_signature = "($self)"]
-    pub fn randomkey(&mut self) -> PyResult<String> {
-        Ok(route_command::<Option<u8>, _>(self, "RANDOMKEY", None).unwrap_or_default())
+    pub fn randomkey(&self) -> PyResult<PyObject> {
+        route_command::<_, OrDefault<String>>(self, "RANDOMKEY", &())
     }
 
-    /// Renames key to newkey. It returns "NO" when key does not exist. 
+    /// Renames key to newkey. It returns "" when key does not exist. 
     /// If newkey already exists it is overwritten, when this happens RENAME executes an implicit DEL operation, 
     /// so if the deleted key contains a very big value it may cause high latency 
     /// even if RENAME itself is usually a constant-time operation.
@@ -423,7 +537,9 @@ impl RedisClient {
     /// ===================
     /// `"OK"`: The key was renamed.
     /// 
-    /// `""`: The key does not exist.
+    /// With `no_overwrite`, `"1"` when the key was renamed, and `"0"` when newkey already exists.
+    /// 
+    /// `""`: The key does not exist. Pipelines and asynchronous clients raise Redis' `no such key` error instead.
     ///
     /// Time Complexity
     /// =============== 
@@ -432,9 +548,9 @@ impl RedisClient {
     /// [Read about RENAME in the Redis documentation.](https://redis.io/commands/rename)
     #[args(no_overwrite="**")]
     #[text_signature = "($self, key, newkey, *, no_overwrite)"]
-    pub fn rename(&mut self, key: &str, newkey: &str, no_overwrite: Option<&PyDict>) -> PyResult<String> {
-        let command = nx_x_decider("RENAME", "NX", no_overwrite);
-        Ok(route_command(self, &command, Some(&[key, newkey])).unwrap_or_default())
+    pub fn rename(&self, key: &str, newkey: &str, no_overwrite: Option<&PyDict>) -> PyResult<PyObject> {
+        let command = nx_x_decider("RENAME", "RENAMENX", no_overwrite);
+        route_command::<_, reply::Renamed>(self, command, &(key, newkey))
     }
 
     /// Returns the remaining time to live of a key that has a timeout. 
@@ -466,8 +582,8 @@ impl RedisClient {
     ///
     /// [Read about TTL in the Redis documentation.](https://redis.io/commands/ttl)
     #[text_signature = "($self, key, /)"]
-    pub fn ttl(&mut self, key: &str) -> PyResult<isize> {
-        Ok(route_command(self, "TTL", Some(key))?)
+    pub fn ttl(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, isize>(self, "TTL", key)
     }
 
     /// Returns the string representation of the type of the value stored at key. 
@@ -494,8 +610,8 @@ impl RedisClient {
     ///
     /// [Read about TYPE in the Redis documentation.](https://redis.io/commands/type)
     #[text_signature = "($self, key, /)"]
-    pub fn keytype(&mut self, key: &str) -> PyResult<String> {
-        Ok(route_command(self, "TYPE", Some(key))?)
+    pub fn keytype(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "TYPE", key)
     }
 
     /// This command is very similar to DEL: it removes the specified keys. 
@@ -529,8 +645,33 @@ impl RedisClient {
     /// [Read about UNLINK in the Redis documentation.](https://redis.io/commands/unlink)
     #[args(keys="*")]
     #[text_signature = "($self, *keys)"]
-    pub fn unlink(&mut self, keys: Vec<&PyAny>) -> PyResult<usize> {
-        let args = construct_vector(keys.len(), Cow::from(&keys))?;
-        Ok(route_command(self, "UNLINK", Some(args))?)
+    pub fn unlink(&self, keys: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "UNLINK", &keys)
+    }
+
+    /// Unlink the keys of an iterable, streamed in chunks. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `keys` - Any iterable of key names, such as a generator. 
+    /// 
+    /// `chunk_size` - The most keys sent in one UNLINK. Defaults to 1000. 
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.unlink_iter(f"session:{i}" for i in range(1_000_000))
+    /// ```
+    ///
+    /// Integer Reply
+    /// =============
+    /// The amount of keys that were removed, over every chunk. 
+    /// 
+    /// [Read about UNLINK in the Redis documentation.](https://redis.io/commands/unlink)
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, keys, chunk_size=1000)"]
+    pub fn unlink_iter(&self, keys: &PyAny, chunk_size: usize) -> PyResult<PyObject> {
+        stream::stream_command::<usize>(self, "UNLINK", None, keys, false, chunk_size, stream::Aggregate::Sum)
     }
 }
\ No newline at end of file
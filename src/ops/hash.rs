@@ -26,11 +26,8 @@ impl RedisClient {
     /// [Read about HDEL in the Redis documentation.](https://redis.io/commands/hdel)
     #[args(fields="*")]
     #[text_signature = "($self, key, fields, /)"]
-    pub fn hdel(&mut self, key: String, fields: Vec<&PyAny>) -> PyResult<usize> {
-        let mut arguments = construct_vector(fields.len() + 1, Cow::from(&fields))?;
-        arguments.insert(0, key);
-        
-        Ok(route_command(self, "HDEL", Some(arguments))?)
+    pub fn hdel(&self, key: &str, fields: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "HDEL", &(key, fields))
     }
 
     /// Returns if field is an existing field in the hash stored at key.
@@ -54,8 +51,8 @@ impl RedisClient {
     /// 
     /// [Read about HEXISTS in the Redis documentation.](https://redis.io/commands/hexists)
     #[text_signature = "($self, key, field, /)"]
-    pub fn hexists(&mut self, key: &str, field: &str) -> PyResult<u8> {
-        Ok(route_command(self, "HEXISTS", Some(&[key, field]))?)
+    pub fn hexists(&self, key: &str, field: &str) -> PyResult<PyObject> {
+        route_command::<_, u8>(self, "HEXISTS", &(key, field))
     }
 
     /// Returns the value associated with field in the hash stored at key.
@@ -78,33 +75,72 @@ impl RedisClient {
     /// 
     /// [Read about HGET in the Redis documentation.](https://redis.io/commands/hget)
     #[text_signature = "($self, key, field, /)"]
-    pub fn hget(&mut self, key: &str, field: &str) -> PyResult<String> {
-        Ok(route_command(self, "HGET", Some(&[key, field]))?)
+    pub fn hget(&self, key: &str, field: &str) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "HGET", &(key, field))
     }
 
-    /// Returns all fields and values of the hash stored at key. 
-    /// In the returned value, every field name is followed by its value, 
-    /// so the length of the reply is twice the size of the hash.
+    /// Returns all fields and values of the hash stored at key, as a dictionary. 
     /// 
     /// # Arguments: 
     /// * `key` - The name of the key. 
+    /// * `flat` - Return a list in which every field name is followed by its value instead. Defaults to False. 
     /// 
     /// # Example: 
     /// ```python
     /// client = RedisClient("url")
-    /// client.hgetall("key")
+    /// client.hset("key", {"name": "value"})
+    /// client.hgetall("key") == {"name": "value"}
+    /// client.hgetall("key", flat=True) == ["name", "value"]
     /// ```
     /// 
     /// # Array Reply: 
-    /// * A list of fields and their values stored in the hash, or an empty list when key does not exist.
+    /// * A dictionary of the fields and their values stored in the hash, or an empty dictionary when key does not exist.
     /// 
     /// # Time Complexity: 
     /// * O(n) : Where n = the size of the hash.
     /// 
     /// [Read about HGETALL in the Redis documentation.](https://redis.io/commands/hgetall)
-    #[text_signature = "($self, key, /)"]
-    pub fn hgetall(&mut self, key: &str) -> PyResult<Vec<String>> {
-        Ok(route_command(self, "HGETALL", Some(key))?)
+    #[args(flat="false")]
+    #[text_signature = "($self, key, flat=False)"]
+    pub fn hgetall(&self, key: &str, flat: bool) -> PyResult<PyObject> {
+        if flat {
+            route_command::<_, Vec<String>>(self, "HGETALL", key)
+        } else {
+            route_command::<_, reply::Dict>(self, "HGETALL", key)
+        }
+    }
+
+    /// Iterate over the fields and values of a hash without pulling it whole, unlike `hgetall`. 
+    /// Pairs are requested a page at a time with HSCAN, and only one page is held at once. 
+    /// 
+    /// # Arguments: 
+    /// * `key` - The name of the key. 
+    /// * `pattern` - Only fields matching this glob-style pattern. 
+    /// * `count` - A hint of how many fields Redis looks at for each page. Redis defaults to 10. 
+    /// * `deduplicate` - Whether to skip fields returned before. Every field returned is remembered to do so. Defaults to False. 
+    /// * `prefetch` - Whether to request the next page while the current one is being iterated over. Defaults to False. 
+    /// 
+    /// # Example: 
+    /// ```python
+    /// client = RedisClient("url")
+    /// 
+    /// for field, value in client.hscan_iter("key", count=1000):
+    ///     print(field, value)
+    /// ```
+    /// 
+    /// # Returns: 
+    /// * An iterator of `(field, value)` tuples. 
+    /// 
+    /// [Read about HSCAN in the Redis documentation.](https://redis.io/commands/hscan)
+    #[args("*", pattern="None", count="None", deduplicate="false", prefetch="false")]
+    #[text_signature = "($self, key, *, pattern=None, count=None, deduplicate=False, prefetch=False)"]
+    pub fn hscan_iter(
+        &self, key: &str, pattern: Option<&str>, count: Option<usize>, deduplicate: bool, prefetch: bool
+    ) -> PyResult<Py<scan::ScanIter>> {
+        let gil = Python::acquire_gil();
+        let iterator = scan::ScanIter::new(self, "HSCAN", Some(key), pattern, count, deduplicate, prefetch)?;
+
+        Py::new(gil.python(), iterator)
     }
 
     /// Increments the number stored at field in the hash stored at key by increment. 
@@ -131,9 +167,8 @@ impl RedisClient {
     /// 
     /// [Read about HINCRBY in the Redis documentation.](https://redis.io/commands/hincrby)
     #[text_signature = "($self, key, field, amount, /)"]
-    pub fn hincrby(&mut self, key: &str, field: &str, amount: i64) -> PyResult<isize> {
-        let amt = amount.to_string();
-        Ok(route_command(self, "HINCRBY", Some(&[key, field, &amt]))?)
+    pub fn hincrby(&self, key: &str, field: &str, amount: i64) -> PyResult<PyObject> {
+        route_command::<_, isize>(self, "HINCRBY", &(key, field, amount))
     }
 
     /// Increment the specified field of a hash stored at key, and representing a floating point number, 
@@ -165,15 +200,15 @@ impl RedisClient {
     /// 
     /// [Read about HINCRBY in the Redis documentation.](https://redis.io/commands/hincrby)
     #[text_signature = "($self, key, field, amount, /)"]
-    pub fn hincrbyfloat(&mut self, key: &str, field: &str, amount: f64) -> PyResult<f64> {
-        let amt = amount.to_string();
-        Ok(route_command(self, "HINCRBYFLOAT", Some(&[key, field, &amt]))?)
+    pub fn hincrbyfloat(&self, key: &str, field: &str, amount: f64) -> PyResult<PyObject> {
+        route_command::<_, f64>(self, "HINCRBYFLOAT", &(key, field, amount))
     }
 
     /// Returns all field names in the hash stored at key.
     /// 
     /// # Arguments: 
     /// * `key` - The name of the key. 
+    /// * `lazy` - Return a `LazyReply` instead, converting elements only when they are accessed. 
     /// 
     /// # Example: 
     /// ```python
@@ -188,9 +223,14 @@ impl RedisClient {
     /// * O(n) : Where n = the size of the hash.
     /// 
     /// [Read about HKEYS in the Redis documentation.](https://redis.io/commands/hkeys)
-    #[text_signature = "($self, key, /)"]
-    pub fn hkeys(&mut self, key: &str) -> PyResult<Vec<String>> {
-        Ok(route_command(self, "HKEYS", Some(key))?)
+    #[args(lazy="false")]
+    #[text_signature = "($self, key, lazy=False)"]
+    pub fn hkeys(&self, key: &str, lazy: bool) -> PyResult<PyObject> {
+        if lazy {
+            route_command::<_, reply::Lazy>(self, "HKEYS", key)
+        } else {
+            route_command::<_, Vec<String>>(self, "HKEYS", key)
+        }
     }
 
     /// Returns the number of fields contained in the hash stored at key.
@@ -212,8 +252,8 @@ impl RedisClient {
     /// 
     /// [Read about HLEN in the Redis documentation.](https://redis.io/commands/hlen)
     #[text_signature = "($self, key, /)"]
-    pub fn hlen(&mut self, key: &str) -> PyResult<usize> {
-        Ok(route_command(self, "HLEN", Some(key))?)
+    pub fn hlen(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "HLEN", key)
     }
 
     /// Returns the values associated with the specified fields in the hash stored at key.
@@ -224,11 +264,13 @@ impl RedisClient {
     /// # Arguments: 
     /// * `key` - The name of the key. 
     /// * `fields` - The name(s) of the fields. Passed as rest arguments. 
+    /// * `dtype` - Return a NumPy array of `int64` or `float64` instead, parsed in Rust. Nil values become `-2**63` or NaN. 
     /// 
     /// # Example: 
     /// ```python
     /// client = RedisClient("url")
     /// client.hmget("key", "field", "field2")
+    /// client.hmget("counters", "views", "clicks", dtype="int64")
     /// ```
     /// 
     /// # Array Reply: 
@@ -238,13 +280,10 @@ impl RedisClient {
     /// * O(n) : Where n = the number of fields being requested.
     /// 
     /// [Read about HMGET in the Redis documentation.](https://redis.io/commands/hmget)
-    #[args(fields="*")]
-    #[text_signature = "($self, key, fields, /)"]
-    pub fn hmget(&mut self, key: String, fields: Vec<&PyAny>) -> PyResult<Vec<String>> {
-        let mut arguments = construct_vector(fields.len() + 1, Cow::from(&fields))?;
-        arguments.insert(0, key);
-
-        Ok(route_command(self, "HMGET", Some(arguments))?)
+    #[args(fields="*", dtype="None")]
+    #[text_signature = "($self, key, *fields, dtype=None)"]
+    pub fn hmget(&self, key: &str, fields: &PyTuple, dtype: Option<&PyAny>) -> PyResult<PyObject> {
+        reply::route_array(self, "HMGET", &(key, fields), dtype)
     }
 
     /// Sets field in the hash stored at key to value. 
@@ -275,18 +314,32 @@ impl RedisClient {
     /// [Read about HSET in the Redis documentation.](https://redis.io/commands/hset)
     #[args(no_overwrite="**")]
     #[text_signature = "($self, key, fields, *, no_overwrite)"]
-    pub fn hset(&mut self, key: String, fields: HashMap<String, &PyAny>, no_overwrite: Option<&PyDict>) -> PyResult<usize> {
-        let command = nx_x_decider("HSET", "NX", no_overwrite);
-        let mut args = Vec::with_capacity((fields.len() * 2) + 1);
-            
-        args.push(key);
-
-        for (key, value) in fields.iter() {
-            args.push(key.to_string());
-            args.push(value.to_string());
-        }   
+    pub fn hset(&self, key: &str, fields: &PyDict, no_overwrite: Option<&PyDict>) -> PyResult<PyObject> {
+        let command = nx_x_decider("HSET", "HSETNX", no_overwrite);
+        route_command::<_, usize>(self, command, &(key, fields))
+    }
 
-        Ok(route_command(self, &command, Some(args))?)
+    /// Sets fields in the hash stored at key from a dictionary or an iterable of pairs, streamed in chunks. 
+    /// 
+    /// # Arguments: 
+    /// * `key` - The name of the key. 
+    /// * `fields` - A dictionary, or any iterable of `(field, value)` pairs, such as a generator. 
+    /// * `chunk_size` - The most fields sent in one HSET. Defaults to 1000. 
+    /// 
+    /// # Example: 
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.hset_iter("key", ((f"field:{i}", i) for i in range(1_000_000)))
+    /// ```
+    /// 
+    /// # Integer Reply:
+    /// * The number of fields that were added, over every chunk. 
+    /// 
+    /// [Read about HSET in the Redis documentation.](https://redis.io/commands/hset)
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, key, fields, chunk_size=1000)"]
+    pub fn hset_iter(&self, key: &str, fields: &PyAny, chunk_size: usize) -> PyResult<PyObject> {
+        stream::stream_command::<usize>(self, "HSET", Some(key), fields, true, chunk_size, stream::Aggregate::Sum)
     }
 
     /// Returns the string length of the value associated with field in the hash stored at key. 
@@ -310,14 +363,15 @@ impl RedisClient {
     /// 
     /// [Read about HSTRLEN in the Redis Documentation.](https://redis.io/commands/hstrlen)
     #[text_signature = "($self, key, field, /)"]
-    pub fn hstrlen(&mut self, key: &str, field: &str) -> PyResult<usize> {
-        Ok(route_command(self, "HSTRLEN", Some(&[key, field]))?)
+    pub fn hstrlen(&self, key: &str, field: &str) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "HSTRLEN", &(key, field))
     }
 
     /// Returns all values in the hash stored at key.
     /// 
     /// # Arguments: 
     /// * `key` - The name of the key. 
+    /// * `dtype` - Return a NumPy array of `int64` or `float64` instead, parsed in Rust. Nil values become `-2**63` or NaN. 
     /// 
     /// # Example: 
     /// ```
@@ -332,8 +386,9 @@ impl RedisClient {
     /// * O(n) : Where n = the size of the hash.
     /// 
     /// [Read more about HVALS in the Redis documentation.](https://redis.io/commands/hvals)
-    #[text_signature = "($self, key, /)"]
-    pub fn hvals(&mut self, key: &str) -> PyResult<Vec<String>> {
-        Ok(route_command(self, "HVALS", Some(key))?)
+    #[args(dtype="None")]
+    #[text_signature = "($self, key, dtype=None)"]
+    pub fn hvals(&self, key: &str, dtype: Option<&PyAny>) -> PyResult<PyObject> {
+        reply::route_array(self, "HVALS", key, dtype)
     }
 }
\ No newline at end of file
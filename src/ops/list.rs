@@ -33,11 +33,32 @@ impl RedisClient {
     /// [Read about RPUSH in the Redis documentation.](https://redis.io/commands/rpush)
     #[args(elements="*", no_overwrite="**")]
     #[text_signature = "($self, key, elements, *, no_overwrite)"]
-    pub fn rpush(&mut self, key: String, elements: Vec<&PyAny>, no_overwrite: Option<&PyDict>) -> PyResult<usize> {
-        let command = nx_x_decider("RPUSH", "X", no_overwrite);
-        let mut args = construct_vector(elements.len() + 1, Cow::from(&elements))?; 
-        args.insert(0, key);
-        Ok(route_command(self, &command, Some(args))?)
+    pub fn rpush(&self, key: &str, elements: &PyTuple, no_overwrite: Option<&PyDict>) -> PyResult<PyObject> {
+        let command = nx_x_decider("RPUSH", "RPUSHX", no_overwrite);
+        route_command::<_, usize>(self, command, &(key, elements))
+    }
+
+    /// Append the elements of an iterable to a list, streamed in chunks. 
+    /// 
+    /// # Arguments: 
+    /// * `key` - The name of the key. 
+    /// * `elements` - Any iterable of elements, such as a generator. 
+    /// * `chunk_size` - The most elements sent in one RPUSH. Defaults to 1000. 
+    /// 
+    /// # Example: 
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.rpush_iter("key", (line for line in open("log.txt")))
+    /// ```
+    /// 
+    /// # Integer Reply: 
+    /// The length of the list after the last chunk has been pushed. 
+    /// 
+    /// [Read about RPUSH in the Redis documentation.](https://redis.io/commands/rpush)
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, key, elements, chunk_size=1000)"]
+    pub fn rpush_iter(&self, key: &str, elements: &PyAny, chunk_size: usize) -> PyResult<PyObject> {
+        stream::stream_command::<usize>(self, "RPUSH", Some(key), elements, false, chunk_size, stream::Aggregate::Last)
     }
 
     /// Insert all the specified values at the start of the list stored at key. 
@@ -70,11 +91,33 @@ impl RedisClient {
     /// [Read about LPUSH in the Redis documentation.](https://redis.io/commands/lpush)
     #[args(elements="*", no_overwrite="**")]
     #[text_signature = "($self, key, elements, *, no_overwrite)"]
-    pub fn lpush(&mut self, key: String, elements: Vec<&PyAny>, no_overwrite: Option<&PyDict>) -> PyResult<usize> {
-        let command = nx_x_decider("LPUSH", "X", no_overwrite);
-        let mut args = construct_vector(elements.len() + 1, Cow::from(&elements))?;
-        args.insert(0, key);
-        Ok(route_command(self, &command, Some(args))?)
+    pub fn lpush(&self, key: &str, elements: &PyTuple, no_overwrite: Option<&PyDict>) -> PyResult<PyObject> {
+        let command = nx_x_decider("LPUSH", "LPUSHX", no_overwrite);
+        route_command::<_, usize>(self, command, &(key, elements))
+    }
+
+    /// Prepend the elements of an iterable to a list, streamed in chunks. 
+    /// Like LPUSH, the last element ends up first. 
+    /// 
+    /// # Arguments: 
+    /// * `key` - The name of the key. 
+    /// * `elements` - Any iterable of elements, such as a generator. 
+    /// * `chunk_size` - The most elements sent in one LPUSH. Defaults to 1000. 
+    /// 
+    /// # Example: 
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.lpush_iter("key", range(1_000_000))
+    /// ```
+    /// 
+    /// # Integer Reply: 
+    /// The length of the list after the last chunk has been pushed. 
+    /// 
+    /// [Read about LPUSH in the Redis documentation.](https://redis.io/commands/lpush)
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, key, elements, chunk_size=1000)"]
+    pub fn lpush_iter(&self, key: &str, elements: &PyAny, chunk_size: usize) -> PyResult<PyObject> {
+        stream::stream_command::<usize>(self, "LPUSH", Some(key), elements, false, chunk_size, stream::Aggregate::Last)
     }
 
     /// Returns the element at index index in the list stored at key.
@@ -100,9 +143,8 @@ impl RedisClient {
     /// 
     /// [Read about LINDEX in the Redis documentation.](https://redis.io/commands/lindex)
     #[text_signature = "($self, key, index, /)"]
-    pub fn lindex(&mut self, key: &str, index: isize) -> PyResult<String> {
-        let ind = index.to_string();
-        Ok(route_command(self, "LINDEX", Some(&[key, &ind]))?)
+    pub fn lindex(&self, key: &str, index: isize) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "LINDEX", &(key, index))
     }
 
     /// Inserts element in the list stored at key either before or after the reference value pivot.
@@ -126,8 +168,8 @@ impl RedisClient {
     /// 
     /// [Read about LINSERT in the Redis documentation.](https://redis.io/commands/linsert)
     #[text_signature = "($self, key, element, /)"]
-    pub fn linsert(&mut self, key: &str, element: &str) -> PyResult<isize> {
-        Ok(route_command(self, "LINSERT", Some(&[key, element]))?)
+    pub fn linsert(&self, key: &str, element: &str) -> PyResult<PyObject> {
+        route_command::<_, isize>(self, "LINSERT", &(key, element))
     }
 
     /// Returns the length of the list stored at key. 
@@ -152,8 +194,8 @@ impl RedisClient {
     /// 
     /// [Read about LLEN in the Redis documentation.](https://redis.io/commands/llen)
     #[text_signature = "($self, key, /)"]
-    pub fn llen(&mut self, key: &str) -> PyResult<isize> {
-        Ok(route_command(self, "LLEN", Some(key))?)
+    pub fn llen(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, isize>(self, "LLEN", key)
     }
 
     /// Removes and returns the first element of the list stored at key.
@@ -175,8 +217,8 @@ impl RedisClient {
     /// 
     /// [Read about LPOP in the Redis documentation.](https://redis.io/commands/lpop)
     #[text_signature = "($self, key, /)"]
-    pub fn lpop(&mut self, key: &str) -> PyResult<String> {
-        Ok(route_command(self, "LPOP", Some(key))?)
+    pub fn lpop(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "LPOP", key)
     }
 
     // TODO: Improve documentation. Specifially, time complexities.
@@ -193,10 +235,8 @@ impl RedisClient {
     /// 
     /// [Read about LSET in the Redis documentation.](https://redis.io/commands/lset)
     #[text_signature = "($self, key, index, element, /)"]
-    pub fn lset(&mut self, key: &str, index: usize, element: &PyAny) -> PyResult<String> {
-        let ind = index.to_string();
-        let elem = element.to_string();
-        Ok(route_command(self, "LSET", Some(&[key, &ind, &elem]))?)
+    pub fn lset(&self, key: &str, index: usize, element: &PyAny) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "LSET", &(key, index, element))
     }
 
     /// Get a range of elements from a list. 
@@ -205,17 +245,26 @@ impl RedisClient {
     /// * `key` - The name of the key. 
     /// * `beginning` - The starting index. 
     /// * `end` - The ending index.
+    /// * `dtype` - Return a NumPy array of `int64` or `float64` instead, parsed in Rust. Nil values become `-2**63` or NaN. 
+    /// * `lazy` - Return a `LazyReply` instead, converting elements only when they are accessed. Cannot be combined with `dtype`. 
     /// 
     /// # Array reply: 
     /// A list of the elements, or an empty list if the key was not a list,
     /// was an empty list, or the beginning/end was an invalid index.
     /// 
     /// [Read about LRANGE on the Redis documentation.](https://redis.io/commands/lrange)
-    #[text_signature = "($self, key, beginning, end, /)"]
-    pub fn lrange(&mut self, key: &str, beginning: usize, end: usize) -> PyResult<Vec<String>> {
-        let start = beginning.to_string();
-        let stop = end.to_string();
-        Ok(route_command(self, "LRANGE", Some(&[key, &start, &stop]))?)
+    #[args(dtype="None", lazy="false")]
+    #[text_signature = "($self, key, beginning, end, dtype=None, lazy=False)"]
+    pub fn lrange(&self, key: &str, beginning: usize, end: usize, dtype: Option<&PyAny>, lazy: bool) -> PyResult<PyObject> {
+        if lazy && dtype.is_some() {
+            return exceptions::ValueError::into("dtype and lazy cannot be combined");
+        }
+
+        if lazy {
+            route_command::<_, reply::Lazy>(self, "LRANGE", &(key, beginning, end))
+        } else {
+            reply::route_array(self, "LRANGE", &(key, beginning, end), dtype)
+        }
     }
 
     /// Remove elements from the left side of a list. 
@@ -238,12 +287,8 @@ impl RedisClient {
     /// [Read about LREM on the Redis documentation.](https://redis.io/commands/lrem)
     #[args(elems="*")]
     #[text_signature = "($self, key, amt, elems, /)"]
-    pub fn lrem(&mut self, key: String, amt: usize, elems: Vec<&PyAny>) -> PyResult<usize> {
-        let mut arguments = construct_vector(elems.len() + 2, Cow::from(&elems))?;
-        arguments.insert(0, amt.to_string());
-        arguments.insert(0, key);
-
-        Ok(route_command(self, "LREM", Some(arguments))?)
+    pub fn lrem(&self, key: &str, amt: usize, elems: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "LREM", &(key, amt, elems))
     }
 
     /// Trim a list to the specified range. 
@@ -265,10 +310,8 @@ impl RedisClient {
     /// 
     /// [Read about LTRIM on the Redis documentation.](https://redis.io/commands/ltrim)
     #[text_signature = "($self, key, beginning, end, /)"]
-    pub fn ltrim(&mut self, key: &str, beginning: isize, end: isize) -> PyResult<usize> {
-        let stop = end.to_string();
-        let start = beginning.to_string();
-        Ok(route_command(self, "LTRIM", Some(&[key, &start, &stop]))?)
+    pub fn ltrim(&self, key: &str, beginning: isize, end: isize) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "LTRIM", &(key, beginning, end))
     }
 
     /// Remove and return the last element in a list. 
@@ -288,8 +331,8 @@ impl RedisClient {
     /// 
     /// [Read about RPOP in the Redis documentation.](https://redis.io/commands/rpop)
     #[text_signature = "($self, key, /)"]
-    pub fn rpop(&mut self, key: &str) -> PyResult<String> {
-        Ok(route_command(self, "RPOP", Some(key))?)
+    pub fn rpop(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "RPOP", key)
     }
 
     /// Get the elements of a list. 
@@ -298,20 +341,67 @@ impl RedisClient {
     /// =========
     /// `key` - The name of the key that has the list. 
     /// 
+    /// `dtype` - Return a NumPy array of `int64` or `float64` instead, parsed in Rust. Nil values become `-2**63` or NaN. 
+    /// 
+    /// `lazy` - Return a `LazyReply` instead, converting elements only when they are accessed. Cannot be combined with `dtype`. 
+    /// 
     /// Example 
     /// =======
     /// ```python
     /// client.rpush("key", 1, 2, 3, 4, 5)
     /// client.lelements("key") == ["1", "2", "3", "4", "5"]
+    /// client.lelements("key", dtype="float64").sum() == 15.0
     /// ```
     /// 
     /// Array Reply
     /// ===========
     /// The elements from the list. 
-    #[text_signature = "($self, key, /)"]
-    pub fn lelements(&mut self, key: &str) -> PyResult<Vec<String>> {
-        let stop = self.llen(key)?.to_string();
-        Ok(route_command(self, "LRANGE", Some(&[key, "0", &stop]))?)
+    #[args(dtype="None", lazy="false")]
+    #[text_signature = "($self, key, dtype=None, lazy=False)"]
+    pub fn lelements(&self, key: &str, dtype: Option<&PyAny>, lazy: bool) -> PyResult<PyObject> {
+        if lazy && dtype.is_some() {
+            return exceptions::ValueError::into("dtype and lazy cannot be combined");
+        }
+
+        if lazy {
+            route_command::<_, reply::Lazy>(self, "LRANGE", &(key, "0", "-1"))
+        } else {
+            reply::route_array(self, "LRANGE", &(key, "0", "-1"), dtype)
+        }
+    }
+
+    /// Iterate over the elements of a list without pulling it whole, unlike `lelements`. 
+    /// Elements are requested a window of LRANGE at a time, and only one window is held at once. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `key` - The name of the key that has the list. 
+    /// 
+    /// `chunk_size` - The most elements requested in one LRANGE. Defaults to 1000. 
+    /// 
+    /// Example 
+    /// =======
+    /// ```python
+    /// for entry in client.iter_list("feed", chunk_size=5000):
+    ///     print(entry)
+    /// ```
+    /// 
+    /// Returns
+    /// =======
+    /// An iterator of the elements, from the head of the list. 
+    /// 
+    /// Note
+    /// ====
+    /// Windows are requested by index, so elements pushed to or popped from the head while iterating shift the windows after them. 
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, key, chunk_size=1000)"]
+    pub fn iter_list(&self, key: &str, chunk_size: usize) -> PyResult<Py<scan::RangeIter>> {
+        self.require_direct("iter_list", Some(chunk_size))?;
+
+        let gil = Python::acquire_gil();
+        let iterator = scan::RangeIter::new(self, key, chunk_size);
+
+        Py::new(gil.python(), iterator)
     }
 
     /// Remove the last element in a list, prepend it to another list and return it.
@@ -325,7 +415,7 @@ impl RedisClient {
     /// 
     /// [Read about RPOPLPUSH in the Redis documentation.](https://redis.io/commands/rpoplpush)
     #[text_signature = "($self, source, destination, /)"]
-    pub fn rpoplpush(&mut self, source: &str, destination: &str) -> PyResult<String> {
-        Ok(route_command(self, "RPOPLPUSH", Some(&[source, destination]))?)
+    pub fn rpoplpush(&self, source: &str, destination: &str) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "RPOPLPUSH", &(source, destination))
     }
 }
\ No newline at end of file
@@ -23,11 +23,33 @@ impl RedisClient {
     /// [Read about SADD in the Redis documentation.](https://redis.io/commands/sadd)
     #[args(members="*")]
     #[text_signature = "($self, key, members, /)"]
-    pub fn sadd(&mut self, key: String, members: Vec<&PyAny>) -> PyResult<usize> {
-        let mut mems = construct_vector(members.len() + 1, Cow::from(&members))?;
-        mems.insert(0, key);
+    pub fn sadd(&self, key: &str, members: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "SADD", &(key, members))
+    }
 
-        Ok(route_command(self, "SADD", Some(mems))?)
+    /// Add the members of an iterable to a set, streamed in chunks. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `key` - The name of the key. 
+    /// `members` - Any iterable of members, such as a generator. 
+    /// `chunk_size` - The most members sent in one SADD. Defaults to 1000. 
+    /// 
+    /// Example
+    /// =======
+    /// ```python
+    /// client.sadd_iter("key", range(10_000_000))
+    /// ```
+    /// 
+    /// Integer Reply
+    /// =============
+    /// The amount of members added to the set, over every chunk. 
+    /// 
+    /// [Read about SADD in the Redis documentation.](https://redis.io/commands/sadd)
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, key, members, chunk_size=1000)"]
+    pub fn sadd_iter(&self, key: &str, members: &PyAny, chunk_size: usize) -> PyResult<PyObject> {
+        stream::stream_command::<usize>(self, "SADD", Some(key), members, false, chunk_size, stream::Aggregate::Sum)
     }
 
     /// Get the amount of members in a set. 
@@ -49,8 +71,8 @@ impl RedisClient {
     /// 
     /// [Read about SCARD in the Redis documentation.](https://redis.io/commands/scard)
     #[text_signature = "($self, key, /)"]
-    pub fn scard(&mut self, key: &str) -> PyResult<usize> {
-        Ok(route_command(self, "SCARD", Some(key))?)
+    pub fn scard(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "SCARD", key)
     }
 
     /// Subtract two or more sets. 
@@ -58,6 +80,7 @@ impl RedisClient {
     /// Arguments
     /// =========
     /// `keys` - Key names of all the sets. Passed as rest arguments. 
+    /// `as_list` - Return a list instead of a set. Defaults to False. 
     /// 
     /// Example
     /// =======
@@ -65,19 +88,22 @@ impl RedisClient {
     /// client.sadd("key1", 1, 2, 3, 4, 5)
     /// client.sadd("key2", 1, 2, 3)
     /// 
-    /// client.sdiff("key1", "key2") == ["4", "5"]
+    /// client.sdiff("key1", "key2") == {"4", "5"}
     /// ```
     /// 
     /// Array Reply
     /// ===========
-    /// The difference between all of the sets.
+    /// The difference between all of the sets, as a set.
     /// 
     /// [Read about SDIFF in the Redis documentation.](https://redis.io/commands/sdiff)
-    #[args(keys="*")]
-    #[text_signature = "($self, keys, /)"]
-    pub fn sdiff(&mut self, keys: Vec<&PyAny>) -> PyResult<Vec<String>> {
-        let arguments = construct_vector(keys.len(), Cow::from(&keys))?;
-        Ok(route_command(self, "SDIFF", Some(arguments))?)
+    #[args(keys="*", as_list="false")]
+    #[text_signature = "($self, *keys, as_list=False)"]
+    pub fn sdiff(&self, keys: &PyTuple, as_list: bool) -> PyResult<PyObject> {
+        if as_list {
+            route_command::<_, Vec<String>>(self, "SDIFF", &keys)
+        } else {
+            route_command::<_, reply::Set>(self, "SDIFF", &keys)
+        }
     }
 
     /// Subtract two or more sets and store the resulting set in a key. 
@@ -106,10 +132,8 @@ impl RedisClient {
     /// [Read about SDIFFSTORE in the Redis documentation.](https://redis.io/commands/sdiffstore)
     #[args(keys="*")]
     #[text_signature = "($self, destination, keys, /)"]
-    pub fn sdiffstore(&mut self, destination: String, keys: Vec<&PyAny>) -> PyResult<usize> {
-        let mut args = construct_vector(keys.len() + 1, Cow::from(&keys))?;
-        args.insert(0, destination);
-        Ok(route_command(self, "SDIFFSTORE", Some(args))?)
+    pub fn sdiffstore(&self, destination: &str, keys: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "SDIFFSTORE", &(destination, keys))
     }
 
     /// Intersect two or more sets. 
@@ -117,25 +141,29 @@ impl RedisClient {
     /// Arguments
     /// =========
     /// `keys` - The sets to intersect. Passed as rest arguments. 
+    /// `as_list` - Return a list instead of a set. Defaults to False. 
     /// 
     /// Example
     /// =======
     /// ```python
     /// client.sadd("a", 1, 2, 3, 4)
     /// client.sadd("b", 4, 5, 6, 7)
-    /// client.sinter("a", "b") == ["4"]
+    /// client.sinter("a", "b") == {"4"}
     /// ```
     /// 
     /// Array Reply
     /// ===========
-    /// The intersected set, or an empty array if the sets had no members in common. 
+    /// The intersected set, or an empty set if the sets had no members in common. 
     /// 
     /// [Read about SINTER in the Redis documentation.](https://redis.io/commands/sinter)
-    #[args(keys="*")]
-    #[text_signature = "($self, keys, /)"]
-    pub fn sinter(&mut self, keys: Vec<&PyAny>) -> PyResult<Vec<String>> {
-        let args = construct_vector(keys.len(), Cow::from(&keys))?;
-        Ok(route_command(self, "SINTER", Some(args))?)
+    #[args(keys="*", as_list="false")]
+    #[text_signature = "($self, *keys, as_list=False)"]
+    pub fn sinter(&self, keys: &PyTuple, as_list: bool) -> PyResult<PyObject> {
+        if as_list {
+            route_command::<_, Vec<String>>(self, "SINTER", &keys)
+        } else {
+            route_command::<_, reply::Set>(self, "SINTER", &keys)
+        }
     }
 
     /// Intersect two or more sets and store the resulting set in `destination`. 
@@ -161,11 +189,8 @@ impl RedisClient {
     /// [Read about SINTERSTORE in the Redis documentation.](https://redis.io/commands/sinter)
     #[args(keys="*")]
     #[text_signature = "($self, destination, keys, /)"]
-    pub fn sinterstore(&mut self, destination: String, keys: Vec<&PyAny>) -> PyResult<Vec<String>> {
-        let mut args = Vec::with_capacity(keys.len() + 1);
-        args.push(destination);
-        args.extend(construct_vector(keys.len(), Cow::from(&keys))?.into_iter());
-        Ok(route_command(self, "SINTERSTORE", Some(args))?)
+    pub fn sinterstore(&self, destination: &str, keys: &PyTuple) -> PyResult<PyObject> {
+        route_command::<_, Vec<String>>(self, "SINTERSTORE", &(destination, keys))
     }
 
     /// Determine if a given value is a member of a set. 
@@ -192,9 +217,8 @@ impl RedisClient {
     /// 
     /// [Read about SISMEMBER in the Redis documentation.](https://redis.io/commands/sismember)
     #[text_signature = "($self, key, member, /)"]
-    pub fn sismember(&mut self, key: &str, member: &PyAny) -> PyResult<u8> {
-        let mem = member.to_string();
-        Ok(route_command(self, "SISMEMBER", Some(&[key, &mem]))?)
+    pub fn sismember(&self, key: &str, member: &PyAny) -> PyResult<PyObject> {
+        route_command::<_, u8>(self, "SISMEMBER", &(key, member))
     }
 
     /// Get all of the members in a set. 
@@ -202,22 +226,65 @@ impl RedisClient {
     /// Arguments
     /// =========
     /// `key` - The name of the key with the set. 
+    /// `as_list` - Return a list instead of a set. Defaults to False. 
+    /// `lazy` - Return a `LazyReply` instead, converting members only when they are accessed. Defaults to False. 
     /// 
     /// Example
     /// =======
     /// ```python
     /// client.sadd("a", "hello", "world")
-    /// client.smembers("a") == ["hello", "world"]
+    /// client.smembers("a") == {"hello", "world"}
     /// ```
     /// 
     /// Array Reply
     /// ===========
-    /// The members in the set. 
+    /// The members in the set, as a set. 
     /// 
     /// [Read about SMEMBERS in the Redis documentation.](https://redis.io/commands/smembers)
-    #[text_signature = "($self, key, /)"]
-    pub fn smembers(&mut self, key: &str) -> PyResult<Vec<String>> {
-        Ok(route_command(self, "SMEMBERS", Some(key))?)
+    #[args(as_list="false", lazy="false")]
+    #[text_signature = "($self, key, as_list=False, lazy=False)"]
+    pub fn smembers(&self, key: &str, as_list: bool, lazy: bool) -> PyResult<PyObject> {
+        if lazy {
+            route_command::<_, reply::Lazy>(self, "SMEMBERS", key)
+        } else if as_list {
+            route_command::<_, Vec<String>>(self, "SMEMBERS", key)
+        } else {
+            route_command::<_, reply::Set>(self, "SMEMBERS", key)
+        }
+    }
+
+    /// Iterate over the members of a set without pulling it whole, unlike `smembers`. 
+    /// Members are requested a page at a time with SSCAN, and only one page is held at once. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `key` - The name of the key with the set. 
+    /// `pattern` - Only members matching this glob-style pattern. 
+    /// `count` - A hint of how many members Redis looks at for each page. Redis defaults to 10. 
+    /// `deduplicate` - Whether to skip members returned before. Every member returned is remembered to do so. Defaults to False. 
+    /// `prefetch` - Whether to request the next page while the current one is being iterated over. Defaults to False. 
+    /// 
+    /// Example
+    /// =======
+    /// ```python
+    /// for member in client.sscan_iter("key", count=1000):
+    ///     print(member)
+    /// ```
+    /// 
+    /// Returns
+    /// =======
+    /// An iterator of members. 
+    /// 
+    /// [Read about SSCAN in the Redis documentation.](https://redis.io/commands/sscan)
+    #[args("*", pattern="None", count="None", deduplicate="false", prefetch="false")]
+    #[text_signature = "($self, key, *, pattern=None, count=None, deduplicate=False, prefetch=False)"]
+    pub fn sscan_iter(
+        &self, key: &str, pattern: Option<&str>, count: Option<usize>, deduplicate: bool, prefetch: bool
+    ) -> PyResult<Py<scan::ScanIter>> {
+        let gil = Python::acquire_gil();
+        let iterator = scan::ScanIter::new(self, "SSCAN", Some(key), pattern, count, deduplicate, prefetch)?;
+
+        Py::new(gil.python(), iterator)
     }
 
     /// Move a member from one set to another. 
@@ -247,8 +314,7 @@ impl RedisClient {
     /// 
     /// [Read about SMOVE in the Redis documentation.](https://redis.io/commands/smove)
     #[text_signature = "($self, source, destination, member, /)"]
-    pub fn smove(&mut self, source: &str, destination: &str, member: &PyAny) -> PyResult<u8> {
-        let mem = member.to_string();
-        Ok(route_command(self, "SMOVE", Some(&[source, destination, &mem]))?)
+    pub fn smove(&self, source: &str, destination: &str, member: &PyAny) -> PyResult<PyObject> {
+        route_command::<_, u8>(self, "SMOVE", &(source, destination, member))
     }
 }
\ No newline at end of file
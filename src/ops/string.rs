@@ -32,9 +32,8 @@ impl RedisClient {
     /// 
     /// [Read about APPEND in the Redis documentation.](https://redis.io/commands/append)
     #[text_signature = "($self, key, value, /)"]
-    pub fn append(&mut self, key: &str, value: &PyAny) -> PyResult<usize> {
-        let val = value.to_string();
-        Ok(route_command(self, "APPEND", Some(&[key, &val]))?)
+    pub fn append(&self, key: &str, value: &PyAny) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "APPEND", &(key, value))
     }
     
     /// Count the number of set bits (population counting) in a string. 
@@ -67,10 +66,8 @@ impl RedisClient {
     /// 
     /// [Read about BITCOUNT in the Redis documentation.](https://redis.io/commands/bitcount)
     #[text_signature = "($self, key, beginning, end, /)"]
-    pub fn bitcount(&mut self, key: &str, beginning: isize, end: isize) -> PyResult<usize> {
-        let start = beginning.to_string();
-        let stop = end.to_string();
-        Ok(route_command(self, "BITCOUNT", Some(&[key, &start, &stop]))?)
+    pub fn bitcount(&self, key: &str, beginning: isize, end: isize) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "BITCOUNT", &(key, beginning, end))
     }
 
     /// Get the value of key. If the key does not exist the special value nil is returned. 
@@ -99,8 +96,32 @@ impl RedisClient {
     /// 
     /// [Read about GET in the Redis documentation.](https://redis.io/commands/get)
     #[text_signature = "($self, key, /)"]
-    pub fn get(&mut self, key: &str) -> PyResult<String> {
-        Ok(route_command(self, "GET", Some(key)).unwrap_or_default())
+    pub fn get(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, OrDefault<String>>(self, "GET", key)
+    }
+
+    /// Get the value of key as a read-only `memoryview`, without copying or decoding it. 
+    /// The view owns the bytes read from Redis, so large values are held in memory once. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `key` - The name of the key. 
+    /// 
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// weights = numpy.frombuffer(client.get_buffer("model"), dtype=numpy.float32)
+    /// ```
+    /// 
+    /// Bulk String Reply
+    /// =================
+    /// A `memoryview` of the value, or None if the key does not exist. 
+    /// 
+    /// [Read about GET in the Redis documentation.](https://redis.io/commands/get)
+    #[text_signature = "($self, key, /)"]
+    pub fn get_buffer(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, reply::Buffer>(self, "GET", key)
     }
 
     /// Set key to hold the string value. 
@@ -113,26 +134,72 @@ impl RedisClient {
     /// 
     /// `value` - The string value of the key.
     /// 
-    /// `no_overwrite` - Set to False if the key shall be replaced in the case of a duplicate. Otherwise, True.
+    /// `ex` - Expire the key after this many seconds.
+    /// 
+    /// `px` - Expire the key after this many milliseconds.
+    /// 
+    /// `exat` - Expire the key at this Unix time, in seconds. Requires Redis 6.2.
+    /// 
+    /// `nx` - Only set the key if it does not already exist.
+    /// 
+    /// `xx` - Only set the key if it already exists.
+    /// 
+    /// `keepttl` - Keep the time to live of the key. Requires Redis 6.0.
+    /// 
+    /// `get` - Return the old value of the key instead of "OK". Requires Redis 6.2.
+    /// 
+    /// `no_overwrite` - The same as `nx`, but sent as SETNX when no other option is given. Prefer `nx`.
+    /// 
+    /// Only one of `ex`, `px`, `exat` and `keepttl` may be given, and only one of `nx` and `xx`.
     /// 
     /// Example
     /// =======
     /// ```python
     /// client = RedisClient("url")
-    /// client.set("my_key", "hello world!", no_overwrite=True)
+    /// client.sset("my_key", "hello world!", ex=60, nx=True) # Cache for a minute, unless already cached.
     /// ```
     /// 
     /// Simple String Reply
     /// ===================
     /// `"OK"`: SET was executed correctly. 
+    /// `None`: SET was not performed because of `nx` or `xx`. 
+    /// With `get`, the old value of the key, or None if it did not exist.
     /// 
     /// [Read about SET in the Redis documentation.](https://redis.io/commands/set)
-    #[args(no_overwrite="**")]
-    #[text_signature = "($self, name, value, *, no_overwrite=True)"]
-    pub fn sset(&mut self, key: &str, value: &PyAny, no_overwrite: Option<&PyDict>) -> PyResult<String> {
-        let val = value.to_string();
-        let command = nx_x_decider("SET", "NX", no_overwrite);
-        Ok(route_command(self, &command, Some(&[key, &val]))?)
+    #[args(
+        "*", ex="None", px="None", exat="None", 
+        nx="false", xx="false", keepttl="false", get="false", no_overwrite="false"
+    )]
+    #[text_signature = "($self, key, value, *, ex=None, px=None, exat=None, nx=False, xx=False, keepttl=False, get=False)"]
+    pub fn sset(
+        &self, key: &str, value: &PyAny, 
+        ex: Option<u64>, px: Option<u64>, exat: Option<u64>, 
+        nx: bool, xx: bool, keepttl: bool, get: bool, no_overwrite: bool
+    ) -> PyResult<PyObject> {
+        let expiry = match (ex, px, exat, keepttl) {
+            (None, None, None, false) => None,
+            (Some(seconds), None, None, false) => Some(("EX", seconds)),
+            (None, Some(milliseconds), None, false) => Some(("PX", milliseconds)),
+            (None, None, Some(timestamp), false) => Some(("EXAT", timestamp)),
+            (None, None, None, true) => None,
+            _ => return exceptions::ValueError::into("only one of ex, px, exat and keepttl may be given")
+        };
+
+        let condition = match (nx || no_overwrite, xx) {
+            (false, false) => None,
+            (true, false) => Some("NX"),
+            (false, true) => Some("XX"),
+            (true, true) => return exceptions::ValueError::into("only one of nx and xx may be given")
+        };
+
+        if no_overwrite && !nx && expiry.is_none() && !keepttl && !get {
+            return route_command::<_, String>(self, "SETNX", &(key, value));
+        }
+
+        let keepttl = if keepttl { Some("KEEPTTL") } else { None };
+        let get = if get { Some("GET") } else { None };
+
+        route_command::<_, Option<String>>(self, "SET", &(key, value, expiry, keepttl, condition, get))
     }
 
     /// Atomically sets key to value and returns the old value stored at key. 
@@ -166,9 +233,8 @@ impl RedisClient {
     /// 
     /// [Read about GETSET in the Redis documentation.](https://redis.io/commands/getset)
     #[text_signature = "($self, key, value, /)"]
-    pub fn getset(&mut self, key: &str, value: &PyAny) -> PyResult<String> {
-        let val = value.to_string();
-        Ok(route_command(self, "GETSET", Some(&[key, &val]))?)
+    pub fn getset(&self, key: &str, value: &PyAny) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "GETSET", &(key, value))
     }
 
     /// Decrements the number stored at key by one. 
@@ -197,8 +263,8 @@ impl RedisClient {
     /// 
     /// [Read about DECR in the Redis documentation.](https://redis.io/commands/decr)
     #[text_signature = "($self, key, /)"]
-    pub fn decr(&mut self, key: &str) -> PyResult<i64> {
-        Ok(route_command(self, "DECR", Some(key))?)
+    pub fn decr(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, i64>(self, "DECR", key)
     }
 
     /// Decrements the number stored at key by the amount.
@@ -229,9 +295,8 @@ impl RedisClient {
     /// 
     /// [Read about DECRBY in the Redis documentation.](https://redis.io/commands/decrby)
     #[text_signature = "($self, key, amount, /)"]
-    pub fn decrby(&mut self, key: &str, amount: usize) -> PyResult<isize> {
-        let amt = amount.to_string();
-        Ok(route_command(self, "DECRBY", Some(&[key, &amt]))?)
+    pub fn decrby(&self, key: &str, amount: usize) -> PyResult<PyObject> {
+        route_command::<_, isize>(self, "DECRBY", &(key, amount))
     }
 
     /// Increments the number stored at key by one. If the key does not exist, 
@@ -262,8 +327,8 @@ impl RedisClient {
     /// 
     /// [Read about INCR in the Redis documentation.](https://redis.io/commands/incr)
     #[text_signature = "($self, key, /)"]
-    pub fn incr(&mut self, key: &str) -> PyResult<isize> {
-        Ok(route_command(self, "INCR", Some(key))?)
+    pub fn incr(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, isize>(self, "INCR", key)
     }
 
     /// Increments the number stored at key by increment. 
@@ -294,9 +359,8 @@ impl RedisClient {
     /// 
     /// [Read about INCRBY in the Redis documentation.](https://redis.io/commands/incrby)
     #[text_signature = "($self, key, amount, /)"]
-    pub fn incrby(&mut self, key: &str, amount: usize) -> PyResult<isize> {
-        let amt = amount.to_string();
-        Ok(route_command(self, "INCRBY", Some(&[key, &amt]))?)
+    pub fn incrby(&self, key: &str, amount: usize) -> PyResult<PyObject> {
+        route_command::<_, isize>(self, "INCRBY", &(key, amount))
     } 
 
     /// Increment the string representing a floating point number stored at key by the specified increment. 
@@ -327,9 +391,8 @@ impl RedisClient {
     /// 
     /// [Read about INCRBYFLOAT in the Redis documentation.](https://redis.io/commands/incrbyfloat)
     #[text_signature = "($self, key, amount, /)"]
-    pub fn incrbyfloat(&mut self, key: &str, amount: f64) -> PyResult<String> {
-        let amt = amount.to_string();
-        Ok(route_command(self, "INCRBYFLOAT", Some(&[key, &amt]))?)
+    pub fn incrbyfloat(&self, key: &str, amount: f64) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "INCRBYFLOAT", &(key, amount))
     }
 
     /// Returns the substring of the string value stored at key, 
@@ -367,10 +430,35 @@ impl RedisClient {
     /// 
     /// [Read about GETRANGE in the Redis documentation.](https://redis.io/commands/getrange)
     #[text_signature = "($self, key, beginning, end, /)"]
-    pub fn getrange(&mut self, key: &str, beginning: usize, end: usize) -> PyResult<String> {
-        let start = beginning.to_string();
-        let stop = end.to_string();
-        Ok(route_command(self, "GETRANGE", Some(&[key, &start, &stop]))?)
+    pub fn getrange(&self, key: &str, beginning: usize, end: usize) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "GETRANGE", &(key, beginning, end))
+    }
+
+    /// Get a substring of the value of key as a read-only `memoryview`, without copying or decoding it. 
+    /// 
+    /// Arguments 
+    /// =========
+    /// `key` - The name of the key.
+    ///  
+    /// `beginning` - The starting index. Negative indexes count from the end. 
+    /// 
+    /// `end` - The ending index, inclusive. Negative indexes count from the end. 
+    /// 
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// header = client.getrange_buffer("blob", 0, 15)
+    /// ```
+    /// 
+    /// Bulk String Reply
+    /// ================= 
+    /// A `memoryview` of the substring. 
+    /// 
+    /// [Read about GETRANGE in the Redis documentation.](https://redis.io/commands/getrange)
+    #[text_signature = "($self, key, beginning, end, /)"]
+    pub fn getrange_buffer(&self, key: &str, beginning: isize, end: isize) -> PyResult<PyObject> {
+        route_command::<_, reply::Buffer>(self, "GETRANGE", &(key, beginning, end))
     }
 
     /// Returns the values of all specified keys.
@@ -381,11 +469,14 @@ impl RedisClient {
     /// =========
     /// `keys` - A list of keys, by name, to get.
     /// 
+    /// `dtype` - Return a NumPy array of `int64` or `float64` instead, parsed in Rust. Nil values become `-2**63` or NaN. 
+    /// 
     /// Example 
     /// =======
     /// ```python
     /// client = RedisClient("url")
     /// client.mget("key1", "key2", "key3")
+    /// client.mget("price:1", "price:2", dtype="float64")
     /// ```
     /// 
     /// Array Reply 
@@ -397,11 +488,10 @@ impl RedisClient {
     /// O(n) : Where n = the number of keys to retrieve.
     /// 
     /// [Read about MGET in the Redis documentation.](https://redis.io/commands/mget)
-    #[args(keys="*")]
-    #[text_signature = "($self, keys, /)"]
-    pub fn mget(&mut self, keys: Vec<&PyAny>) -> PyResult<Vec<String>> {
-        let skeys = construct_vector(keys.len(), Cow::from(&keys))?;
-        Ok(route_command(self, "MGET", Some(skeys))?)
+    #[args(keys="*", dtype="None")]
+    #[text_signature = "($self, *keys, dtype=None)"]
+    pub fn mget(&self, keys: &PyTuple, dtype: Option<&PyAny>) -> PyResult<PyObject> {
+        reply::route_array(self, "MGET", &keys, dtype)
     }
 
     /// Sets the given keys to their respective values. 
@@ -433,17 +523,36 @@ impl RedisClient {
     /// [Read about MSET in the Redis documentation.](https://redis.io/commands/mset)
     #[args(no_overwrite="**")]
     #[text_signature = "($self, keys, /)"]
-    pub fn mset(&mut self, keys: HashMap<&str, &PyAny>, no_overwrite: Option<&PyDict>) -> PyResult<String> {
-        let command = nx_x_decider("MSET", "NX", no_overwrite);
-
-        let mut arguments = Vec::with_capacity(keys.len() * 2);
-
-        for (key, value) in keys.iter() {
-            arguments.push(key.to_string());
-            arguments.push(value.to_string());
-        }
+    pub fn mset(&self, keys: &PyDict, no_overwrite: Option<&PyDict>) -> PyResult<PyObject> {
+        let command = nx_x_decider("MSET", "MSETNX", no_overwrite);
+        route_command::<_, String>(self, command, &keys)
+    }
 
-        Ok(route_command(self, &command, Some(arguments))?)
+    /// Sets keys to their values from a dictionary or an iterable of pairs, streamed in chunks. 
+    /// Unlike MSET, the keys are not all set atomically, only those of each chunk. 
+    /// 
+    /// Arguments
+    /// =========
+    /// `keys` - A dictionary, or any iterable of `(key, value)` pairs, such as a generator. 
+    /// 
+    /// `chunk_size` - The most keys sent in one MSET. Defaults to 1000. 
+    /// 
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.mset_iter((f"key:{i}", i) for i in range(1_000_000))
+    /// ```
+    /// 
+    /// Simple String Reply
+    /// ===================
+    /// `"OK"`: Every key was set. 
+    /// 
+    /// [Read about MSET in the Redis documentation.](https://redis.io/commands/mset)
+    #[args(chunk_size="1000")]
+    #[text_signature = "($self, keys, chunk_size=1000)"]
+    pub fn mset_iter(&self, keys: &PyAny, chunk_size: usize) -> PyResult<PyObject> {
+        stream::stream_command::<String>(self, "MSET", None, keys, true, chunk_size, stream::Aggregate::Last)
     }
 
     /// Set key to hold the string value and set key to timeout after a given number of seconds. 
@@ -479,10 +588,8 @@ impl RedisClient {
     /// 
     /// [Read about SETEX in the Redis documentation.](https://redis.io/commands/setex)
     #[text_signature = "($self, key, value, lifespan, /)"]
-    pub fn setex(&mut self, key: &str, value: &PyAny, lifespan: usize) -> PyResult<String> {
-        let val = value.to_string();
-        let life = lifespan.to_string();
-        Ok(route_command(self, "SETEX", Some(&[key, &life, &val]))?)
+    pub fn setex(&self, key: &str, value: &PyAny, lifespan: usize) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "SETEX", &(key, lifespan, value))
     }
 
     // From here on documentation needs to look like above. 
@@ -510,10 +617,8 @@ impl RedisClient {
     /// 
     /// [Read about PSETEX in the Redis documentation.](https://redis.io/commands/psetex)
     #[text_signature = "($self, key, value, milliseconds, /)"]
-    pub fn psetex(&mut self, key: &str, value: &PyAny, milliseconds: usize) -> PyResult<String> {
-        let val = value.to_string();
-        let ms = milliseconds.to_string();
-        Ok(route_command(self, "PSETEX", Some(&[key, &ms, &val]))?)
+    pub fn psetex(&self, key: &str, value: &PyAny, milliseconds: usize) -> PyResult<PyObject> {
+        route_command::<_, String>(self, "PSETEX", &(key, milliseconds, value))
     }
 
     /// Overwrites part of the string stored at key, starting at the specified offset, for the entire length of value. 
@@ -550,10 +655,8 @@ impl RedisClient {
     /// 
     /// [Read about SETRANGE in the Redis documentation.](https://redis.io/commands/setrange)
     #[text_signature = "($self, key, value, offset/)"]
-    pub fn setrange(&mut self, key: &str, value: &PyAny, offset: usize) -> PyResult<usize> {
-        let val = value.to_string();
-        let off = offset.to_string();
-        Ok(route_command(self, "SETRANGE", Some(&[key, &val, &off]))?)
+    pub fn setrange(&self, key: &str, value: &PyAny, offset: usize) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "SETRANGE", &(key, offset, value))
     }
 
     /// Returns the length of the string value stored at key. An error is returned when key holds a non-string value.
@@ -575,7 +678,7 @@ impl RedisClient {
     /// 
     /// [Read about STRLEN in the Redis documentation.](https://redis.io/commands/strlen)
     #[text_signature = "($self, key, /)"]
-    pub fn strlen(&mut self, key: &str) -> PyResult<usize> {
-        Ok(route_command(self, "STRLEN", Some(key))?)
+    pub fn strlen(&self, key: &str) -> PyResult<PyObject> {
+        route_command::<_, usize>(self, "STRLEN", key)
     }
 }
\ No newline at end of file
@@ -0,0 +1,197 @@
+//! Implementation of pipelines for the client.
+use crate::*;
+use crate::connection::Timeouts;
+
+/// Converts one raw reply of a pipeline into the type its method would return.
+pub type Converter = for<'p> fn(Python<'p>, Value) -> PyResult<PyObject>;
+
+/// The commands queued by a pipeline, along with how to convert each of their replies.
+pub struct Queue {
+    packed: Vec<u8>,                   // The packed commands waiting to be sent, back to back.
+    converters: Vec<Converter>,        // One converter per queued command, in order.
+    transaction: bool,                 // Whether the commands are wrapped in MULTI/EXEC.
+}
+
+impl Queue {
+    pub fn new(transaction: bool) -> Self {
+        let mut packed = Vec::new();
+
+        if transaction {
+            packed.extend_from_slice(b"*1\r\n$5\r\nMULTI\r\n");
+        }
+
+        Self { packed, converters: Vec::new(), transaction }
+    }
+
+    /// Queue a packed command, along with how to convert its reply.
+    pub fn push(&mut self, packed: &[u8], converter: Converter) {
+        self.packed.extend_from_slice(packed);
+        self.converters.push(converter);
+    }
+
+    /// Send every queued command in one write and read their replies.
+    ///
+    /// # Returns
+    /// The replies in order, or the first error Redis replied with.
+    fn send(&mut self, pool: &pool::Pool, timeouts: Option<Timeouts>) -> RedisResult<Vec<Value>> {
+        let count = self.converters.len();
+
+        if !self.transaction {
+            return pool.send_batch(&self.packed, count, timeouts).into_iter().collect();
+        }
+
+        self.packed.extend_from_slice(b"*1\r\n$4\r\nEXEC\r\n");
+
+        // MULTI, then one QUEUED per command, then the reply of EXEC.
+        let mut replies = pool.send_batch(&self.packed, count + 2, timeouts);
+        let exec = replies.pop().unwrap();
+
+        for reply in replies {
+            reply?;
+        }
+
+        match exec? {
+            Value::Bulk(replies) => Ok(replies),
+            _ => Err(RedisError::from((ErrorKind::ResponseError, "the transaction was aborted")))
+        }
+    }
+}
+
+/// A pipeline of commands, sent to Redis in a single round trip.
+///
+/// Every method of `RedisClient` is available. Calling one queues the command and returns None.
+/// The replies are returned, in order, by `execute`.
+///
+/// Attributes
+/// ==========
+/// `transaction` - Whether the commands are wrapped in MULTI/EXEC. See [MULTI](https://redis.io/commands/multi).
+///
+/// Example
+/// =======
+/// ```python
+/// client = RedisClient("url")
+///
+/// with client.pipeline() as pipe:
+///     pipe.sset("key", "value")
+///     pipe.rpush("list", 1, 2, 3)
+///     pipe.get("key")
+///     pipe.execute() == ["OK", 3, "value"]
+/// ```
+#[pyclass(extends=RedisClient)]
+pub struct Pipeline {
+    #[pyo3(get)]                       //
+    transaction: bool,                 // Whether the commands are wrapped in MULTI/EXEC.
+}
+
+#[pymethods]
+impl Pipeline {
+    /// Send every queued command to Redis in one round trip, then empty the pipeline.
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// pipe = client.pipeline(transaction=True)
+    /// pipe.incr("counter")
+    /// pipe.incr("counter")
+    /// pipe.execute() == [1, 2]
+    /// ```
+    ///
+    /// Array Reply
+    /// ===========
+    /// The reply of each command, in the order they were queued.
+    #[text_signature = "($self)"]
+    pub fn execute(slf: PyRef<Self>) -> PyResult<Vec<PyObject>> {
+        let mut queue = Self::take_queue(&slf);
+
+        if queue.converters.is_empty() {
+            return Ok(Vec::new());
+        }
+
+        let gil = Python::acquire_gil();
+        let py = gil.python();
+        let base = slf.as_ref();
+        let replies = py.allow_threads(|| queue.send(&base.pool, base.timeouts));
+
+        let replies = match replies {
+            Ok(v) => v,
+            Err(v) => return redis_error(v)
+        };
+
+        let mut results = Vec::with_capacity(replies.len());
+
+        for (convert, reply) in queue.converters.iter().zip(replies.into_iter()) {
+            results.push(convert(py, reply)?);
+        }
+
+        Ok(results)
+    }
+
+    /// Discard every queued command without sending it.
+    #[text_signature = "($self)"]
+    pub fn reset(slf: PyRef<Self>) {
+        Self::take_queue(&slf);
+    }
+
+    fn __enter__(slf: PyRef<Self>) -> Py<Self> {
+        slf.into()
+    }
+
+    fn __exit__(slf: PyRef<Self>, _ty: &PyAny, _value: &PyAny, _traceback: &PyAny) {
+        Self::take_queue(&slf);
+    }
+}
+
+impl Pipeline {
+    /// Swap the queued commands for an empty queue, returning the queued ones. 
+    fn take_queue(slf: &PyRef<Self>) -> Queue {
+        let fresh = Queue::new(slf.transaction);
+
+        match slf.as_ref().queue {
+            Some(ref queue) => std::mem::replace(&mut *queue.lock().unwrap(), fresh),
+            None => fresh
+        }
+    }
+}
+
+#[pymethods]
+impl RedisClient {
+    /// Create a pipeline that shares this client's connection pool.
+    ///
+    /// Arguments
+    /// =========
+    /// `transaction` - Whether to wrap the commands in MULTI/EXEC, making them atomic.
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// pipe = client.pipeline()
+    ///
+    /// for i in range(1000):
+    ///     pipe.sset(f"key:{i}", i)
+    ///
+    /// pipe.execute()  # One round trip instead of a thousand.
+    /// ```
+    ///
+    /// Returns
+    /// =======
+    /// A `Pipeline` with every method of `RedisClient`.
+    ///
+    /// Note
+    /// ====
+    /// Raises TypeError on an `AsyncRedisClient`, as `execute` would block the event loop.
+    /// Commands it awaits at the same time are already written in a single batch.
+    #[args(transaction="false")]
+    #[text_signature = "($self, transaction=False)"]
+    pub fn pipeline(&self, transaction: bool) -> PyResult<Py<Pipeline>> {
+        if self.dispatcher.is_some() {
+            return exceptions::TypeError::into("pipelines cannot be created from asynchronous clients");
+        }
+
+        let gil = Python::acquire_gil();
+
+        let base = Self { queue: Some(Mutex::new(Queue::new(transaction))), noreply: false, ..self.fork() };
+
+        Py::new(gil.python(), PyClassInitializer::from(base).add_subclass(Pipeline { transaction }))
+    }
+}
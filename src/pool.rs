@@ -0,0 +1,352 @@
+//! Implementation of the connection pool behind the client.
+//!
+//! Connections are made on demand. A connection that cannot be made, or that refused a command before any of it
+//! was written, is retried after a jittered, exponential backoff, so that clients do not reconnect in lockstep.
+use crate::*;
+use crate::connection::{Connection, Settings, Timeouts};
+use std::collections::hash_map::RandomState;
+use std::hash::{BuildHasher, Hasher};
+use std::io;
+use std::ops::{Deref, DerefMut};
+use std::sync::Condvar;
+use std::thread;
+use std::time::{Duration, Instant};
+
+/// `CLIENT REPLY SKIP`, packed. Redis sends no reply to it, nor to the command that follows it.
+pub const REPLY_SKIP: &[u8] = b"*3\r\n$6\r\nCLIENT\r\n$5\r\nREPLY\r\n$4\r\nSKIP\r\n";
+
+/// The backoff before the first retry. It doubles with every attempt.
+const BACKOFF_BASE_MS: u64 = 25;
+
+/// The longest backoff between two attempts.
+const BACKOFF_CAP_MS: u64 = 2000;
+
+/// The mutable state of a pool. Guarded by the pool's lock.
+struct State {
+    idle: Vec<Connection>,             // Connections waiting to be checked out.
+    open: usize,                       // Connections created and not yet discarded, idle or not.
+    waits: usize,                      // Checkouts that had to wait for a connection to be returned.
+    creations: usize,                  // Connections created over the life of the pool.
+}
+
+/// A pool of connections, shared by every thread using a client.
+pub struct Pool {
+    info: ConnectionInfo,              // Where new connections are made.
+    settings: Settings,                // How the socket of every new connection is tuned.
+    size: usize,                       // The most connections that may be open at once.
+    retries: usize,                    // How many times a failed connection, or a refused write, is retried.
+    state: Mutex<State>,               // The idle connections and statistics.
+    returned: Condvar,                 // Signalled whenever a connection is returned.
+}
+
+impl Pool {
+    pub fn new(info: ConnectionInfo, settings: Settings, size: usize, retries: usize) -> Self {
+        let state = State {
+            idle: Vec::with_capacity(size),
+            open: 0,
+            waits: 0,
+            creations: 0
+        };
+
+        Self { info, settings, size: size.max(1), retries, state: Mutex::new(state), returned: Condvar::new() }
+    }
+
+    /// Check out a connection, waiting for one to be returned if the pool is exhausted.
+    ///
+    /// Idle connections are validated with a non-blocking read of their socket rather than a round trip.
+    /// Those the server closed while they were idle, such as past its `timeout`, are discarded here,
+    /// before any command is written to them.
+    /// A connection that cannot be made is retried, backing off between attempts.
+    ///
+    /// # Arguments
+    /// * `wait` - How long to wait for a connection to be returned, if bounded. Past it, the checkout times out.
+    pub fn get(&self, wait: Option<Duration>) -> RedisResult<Pooled> {
+        let deadline = wait.map(|wait| Instant::now() + wait);
+        let mut state = self.state.lock().unwrap();
+
+        loop {
+            while let Some(mut connection) = state.idle.pop() {
+                if connection.is_alive() {
+                    return Ok(Pooled { pool: self, connection: Some(connection) });
+                }
+
+                state.open -= 1;
+            }
+
+            if state.open < self.size {
+                state.open += 1;
+                state.creations += 1;
+                drop(state);
+
+                return match self.connect() {
+                    Ok(connection) => Ok(Pooled { pool: self, connection: Some(connection) }),
+                    Err(e) => {
+                        self.discard();
+                        Err(e)
+                    }
+                };
+            }
+
+            state.waits += 1;
+            state = match deadline {
+                None => self.returned.wait(state).unwrap(),
+                Some(deadline) => {
+                    let now = Instant::now();
+
+                    if now >= deadline {
+                        let e = io::Error::new(io::ErrorKind::TimedOut, "no pooled connection was returned in time");
+                        return Err(RedisError::from(e));
+                    }
+
+                    self.returned.wait_timeout(state, deadline - now).unwrap().0
+                }
+            };
+        }
+    }
+
+    /// Make a new connection, retrying with backoff while the server cannot be reached.
+    fn connect(&self) -> RedisResult<Connection> {
+        let mut attempt = 0;
+
+        loop {
+            match Connection::connect(&self.info, &self.settings) {
+                Err(ref e) if attempt < self.retries && is_transient(e) => backoff(attempt),
+                result => return result
+            }
+
+            attempt += 1;
+        }
+    }
+
+    /// Check out a connection whose socket has `timeouts`, or the pool's own when None.
+    /// Waiting for one to be returned is bounded by the same timeouts.
+    fn get_with(&self, timeouts: Option<Timeouts>) -> RedisResult<Pooled> {
+        let timeouts = timeouts.unwrap_or(self.settings.timeouts);
+        let mut connection = self.get(timeouts.checkout())?;
+        connection.set_timeouts(timeouts)?;
+        Ok(connection)
+    }
+
+    /// Write packed commands on a checked out connection, then read their replies with `read`.
+    ///
+    /// Only a write the socket refused before taking any byte is retried, on a fresh connection.
+    /// Once a byte is written, errors are returned as they are: Redis may have run the commands before
+    /// the connection broke, and sending them again could run them twice. Ex, INCR or a MULTI/EXEC.
+    /// Connections the server closed while idle never get this far, as `get` discards them.
+    fn send_then<T>(
+        &self, packed: &[u8], timeouts: Option<Timeouts>, read: impl FnOnce(&mut Connection) -> RedisResult<T>
+    ) -> RedisResult<T> {
+        let mut attempt = 0;
+
+        loop {
+            {
+                // Scoped, so that a dropped connection is returned before backing off.
+                let mut connection = self.get_with(timeouts)?;
+
+                match connection.write_packed(packed) {
+                    Ok(()) => return read(&mut *connection),
+                    Err((ref e, 0)) if attempt < self.retries && e.is_connection_dropped() => (),
+                    Err((e, _)) => return Err(e)
+                }
+            }
+
+            backoff(attempt);
+            attempt += 1;
+        }
+    }
+
+    /// Send a packed command and read its reply. Retried only as `send_then` allows.
+    /// A command that timed out is not retried.
+    pub fn query(&self, packed: &[u8], timeouts: Option<Timeouts>) -> RedisResult<Value> {
+        self.send_then(packed, timeouts, Connection::recv_response)
+    }
+
+    /// Send a packed command and read the bytes of its reply, for a `decode::Decoder`. Retried as `query` is.
+    pub fn query_frame(&self, packed: &[u8], timeouts: Option<Timeouts>) -> RedisResult<Vec<u8>> {
+        self.send_then(packed, timeouts, Connection::recv_frame)
+    }
+
+    /// Write packed commands that Redis will not reply to, without waiting. Retried as `query` is.
+    ///
+    /// Each command must be preceded by `REPLY_SKIP`, so that no reply is left to desync the connection.
+    pub fn send_only(&self, packed: &[u8], timeouts: Option<Timeouts>) -> RedisResult<()> {
+        self.send_then(packed, timeouts, |_| Ok(()))
+    }
+
+    /// Forget a connection that was checked out but will never be returned.
+    fn discard(&self) {
+        self.state.lock().unwrap().open -= 1;
+        self.returned.notify_one();
+    }
+
+    /// Return a connection to the idle list. Closed connections are discarded.
+    fn put(&self, connection: Connection) {
+        if !connection.is_open() {
+            return self.discard();
+        }
+
+        self.state.lock().unwrap().idle.push(connection);
+        self.returned.notify_one();
+    }
+
+    /// Write a batch of packed commands in one go, then read one reply per command.
+    ///
+    /// Error replies only fail their own command.
+    /// A broken connection fails every command whose reply was not read.
+    /// The batch is retried only as `send_then` allows, so a pipeline or transaction never runs twice.
+    pub fn send_batch(&self, packed: &[u8], count: usize, timeouts: Option<Timeouts>) -> Vec<RedisResult<Value>> {
+        let result = self.send_then(packed, timeouts, |connection| {
+            let mut replies = Vec::with_capacity(count);
+
+            while replies.len() < count {
+                match connection.recv_response() {
+                    Err(ref e) if e.kind() == ErrorKind::IoError => {
+                        while replies.len() < count {
+                            replies.push(Err(replicate(e)));
+                        }
+                    },
+                    reply => replies.push(reply)
+                }
+            }
+
+            Ok(replies)
+        });
+
+        match result {
+            Ok(replies) => replies,
+            Err(e) => (0..count).map(|_| Err(replicate(&e))).collect()
+        }
+    }
+
+    /// A snapshot of the pool's statistics.
+    pub fn stats(&self) -> HashMap<&'static str, usize> {
+        let state = self.state.lock().unwrap();
+        let mut stats = HashMap::with_capacity(5);
+
+        stats.insert("size", self.size);
+        stats.insert("open", state.open);
+        stats.insert("idle", state.idle.len());
+        stats.insert("waits", state.waits);
+        stats.insert("creations", state.creations);
+
+        stats
+    }
+}
+
+/// Whether a failed attempt to connect is worth retrying.
+fn is_transient(e: &RedisError) -> bool {
+    e.kind() == ErrorKind::IoError || e.is_connection_refusal()
+}
+
+/// Sleep before the next attempt, for a random time up to an exponentially growing bound.
+fn backoff(attempt: usize) {
+    let bound = BACKOFF_BASE_MS.saturating_mul(1 << attempt.min(16)).min(BACKOFF_CAP_MS);
+    let mut hasher = RandomState::new().build_hasher();
+
+    hasher.write_usize(attempt);
+    thread::sleep(Duration::from_millis(hasher.finish() % (bound + 1)));
+}
+
+/// Copy an error for every command of a batch it failed.
+pub fn replicate(e: &RedisError) -> RedisError {
+    RedisError::from((e.kind(), "a batched command failed", e.to_string()))
+}
+
+/// A connection checked out of a pool. It is returned to the pool when dropped.
+pub struct Pooled<'a> {
+    pool: &'a Pool,
+    connection: Option<Connection>,
+}
+
+impl Deref for Pooled<'_> {
+    type Target = Connection;
+
+    fn deref(&self) -> &Connection {
+        self.connection.as_ref().unwrap()
+    }
+}
+
+impl DerefMut for Pooled<'_> {
+    fn deref_mut(&mut self) -> &mut Connection {
+        self.connection.as_mut().unwrap()
+    }
+}
+
+impl Drop for Pooled<'_> {
+    fn drop(&mut self) {
+        if let Some(connection) = self.connection.take() {
+            self.pool.put(connection);
+        }
+    }
+}
+
+#[pymethods]
+impl RedisClient {
+    /// Statistics about the connection pool of this client.
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url", pool_size=8)
+    /// client.pool_stats["idle"] == 1
+    /// ```
+    ///
+    /// Returns
+    /// =======
+    /// A dictionary with these keys:
+    ///
+    /// `size` - The most connections that may be open at once.
+    ///
+    /// `open` - The connections currently open, idle or checked out.
+    ///
+    /// `idle` - The connections waiting to be checked out.
+    ///
+    /// `waits` - How many times a command waited for a connection to be returned.
+    ///
+    /// `creations` - How many connections have been created.
+    ///
+    /// `batches` - How many batches were written. Only when the client is multiplexed.
+    ///
+    /// `batched_commands` - How many commands those batches held. Only when the client is multiplexed.
+    #[getter]
+    pub fn pool_stats(&self) -> HashMap<&'static str, usize> {
+        let mut stats = self.pool.stats();
+
+        if let Some(ref multiplexer) = self.multiplexer {
+            let (batches, commands) = multiplexer.stats();
+            stats.insert("batches", batches);
+            stats.insert("batched_commands", commands);
+        }
+
+        stats
+    }
+
+    /// A copy of this client that writes commands without waiting for their replies.
+    /// The copy shares this client's connection pool.
+    ///
+    /// Every command is preceded by [CLIENT REPLY SKIP](https://redis.io/commands/client-reply),
+    /// so Redis sends nothing back and pooled connections stay in sync. Requires Redis 3.2 or later.
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// quiet = client.noreply()
+    ///
+    /// for line in log:
+    ///     quiet.rpush("log", line)  # Returns None as soon as the command is written.
+    /// ```
+    ///
+    /// Returns
+    /// =======
+    /// A client of the same kind, an `AsyncRedisClient` when created from one, whose commands return None.
+    ///
+    /// Note
+    /// ====
+    /// Errors replied by Redis, such as a wrong type, are never seen. Errors writing to the socket still raise.
+    #[text_signature = "($self)"]
+    pub fn noreply(&self) -> PyResult<PyObject> {
+        let gil = Python::acquire_gil();
+        Self::wrap_fork(gil.python(), Self { noreply: true, ..self.fork() })
+    }
+}
@@ -0,0 +1,571 @@
+//! Conversion of replies into Python objects.
+use crate::*;
+use pyo3::{class::buffer::PyBufferProtocol, ffi, AsPyPointer, PyIterProtocol, PyMappingProtocol};
+use std::ffi::CStr;
+use std::os::raw::{c_int, c_long, c_void};
+
+/// A type a reply is converted into before it reaches Python.
+pub trait ReplyType {
+    /// Converts a reply into its Python object.
+    fn convert(py: Python, reply: Value) -> PyResult<PyObject>;
+
+    /// Converts a reply when responses are not decoded. Only types holding Redis strings differ from `convert`.
+    /// Replies are passed by value, so a conversion may keep their allocations.
+    #[inline]
+    fn convert_raw(py: Python, reply: Value) -> PyResult<PyObject> {
+        Self::convert(py, reply)
+    }
+
+    /// Decodes the reply straight from its bytes, skipping `redis::Value`, for types likely to be large.
+    /// Only used for commands sent on their own. See `decode`.
+    const DECODER: Option<decode::Decoder> = None;
+
+    /// The reply an error replied by Redis stands for, when it should not raise. Ex, `Renamed`.
+    /// Only used for commands sent on their own. Pipelines and asynchronous clients raise every error reply.
+    #[inline]
+    fn recover(e: RedisError) -> RedisResult<Value> {
+        Err(e)
+    }
+}
+
+macro_rules! reply_types {
+    (text => $($t:ty),*) => {$(
+        impl ReplyType for $t {
+            #[inline]
+            fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+                match <$t>::from_redis_value(&reply) {
+                    Ok(v) => Ok(v.into_py(py)),
+                    Err(v) => redis_error(v)
+                }
+            }
+
+            #[inline]
+            fn convert_raw(py: Python, reply: Value) -> PyResult<PyObject> {
+                Ok(raw(py, &reply))
+            }
+        }
+    )*};
+    ($($t:ty),*) => {$(
+        impl ReplyType for $t {
+            #[inline]
+            fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+                match <$t>::from_redis_value(&reply) {
+                    Ok(v) => Ok(v.into_py(py)),
+                    Err(v) => redis_error(v)
+                }
+            }
+        }
+    )*}
+}
+
+reply_types!(u8, i8, i64, isize, usize, f64);
+reply_types!(text => String, Option<String>, OrDefault<String>);
+
+/// An array reply, converted into a `list` element by element, as `decode::list` does.
+/// Nil elements, such as missing keys of MGET, become None. A nil reply becomes an empty list.
+fn list(py: Python, reply: &Value, decode: bool) -> PyResult<PyObject> {
+    let elements = elements(reply)?
+        .iter()
+        .map(|reply| element(py, reply, decode))
+        .collect::<PyResult<Vec<PyObject>>>()?;
+
+    Ok(PyList::new(py, elements).into_py(py))
+}
+
+impl ReplyType for Vec<String> {
+    #[inline]
+    fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+        list(py, &reply, true)
+    }
+
+    #[inline]
+    fn convert_raw(py: Python, reply: Value) -> PyResult<PyObject> {
+        list(py, &reply, false)
+    }
+
+    const DECODER: Option<decode::Decoder> = Some(decode::list);
+}
+
+/// Converts a reply as it is, with Redis strings as `bytes`. Nothing is decoded or validated as UTF-8.
+pub fn raw(py: Python, reply: &Value) -> PyObject {
+    match reply {
+        Value::Nil => py.None(),
+        Value::Int(n) => n.into_py(py),
+        Value::Data(data) => PyBytes::new(py, data).into_py(py),
+        Value::Bulk(replies) => {
+            let elements: Vec<PyObject> = replies.iter().map(|reply| raw(py, reply)).collect();
+            PyList::new(py, elements).into_py(py)
+        },
+        Value::Status(status) => status.into_py(py),
+        Value::Okay => "OK".into_py(py)
+    }
+}
+
+/// Converts one element of an array reply. Redis strings become `str`, or `bytes` when `decode` is false.
+#[inline]
+pub fn element(py: Python, reply: &Value, decode: bool) -> PyResult<PyObject> {
+    match reply {
+        Value::Data(data) if decode => match std::str::from_utf8(data) {
+            Ok(text) => Ok(PyString::new(py, text).into_py(py)),
+            Err(_) => exceptions::ValueError::into("a reply was not valid UTF-8, see `RedisClient.raw`")
+        },
+        reply => Ok(raw(py, reply))
+    }
+}
+
+/// The elements of an array reply. Nil, as replied for a missing key, has none.
+#[inline]
+fn elements(reply: &Value) -> PyResult<&[Value]> {
+    match reply {
+        Value::Bulk(replies) => Ok(replies),
+        Value::Nil => Ok(&[]),
+        _ => exceptions::TypeError::into("expected an array reply")
+    }
+}
+
+/// The reply of RENAME, as `OrDefault<String>`. When the key does not exist, the `no such key` error
+/// becomes `""` rather than raising, as it always has for commands sent on their own.
+pub struct Renamed;
+
+impl ReplyType for Renamed {
+    #[inline]
+    fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+        OrDefault::<String>::convert(py, reply)
+    }
+
+    #[inline]
+    fn convert_raw(py: Python, reply: Value) -> PyResult<PyObject> {
+        OrDefault::<String>::convert_raw(py, reply)
+    }
+
+    #[inline]
+    fn recover(e: RedisError) -> RedisResult<Value> {
+        match e.detail() {
+            Some("no such key") if e.kind() == ErrorKind::ResponseError => Ok(Value::Data(Vec::new())),
+            _ => Err(e)
+        }
+    }
+}
+
+/// An array reply of alternating fields and values, converted into a `dict`. Ex, HGETALL.
+pub struct Dict;
+
+impl Dict {
+    fn build(py: Python, reply: &Value, decode: bool) -> PyResult<PyObject> {
+        let dict = PyDict::new(py);
+
+        for pair in elements(reply)?.chunks(2) {
+            if let [field, value] = pair {
+                dict.set_item(element(py, field, decode)?, element(py, value, decode)?)?;
+            }
+        }
+
+        Ok(dict.into_py(py))
+    }
+}
+
+impl ReplyType for Dict {
+    fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+        Self::build(py, &reply, true)
+    }
+
+    fn convert_raw(py: Python, reply: Value) -> PyResult<PyObject> {
+        Self::build(py, &reply, false)
+    }
+
+    const DECODER: Option<decode::Decoder> = Some(decode::dict);
+}
+
+/// An array reply of distinct members, converted into a `set`. Ex, SMEMBERS.
+pub struct Set;
+
+impl Set {
+    fn build(py: Python, reply: &Value, decode: bool) -> PyResult<PyObject> {
+        let members = elements(reply)?
+            .iter()
+            .map(|member| element(py, member, decode))
+            .collect::<PyResult<Vec<PyObject>>>()?;
+
+        Ok(PySet::new(py, &members)?.into_py(py))
+    }
+}
+
+impl ReplyType for Set {
+    fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+        Self::build(py, &reply, true)
+    }
+
+    fn convert_raw(py: Python, reply: Value) -> PyResult<PyObject> {
+        Self::build(py, &reply, false)
+    }
+
+    const DECODER: Option<decode::Decoder> = Some(decode::set);
+}
+
+/// A bulk string reply, returned as a read-only `memoryview` of the reply itself. Ex, `get_buffer`.
+pub struct Buffer;
+
+impl ReplyType for Buffer {
+    fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+        match reply {
+            Value::Data(data) => ReplyBuffer::view(py, Storage::Bytes(data)),
+            Value::Nil => Ok(py.None()),
+            _ => exceptions::TypeError::into("expected a bulk string reply")
+        }
+    }
+}
+
+/// A numeric type an array reply can be parsed into. See `Array`.
+pub trait Element: Sized {
+    /// The name of the matching NumPy dtype.
+    const DTYPE: &'static str;
+
+    /// The value of nil elements, such as missing fields.
+    const MISSING: Self;
+
+    /// Parse one element, replied as a bulk string.
+    fn parse(data: &[u8]) -> Option<Self>;
+
+    /// Convert an integer reply.
+    fn from_int(n: i64) -> Self;
+
+    fn into_storage(elements: Vec<Self>) -> Storage;
+}
+
+impl Element for i64 {
+    const DTYPE: &'static str = "int64";
+    const MISSING: Self = i64::MIN;
+
+    #[inline]
+    fn parse(data: &[u8]) -> Option<Self> {
+        std::str::from_utf8(data).ok()?.parse().ok()
+    }
+
+    #[inline]
+    fn from_int(n: i64) -> Self {
+        n
+    }
+
+    fn into_storage(elements: Vec<Self>) -> Storage {
+        Storage::Int64(elements)
+    }
+}
+
+impl Element for f64 {
+    const DTYPE: &'static str = "float64";
+    const MISSING: Self = std::f64::NAN;
+
+    #[inline]
+    fn parse(data: &[u8]) -> Option<Self> {
+        std::str::from_utf8(data).ok()?.parse().ok()
+    }
+
+    #[inline]
+    fn from_int(n: i64) -> Self {
+        n as f64
+    }
+
+    fn into_storage(elements: Vec<Self>) -> Storage {
+        Storage::Float64(elements)
+    }
+}
+
+/// An array reply of numbers, parsed into one contiguous buffer and returned as a NumPy array of `T`.
+/// Ex, `lrange(key, 0, -1, dtype="float64")`.
+pub struct Array<T>(std::marker::PhantomData<T>);
+
+impl<T: Element> Array<T> {
+    /// Wrap parsed numbers in a NumPy array, viewing their buffer without a copy.
+    fn build(py: Python, parsed: Vec<T>) -> PyResult<PyObject> {
+        let view = ReplyBuffer::view(py, T::into_storage(parsed))?;
+        let numpy = py.import("numpy")?;
+
+        Ok(numpy.call("frombuffer", (view,), Some(vec![("dtype", T::DTYPE)].into_py_dict(py)))?.into_py(py))
+    }
+
+    fn from_frame(py: Python, frame: Vec<u8>, _decode: bool) -> PyResult<PyObject> {
+        Self::build(py, decode::numbers::<T>(&frame)?)
+    }
+}
+
+impl<T: Element> ReplyType for Array<T> {
+    fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+        let replies = elements(&reply)?;
+        let mut parsed = Vec::with_capacity(replies.len());
+
+        for reply in replies {
+            parsed.push(match reply {
+                Value::Data(data) => match T::parse(data) {
+                    Some(n) => n,
+                    None => return exceptions::ValueError::into(format!("an element is not a valid {}", T::DTYPE))
+                },
+                Value::Int(n) => T::from_int(*n),
+                _ => T::MISSING
+            });
+        }
+
+        Self::build(py, parsed)
+    }
+
+    const DECODER: Option<decode::Decoder> = Some(Self::from_frame);
+}
+
+/// Route a command whose reply is an array of strings, or of numbers when a NumPy `dtype` is given.
+///
+/// # Arguments
+/// * `dtype` - None for a list of strings, or `int64` or `float64`, as a name or a NumPy dtype.
+///   Nil elements become `-2**63` in `int64` arrays, and NaN in `float64` arrays.
+pub fn route_array<Args: resp::Arguments + ?Sized>(inst: &RedisClient, cmd: &str, args: &Args, dtype: Option<&PyAny>) -> PyResult<PyObject> {
+    let dtype = match dtype {
+        Some(dtype) => dtype,
+        None => return route_command::<_, Vec<String>>(inst, cmd, args)
+    };
+
+    let numpy = dtype.py().import("numpy")?;
+    let name: String = numpy.call1("dtype", (dtype,))?.getattr("name")?.extract()?;
+
+    match name.as_str() {
+        "int64" => route_command::<_, Array<i64>>(inst, cmd, args),
+        "float64" => route_command::<_, Array<f64>>(inst, cmd, args),
+        _ => exceptions::ValueError::into("dtype must be int64 or float64")
+    }
+}
+
+/// An array reply, returned as a `LazyReply` whose elements are converted only once they are accessed.
+pub struct Lazy;
+
+impl Lazy {
+    fn build(py: Python, frame: Vec<u8>, decode: bool) -> PyResult<PyObject> {
+        let offsets = decode::offsets(&frame)?;
+        Ok(Py::new(py, LazyReply { frame, offsets, decode })?.into_py(py))
+    }
+}
+
+impl ReplyType for Lazy {
+    fn convert(py: Python, reply: Value) -> PyResult<PyObject> {
+        Self::build(py, decode::frame(&reply), true)
+    }
+
+    fn convert_raw(py: Python, reply: Value) -> PyResult<PyObject> {
+        Self::build(py, decode::frame(&reply), false)
+    }
+
+    const DECODER: Option<decode::Decoder> = Some(Self::build);
+}
+
+/// A read-only sequence over an array reply. It holds the bytes of the reply as they were read,
+/// and creates the Python object of an element each time it is indexed or iterated over.
+/// Slicing returns a `list` of the converted elements.
+///
+/// Example
+/// =======
+/// ```python
+/// members = client.smembers("key", lazy=True)
+/// len(members)  # Immediate, nothing is converted.
+/// members[0]    # Converts the first member only.
+/// members[1:3]  # Converts the second and third members.
+/// ```
+#[pyclass]
+pub struct LazyReply {
+    frame: Vec<u8>,                    // The bytes of the reply, unconverted.
+    offsets: Vec<usize>,               // Where each element starts in `frame`.
+    decode: bool,                      // Whether Redis strings become `str`, rather than `bytes`.
+}
+
+impl LazyReply {
+    /// The element at `index`, converted, or None past the end.
+    fn get(&self, py: Python, index: usize) -> PyResult<Option<PyObject>> {
+        match self.offsets.get(index) {
+            Some(&offset) => Ok(Some(decode::value_at(py, &self.frame, offset, self.decode)?)),
+            None => Ok(None)
+        }
+    }
+}
+
+#[pyproto]
+impl PyMappingProtocol for LazyReply {
+    fn __len__(&self) -> usize {
+        self.offsets.len()
+    }
+
+    fn __getitem__(&self, key: &PyAny) -> PyResult<PyObject> {
+        let py = key.py();
+
+        if let Ok(slice) = key.downcast::<PySlice>() {
+            let indices = slice.indices(self.offsets.len() as c_long)?;
+            let mut elements = Vec::with_capacity(indices.slicelength.max(0) as usize);
+            let mut index = indices.start;
+
+            for _ in 0..indices.slicelength {
+                elements.extend(self.get(py, index as usize)?);
+                index += indices.step;
+            }
+
+            return Ok(PyList::new(py, elements).into_py(py));
+        }
+
+        let index: isize = key.extract()?;
+        let index = if index < 0 { index + self.offsets.len() as isize } else { index };
+        let element = if index < 0 { None } else { self.get(py, index as usize)? };
+
+        match element {
+            Some(v) => Ok(v),
+            None => exceptions::IndexError::into("reply index out of range")
+        }
+    }
+}
+
+#[pyproto]
+impl PyIterProtocol for LazyReply {
+    fn __iter__(slf: PyRef<Self>) -> PyResult<Py<LazyIter>> {
+        let py = slf.py();
+        Py::new(py, LazyIter { reply: slf.into(), index: 0 })
+    }
+}
+
+/// Iterates over a `LazyReply`, converting one element at a time.
+#[pyclass]
+pub struct LazyIter {
+    reply: Py<LazyReply>,              // The reply iterated over.
+    index: usize,                      // The index of the next element.
+}
+
+#[pyproto]
+impl PyIterProtocol for LazyIter {
+    fn __iter__(slf: PyRef<Self>) -> Py<Self> {
+        slf.into()
+    }
+
+    fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<PyObject>> {
+        let py = slf.py();
+        let element = slf.reply.as_ref(py).borrow().get(py, slf.index)?;
+
+        slf.index += 1;
+        Ok(element)
+    }
+}
+
+/// The memory behind a `ReplyBuffer`.
+pub enum Storage {
+    Bytes(Vec<u8>),
+    Int64(Vec<i64>),
+    Float64(Vec<f64>),
+}
+
+impl Storage {
+    /// The address, element count, element size and buffer protocol format of the memory.
+    fn layout(&self) -> (*const c_void, usize, usize, &'static [u8]) {
+        match self {
+            Storage::Bytes(v) => (v.as_ptr() as *const c_void, v.len(), 1, b"B\0"),
+            Storage::Int64(v) => (v.as_ptr() as *const c_void, v.len(), 8, b"q\0"),
+            Storage::Float64(v) => (v.as_ptr() as *const c_void, v.len(), 8, b"d\0")
+        }
+    }
+
+    /// Whether views may write to the memory. Parsed numbers are owned by the buffer alone,
+    /// so NumPy arrays of them are writable. Strings stay read-only, as `bytes` are.
+    #[inline]
+    fn writable(&self) -> bool {
+        match self {
+            Storage::Bytes(_) => false,
+            Storage::Int64(_) | Storage::Float64(_) => true
+        }
+    }
+}
+
+/// Owns the memory of a reply, and lends it to `memoryview` through the buffer protocol.
+#[pyclass]
+pub struct ReplyBuffer {
+    storage: Storage,                  // The reply's memory. Never reallocated, so views stay valid.
+    shape: [isize; 1],                 // The element count, pointed to by views.
+    strides: [isize; 1],               // The element size, pointed to by views.
+}
+
+impl ReplyBuffer {
+    /// Wrap `storage` in a `memoryview`, writable when the storage is.
+    fn view(py: Python, storage: Storage) -> PyResult<PyObject> {
+        let (_, len, itemsize, _) = storage.layout();
+        let owner = Py::new(py, ReplyBuffer { storage, shape: [len as isize], strides: [itemsize as isize] })?;
+
+        unsafe { PyObject::from_owned_ptr_or_err(py, ffi::PyMemoryView_FromObject(owner.as_ptr())) }
+    }
+}
+
+#[pyproto]
+impl PyBufferProtocol for ReplyBuffer {
+    fn bf_getbuffer(mut slf: PyRefMut<Self>, view: *mut ffi::Py_buffer, flags: c_int) -> PyResult<()> {
+        if view.is_null() {
+            return exceptions::BufferError::into("view is null");
+        }
+
+        let writable = slf.storage.writable();
+
+        if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE && !writable {
+            return exceptions::BufferError::into("the reply is read-only");
+        }
+
+        let (buf, len, itemsize, format) = slf.storage.layout();
+
+        unsafe {
+            (*view).obj = slf.as_ptr();
+            ffi::Py_INCREF((*view).obj);
+
+            (*view).buf = buf as *mut c_void;
+            (*view).len = (len * itemsize) as isize;
+            (*view).readonly = if writable { 0 } else { 1 };
+            (*view).itemsize = itemsize as isize;
+
+            (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+                CStr::from_bytes_with_nul(format).unwrap().as_ptr() as *mut _
+            } else {
+                std::ptr::null_mut()
+            };
+
+            (*view).ndim = 1;
+            (*view).shape = if (flags & ffi::PyBUF_ND) == ffi::PyBUF_ND {
+                slf.shape.as_mut_ptr()
+            } else {
+                std::ptr::null_mut()
+            };
+
+            (*view).strides = if (flags & ffi::PyBUF_STRIDES) == ffi::PyBUF_STRIDES {
+                slf.strides.as_mut_ptr()
+            } else {
+                std::ptr::null_mut()
+            };
+
+            (*view).suboffsets = std::ptr::null_mut();
+            (*view).internal = std::ptr::null_mut();
+        }
+
+        Ok(())
+    }
+
+    fn bf_releasebuffer(_slf: PyRefMut<Self>, _view: *mut ffi::Py_buffer) -> PyResult<()> {
+        Ok(())
+    }
+}
+
+#[pymethods]
+impl RedisClient {
+    /// A copy of this client that returns Redis strings as `bytes`, as if made with `decode_responses=False`.
+    /// The copy shares this client's connection pool, so it is cheap to create for a single call.
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    /// client.sset("image", png)
+    /// client.raw().get("image") == png
+    /// ```
+    ///
+    /// Returns
+    /// =======
+    /// A client of the same kind, an `AsyncRedisClient` when created from one.
+    /// Strings are `bytes`, missing values are None, and numbers are unchanged.
+    #[text_signature = "($self)"]
+    pub fn raw(&self) -> PyResult<PyObject> {
+        let gil = Python::acquire_gil();
+        Self::wrap_fork(gil.python(), Self { decode: false, ..self.fork() })
+    }
+}
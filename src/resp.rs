@@ -0,0 +1,339 @@
+//! Encoding of commands into the Redis protocol (RESP).
+//!
+//! Commands are packed straight into a reusable buffer. Integers and floats are formatted on the stack,
+//! strings are borrowed, and command names are static, so packing a command does not allocate.
+use crate::*;
+use pyo3::{buffer::PyBuffer, ffi, AsPyPointer};
+use std::cell::RefCell;
+
+/// The capacity a thread's command buffer starts with.
+const INITIAL_CAPACITY: usize = 512;
+
+/// Buffers grown past this size by a large command are released once it has been sent.
+const RETAINED_CAPACITY: usize = 1 << 20;
+
+thread_local! {
+    /// The command buffer reused by every command packed on this thread.
+    static BUFFER: RefCell<Vec<u8>> = RefCell::new(Vec::with_capacity(INITIAL_CAPACITY));
+}
+
+/// Run `f` with this thread's command buffer, emptied.
+///
+/// A command packed while another is being packed on the same thread, for example from the `__str__`
+/// of an argument, gets a buffer of its own.
+#[inline]
+pub fn with_buffer<T>(f: impl FnOnce(&mut Vec<u8>) -> T) -> T {
+    BUFFER.with(|cell| match cell.try_borrow_mut() {
+        Ok(mut buffer) => {
+            buffer.clear();
+            let result = f(&mut buffer);
+
+            if buffer.capacity() > RETAINED_CAPACITY {
+                *buffer = Vec::with_capacity(INITIAL_CAPACITY);
+            }
+
+            result
+        },
+        Err(_) => f(&mut Vec::with_capacity(INITIAL_CAPACITY))
+    })
+}
+
+/// Append a command to `out`.
+///
+/// # Arguments
+/// * `out` - The buffer to append to.
+/// * `cmd` - The command name. Ex, `SET`.
+/// * `args` - The arguments of the command.
+#[inline]
+pub fn pack<Args: Arguments + ?Sized>(out: &mut Vec<u8>, cmd: &str, args: &Args) -> PyResult<()> {
+    out.push(b'*');
+    write_decimal(out, args.count() + 1);
+    out.extend_from_slice(b"\r\n");
+    write_bulk(out, cmd.as_bytes());
+    args.write_args(out)
+}
+
+/// Append a bulk string to `out`.
+#[inline]
+pub fn write_bulk(out: &mut Vec<u8>, data: &[u8]) {
+    out.reserve(data.len() + 16);
+    out.push(b'$');
+    write_decimal(out, data.len());
+    out.extend_from_slice(b"\r\n");
+    out.extend_from_slice(data);
+    out.extend_from_slice(b"\r\n");
+}
+
+#[inline]
+fn write_decimal(out: &mut Vec<u8>, n: usize) {
+    out.extend_from_slice(itoa::Buffer::new().format(n).as_bytes());
+}
+
+/// A single argument of a command.
+pub trait Argument {
+    /// Append this argument to `out` as a bulk string.
+    fn write_arg(&self, out: &mut Vec<u8>) -> PyResult<()>;
+}
+
+/// Every argument of a command.
+pub trait Arguments {
+    /// How many arguments `write_args` appends.
+    fn count(&self) -> usize;
+
+    /// Append every argument to `out`.
+    fn write_args(&self, out: &mut Vec<u8>) -> PyResult<()>;
+}
+
+impl Argument for str {
+    #[inline]
+    fn write_arg(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        write_bulk(out, self.as_bytes());
+        Ok(())
+    }
+}
+
+impl Argument for String {
+    #[inline]
+    fn write_arg(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        write_bulk(out, self.as_bytes());
+        Ok(())
+    }
+}
+
+impl<T: Argument + ?Sized> Argument for &T {
+    #[inline]
+    fn write_arg(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        (**self).write_arg(out)
+    }
+}
+
+macro_rules! integer_argument {
+    ($($t:ty),*) => {$(
+        impl Argument for $t {
+            #[inline]
+            fn write_arg(&self, out: &mut Vec<u8>) -> PyResult<()> {
+                write_bulk(out, itoa::Buffer::new().format(*self).as_bytes());
+                Ok(())
+            }
+        }
+    )*};
+}
+
+integer_argument!(u8, i64, u64, isize, usize);
+
+impl Argument for f64 {
+    #[inline]
+    fn write_arg(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        write_bulk(out, ryu::Buffer::new().format(*self).as_bytes());
+        Ok(())
+    }
+}
+
+impl Argument for PyAny {
+    /// The exact builtin types are encoded without calling back into Python:
+    /// `str` is borrowed as UTF-8, `int` is formatted in decimal, and `float` in its shortest round-trip form.
+    /// `bytes`, `bytearray` and `memoryview` objects are sent as their raw bytes.
+    /// Other Python objects, subclasses included, are sent as their `str()`.
+    #[inline]
+    fn write_arg(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        let ptr = self.as_ptr();
+
+        if unsafe { ffi::PyUnicode_CheckExact(ptr) } != 0 {
+            write_bulk(out, self.downcast::<PyString>()?.to_str()?.as_bytes());
+            return Ok(());
+        }
+
+        if unsafe { ffi::PyLong_CheckExact(ptr) } != 0 {
+            if let Ok(n) = self.extract::<i64>() {
+                return n.write_arg(out);
+            }
+        } else if unsafe { ffi::PyFloat_CheckExact(ptr) } != 0 {
+            return unsafe { ffi::PyFloat_AsDouble(ptr) }.write_arg(out);
+        } else if let Ok(bytes) = self.downcast::<PyBytes>() {
+            write_bulk(out, bytes.as_bytes());
+            return Ok(());
+        } else if self.downcast::<PyByteArray>().is_ok() || unsafe { ffi::PyMemoryView_Check(ptr) } != 0 {
+            return write_buffer(out, self);
+        }
+
+        // Owned rather than held by the GIL's pool, so the `str()` is freed as soon as it is written.
+        let text = unsafe { PyObject::from_owned_ptr_or_err(self.py(), ffi::PyObject_Str(ptr))? };
+        write_bulk(out, text.as_ref(self.py()).downcast::<PyString>()?.to_str()?.as_bytes());
+        Ok(())
+    }
+}
+
+/// Append an object exposing the buffer protocol to `out` as a bulk string.
+/// Its memory is copied straight into the command, unless it is not contiguous.
+fn write_buffer(out: &mut Vec<u8>, obj: &PyAny) -> PyResult<()> {
+    let buffer = PyBuffer::get(obj.py(), obj)?;
+
+    if buffer.is_c_contiguous() {
+        // The buffer keeps the memory alive and unchanged until it is released, when dropped.
+        let data = unsafe { std::slice::from_raw_parts(buffer.buf_ptr() as *const u8, buffer.len_bytes()) };
+        write_bulk(out, data);
+        return Ok(());
+    }
+
+    // Owned rather than held by the GIL's pool, so the copy is freed as soon as it is written.
+    let bytes = unsafe { PyObject::from_owned_ptr_or_err(obj.py(), ffi::PyBytes_FromObject(obj.as_ptr()))? };
+    write_bulk(out, bytes.as_ref(obj.py()).downcast::<PyBytes>()?.as_bytes());
+    Ok(())
+}
+
+impl<T: Argument + ?Sized> Arguments for T {
+    #[inline]
+    fn count(&self) -> usize {
+        1
+    }
+
+    #[inline]
+    fn write_args(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        self.write_arg(out)
+    }
+}
+
+impl Arguments for () {
+    #[inline]
+    fn count(&self) -> usize {
+        0
+    }
+
+    #[inline]
+    fn write_args(&self, _out: &mut Vec<u8>) -> PyResult<()> {
+        Ok(())
+    }
+}
+
+macro_rules! tuple_arguments {
+    ($(($($name:ident),+)),*) => {$(
+        #[allow(non_snake_case)]
+        impl<$($name: Arguments),+> Arguments for ($($name,)+) {
+            #[inline]
+            fn count(&self) -> usize {
+                let ($(ref $name,)+) = *self;
+                0 $(+ $name.count())+
+            }
+
+            #[inline]
+            fn write_args(&self, out: &mut Vec<u8>) -> PyResult<()> {
+                let ($(ref $name,)+) = *self;
+                $($name.write_args(out)?;)+
+                Ok(())
+            }
+        }
+    )*};
+}
+
+tuple_arguments!((A, B), (A, B, C), (A, B, C, D), (A, B, C, D, E), (A, B, C, D, E, F));
+
+impl<T: Argument> Arguments for [T] {
+    #[inline]
+    fn count(&self) -> usize {
+        self.len()
+    }
+
+    #[inline]
+    fn write_args(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        self.iter().try_for_each(|element| element.write_arg(out))
+    }
+}
+
+impl<T: Arguments> Arguments for Option<T> {
+    #[inline]
+    fn count(&self) -> usize {
+        self.as_ref().map_or(0, |args| args.count())
+    }
+
+    #[inline]
+    fn write_args(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        match self {
+            Some(args) => args.write_args(out),
+            None => Ok(())
+        }
+    }
+}
+
+impl Arguments for &PyTuple {
+    /// Rest arguments are sent one after the other.
+    #[inline]
+    fn count(&self) -> usize {
+        self.len()
+    }
+
+    #[inline]
+    fn write_args(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        self.iter().try_for_each(|element| element.write_arg(out))
+    }
+}
+
+impl Arguments for &PyDict {
+    /// Dictionaries are sent as their keys and values, interleaved.
+    #[inline]
+    fn count(&self) -> usize {
+        self.len() * 2
+    }
+
+    #[inline]
+    fn write_args(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        for (key, value) in self.iter() {
+            key.write_arg(out)?;
+            value.write_arg(out)?;
+        }
+
+        Ok(())
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn packed<Args: Arguments + ?Sized>(cmd: &str, args: &Args) -> Vec<u8> {
+        let mut out = Vec::new();
+        assert!(pack(&mut out, cmd, args).is_ok());
+        out
+    }
+
+    #[test]
+    fn packs_strings() {
+        assert_eq!(packed("SET", &("key", "value")), b"*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$5\r\nvalue\r\n".to_vec());
+    }
+
+    #[test]
+    fn packs_no_arguments() {
+        assert_eq!(packed("PING", &()), b"*1\r\n$4\r\nPING\r\n".to_vec());
+    }
+
+    #[test]
+    fn packs_empty_and_binary_strings() {
+        assert_eq!(packed("SET", &("", "a\r\nb")), b"*3\r\n$3\r\nSET\r\n$0\r\n\r\n$4\r\na\r\nb\r\n".to_vec());
+    }
+
+    #[test]
+    fn packs_numbers() {
+        assert_eq!(packed("EXPIRE", &("key", 10usize)), b"*3\r\n$6\r\nEXPIRE\r\n$3\r\nkey\r\n$2\r\n10\r\n".to_vec());
+        assert_eq!(packed("LINDEX", &("key", -1isize)), b"*3\r\n$6\r\nLINDEX\r\n$3\r\nkey\r\n$2\r\n-1\r\n".to_vec());
+        assert_eq!(packed("INCRBYFLOAT", &("key", 1.5f64)), b"*3\r\n$11\r\nINCRBYFLOAT\r\n$3\r\nkey\r\n$3\r\n1.5\r\n".to_vec());
+    }
+
+    #[test]
+    fn skips_missing_options() {
+        assert_eq!(packed("SET", &("key", "value", None::<&str>)), packed("SET", &("key", "value")));
+        assert_eq!(packed("SET", &("key", "value", Some(("EX", 5u64)))), packed("SET", &("key", "value", "EX", 5u64)));
+    }
+
+    #[test]
+    fn packs_slices() {
+        let keys: &[&str] = &["a", "b"];
+        assert_eq!(packed("DEL", keys), b"*3\r\n$3\r\nDEL\r\n$1\r\na\r\n$1\r\nb\r\n".to_vec());
+    }
+
+    #[test]
+    fn appends_commands() {
+        let mut out = Vec::new();
+        assert!(pack(&mut out, "PING", &()).is_ok());
+        assert!(pack(&mut out, "GET", "key").is_ok());
+        assert_eq!(out, b"*1\r\n$4\r\nPING\r\n*2\r\n$3\r\nGET\r\n$3\r\nkey\r\n".to_vec());
+    }
+}
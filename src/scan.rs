@@ -0,0 +1,352 @@
+//! Implementation of iterators that page through the keyspace and through collections.
+//!
+//! Scans request each page with the cursor Redis replied with last, and ranges request consecutive windows.
+//! Pages are converted one element, or one pair, at a time as Python iterates over them.
+//! Optionally, the next page of a scan is requested by a worker thread while the current one is being consumed.
+use crate::*;
+use crate::connection::Timeouts;
+use pyo3::PyIterProtocol;
+use std::collections::HashSet;
+use std::sync::mpsc::{self, Receiver, Sender};
+use std::thread;
+
+/// A thread requesting pages ahead for one iterator. It exits once the iterator, and so `requests`, is dropped.
+struct Worker {
+    requests: Sender<Vec<u8>>,         // The packed commands requesting the next page.
+    replies: Receiver<RedisResult<Value>>, // The reply of each request, in order.
+}
+
+impl Worker {
+    /// Start a worker sending its requests through `pool`. None if the thread could not be started.
+    fn spawn(pool: Arc<pool::Pool>, timeouts: Option<Timeouts>) -> Option<Self> {
+        let (requests, received) = mpsc::channel::<Vec<u8>>();
+        let (sent, replies) = mpsc::channel();
+
+        let spawned = thread::Builder::new()
+            .name("suredis-scan".to_string())
+            .spawn(move || {
+                for packed in received {
+                    if sent.send(pool.query(&packed, timeouts)).is_err() {
+                        break;
+                    }
+                }
+            });
+
+        spawned.ok().map(|_| Self { requests, replies })
+    }
+}
+
+/// Iterates over a cursor-based scan, a page at a time.
+/// Returned by `RedisClient.scan_iter`, `RedisClient.hscan_iter` and `RedisClient.sscan_iter`.
+///
+/// Example
+/// =======
+/// ```python
+/// for key in client.scan_iter(pattern="user:*", count=1000):
+///     print(key)
+/// ```
+#[pyclass]
+pub struct ScanIter {
+    pool: Arc<pool::Pool>,             // The connection pool of the client that created the iterator.
+    timeouts: Option<Timeouts>,        // The timeouts of that client, if overridden.
+    decode: bool,                      // Whether Redis strings become `str`, rather than `bytes`.
+    cmd: &'static str,                 // The command name. Ex, `SCAN`.
+    key: Option<String>,               // The key scanned, for commands scanning a single key.
+    pattern: Option<String>,           // Only elements matching this glob-style pattern are returned.
+    count: Option<usize>,              // A hint of how many elements each page holds.
+    kind: Option<String>,              // Only keys of this type are returned. Only for SCAN.
+    pairs: bool,                       // Whether elements come in pairs, returned as tuples. Ex, fields and values.
+    cursor: u64,                       // The cursor of the next page.
+    page: std::vec::IntoIter<Value>,   // The elements of the current page not yet returned.
+    seen: Option<HashSet<Vec<u8>>>,    // Every element, or first of a pair, returned so far, when deduplicating.
+    prefetch: bool,                    // Whether the next page is requested while the current one is consumed.
+    worker: Option<Worker>,            // Requests the next page ahead, once prefetching starts.
+    pending: bool,                     // Whether the worker was sent a request not yet received.
+    finished: bool,                    // Whether Redis replied with the final page.
+}
+
+impl ScanIter {
+    /// An iterator over `cmd`, starting from the first page. Fails for pipelines and asynchronous clients.
+    ///
+    /// # Arguments
+    /// * `inst` - The client to send the commands with.
+    /// * `cmd` - The command name. HSCAN and ZSCAN reply with pairs.
+    /// * `key` - The key scanned, for commands scanning a single key.
+    /// * `pattern`, `count` - Sent as MATCH and COUNT, if given.
+    /// * `deduplicate` - Whether to skip elements returned before.
+    /// * `prefetch` - Whether to request the next page while the current one is consumed.
+    pub fn new(
+        inst: &RedisClient, cmd: &'static str, key: Option<&str>, pattern: Option<&str>, count: Option<usize>,
+        deduplicate: bool, prefetch: bool
+    ) -> PyResult<Self> {
+        inst.require_direct("scans", None)?;
+
+        if count == Some(0) {
+            return exceptions::ValueError::into("count must be at least 1");
+        }
+
+        Ok(Self {
+            pool: Arc::clone(&inst.pool),
+            timeouts: inst.timeouts,
+            decode: inst.decode,
+            cmd,
+            key: key.map(str::to_string),
+            pattern: pattern.map(str::to_string),
+            count,
+            kind: None,
+            pairs: cmd == "HSCAN" || cmd == "ZSCAN",
+            cursor: 0,
+            page: Vec::new().into_iter(),
+            seen: if deduplicate { Some(HashSet::new()) } else { None },
+            prefetch,
+            worker: None,
+            pending: false,
+            finished: false
+        })
+    }
+
+    /// Pack the command requesting the page at the current cursor.
+    fn pack(&self) -> PyResult<Vec<u8>> {
+        let args = (
+            self.key.as_deref(),
+            self.cursor,
+            self.pattern.as_deref().map(|pattern| ("MATCH", pattern)),
+            self.count.map(|count| ("COUNT", count)),
+            self.kind.as_deref().map(|kind| ("TYPE", kind))
+        );
+
+        resp::with_buffer(|packed| {
+            resp::pack(packed, self.cmd, &args)?;
+            Ok(packed.to_vec())
+        })
+    }
+
+    /// Replace the current page with the next one, then request the page after it if prefetching.
+    fn fetch(&mut self, py: Python) -> PyResult<()> {
+        let reply = match self.worker.take() {
+            Some(worker) if self.pending => {
+                // A receiver cannot be shared with another thread, so the worker is moved there and back.
+                let (worker, reply) = py.allow_threads(move || {
+                    let reply = worker.replies.recv();
+                    (worker, reply)
+                });
+
+                self.pending = false;
+                self.worker = Some(worker);
+
+                reply.unwrap_or_else(|_| {
+                    Err(RedisError::from((ErrorKind::ClientError, "the thread requesting the next page stopped")))
+                })
+            },
+            worker => {
+                self.worker = worker;
+
+                let packed = self.pack()?;
+                let pool = &self.pool;
+                let timeouts = self.timeouts;
+
+                py.allow_threads(|| pool.query(&packed, timeouts))
+            }
+        };
+
+        let (cursor, page) = match reply {
+            Ok(Value::Bulk(mut parts)) if parts.len() == 2 => match (parts.pop(), parts.pop()) {
+                (Some(Value::Bulk(page)), Some(Value::Data(cursor))) => (cursor, page),
+                _ => return exceptions::TypeError::into("expected a cursor and a page of elements")
+            },
+            Ok(_) => return exceptions::TypeError::into("expected a cursor and a page of elements"),
+            Err(v) => return redis_error(v)
+        };
+
+        self.cursor = match std::str::from_utf8(&cursor).ok().and_then(|cursor| cursor.parse().ok()) {
+            Some(cursor) => cursor,
+            None => return exceptions::ValueError::into("the server replied with an invalid cursor")
+        };
+        self.finished = self.cursor == 0;
+        self.page = page.into_iter();
+
+        if self.prefetch && !self.finished {
+            if self.worker.is_none() {
+                self.worker = Worker::spawn(Arc::clone(&self.pool), self.timeouts);
+            }
+
+            // Without a worker, the next page is simply requested once it is needed.
+            if let Some(ref worker) = self.worker {
+                self.pending = worker.requests.send(self.pack()?).is_ok();
+            }
+        }
+
+        Ok(())
+    }
+
+    /// Whether `element` was returned before. Always false when not deduplicating.
+    #[inline]
+    fn repeated(&mut self, element: &Value) -> bool {
+        match (&mut self.seen, element) {
+            (Some(seen), Value::Data(data)) => !seen.insert(data.clone()),
+            _ => false
+        }
+    }
+}
+
+#[pyproto]
+impl PyIterProtocol for ScanIter {
+    fn __iter__(slf: PyRef<Self>) -> Py<Self> {
+        slf.into()
+    }
+
+    fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<PyObject>> {
+        let py = slf.py();
+
+        loop {
+            if let Some(element) = slf.page.next() {
+                let second = if slf.pairs { Some(slf.page.next().unwrap_or(Value::Nil)) } else { None };
+
+                if slf.repeated(&element) {
+                    continue;
+                }
+
+                let element = reply::element(py, &element, slf.decode)?;
+
+                return match second {
+                    Some(second) => Ok(Some((element, reply::element(py, &second, slf.decode)?).into_py(py))),
+                    None => Ok(Some(element))
+                };
+            }
+
+            if slf.finished {
+                return Ok(None);
+            }
+
+            slf.fetch(py)?;
+        }
+    }
+}
+
+/// Iterates over a list, a window of LRANGE at a time. Returned by `RedisClient.iter_list`.
+#[pyclass]
+pub struct RangeIter {
+    pool: Arc<pool::Pool>,             // The connection pool of the client that created the iterator.
+    timeouts: Option<Timeouts>,        // The timeouts of that client, if overridden.
+    decode: bool,                      // Whether Redis strings become `str`, rather than `bytes`.
+    key: String,                       // The key of the list.
+    chunk_size: usize,                 // The most elements in each window.
+    start: usize,                      // The index the next window starts at.
+    page: std::vec::IntoIter<Value>,   // The elements of the current window not yet returned.
+    finished: bool,                    // Whether the last window was shorter than `chunk_size`.
+}
+
+impl RangeIter {
+    /// An iterator over the list at `key`, starting from its head.
+    pub fn new(inst: &RedisClient, key: &str, chunk_size: usize) -> Self {
+        Self {
+            pool: Arc::clone(&inst.pool),
+            timeouts: inst.timeouts,
+            decode: inst.decode,
+            key: key.to_string(),
+            chunk_size,
+            start: 0,
+            page: Vec::new().into_iter(),
+            finished: false
+        }
+    }
+
+    /// Replace the current window with the next one.
+    fn fetch(&mut self, py: Python) -> PyResult<()> {
+        let stop = self.start + self.chunk_size - 1;
+        let packed = resp::with_buffer(|packed| {
+            resp::pack(packed, "LRANGE", &(self.key.as_str(), self.start, stop))?;
+            Ok(packed.to_vec())
+        })?;
+
+        let pool = &self.pool;
+        let timeouts = self.timeouts;
+
+        let page = match py.allow_threads(|| pool.query(&packed, timeouts)) {
+            Ok(Value::Bulk(page)) => page,
+            Ok(Value::Nil) => Vec::new(),
+            Ok(_) => return exceptions::TypeError::into("expected an array reply"),
+            Err(v) => return redis_error(v)
+        };
+
+        self.finished = page.len() < self.chunk_size;
+        self.start += page.len();
+        self.page = page.into_iter();
+
+        Ok(())
+    }
+}
+
+#[pyproto]
+impl PyIterProtocol for RangeIter {
+    fn __iter__(slf: PyRef<Self>) -> Py<Self> {
+        slf.into()
+    }
+
+    fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<PyObject>> {
+        let py = slf.py();
+
+        loop {
+            if let Some(element) = slf.page.next() {
+                return reply::element(py, &element, slf.decode).map(Some);
+            }
+
+            if slf.finished {
+                return Ok(None);
+            }
+
+            slf.fetch(py)?;
+        }
+    }
+}
+
+#[pymethods]
+impl RedisClient {
+    /// Iterate over the keys of the database without blocking the server, unlike `keys`.
+    /// Keys are requested a page at a time with SCAN, and only one page is held at once.
+    ///
+    /// Arguments
+    /// =========
+    /// `pattern` - Only keys matching this glob-style pattern. Ex, `user:*`.
+    ///
+    /// `count` - A hint of how many keys Redis looks at for each page. Redis defaults to 10.
+    ///
+    /// `kind` - Only keys of this type. Ex, `hash`. Requires Redis 6 or later.
+    ///
+    /// `deduplicate` - Whether to skip keys returned before. SCAN may return a key more than once while the keyspace is resized.
+    /// Every key returned is remembered to do so, so memory grows with the keyspace: about the size of every key name
+    /// plus some 50 bytes per key. Defaults to False.
+    ///
+    /// `prefetch` - Whether to request the next page while the current one is being iterated over. Defaults to False.
+    ///
+    /// Example
+    /// =======
+    /// ```python
+    /// client = RedisClient("url")
+    ///
+    /// for key in client.scan_iter(pattern="session:*", count=1000, prefetch=True):
+    ///     client.unlink(key)
+    /// ```
+    ///
+    /// Returns
+    /// =======
+    /// An iterator of key names.
+    ///
+    /// Time Complexity
+    /// ===============
+    /// `O(1)` : For every page. `O(n)` for a full iteration, where n is the number of keys in the database.
+    ///
+    /// [Read about SCAN in the Redis documentation.](https://redis.io/commands/scan)
+    #[args("*", pattern="None", count="None", kind="None", deduplicate="false", prefetch="false")]
+    #[text_signature = "($self, *, pattern=None, count=None, kind=None, deduplicate=False, prefetch=False)"]
+    pub fn scan_iter(
+        &self, pattern: Option<&str>, count: Option<usize>, kind: Option<&str>, deduplicate: bool, prefetch: bool
+    ) -> PyResult<Py<ScanIter>> {
+        let gil = Python::acquire_gil();
+        let mut iterator = ScanIter::new(self, "SCAN", None, pattern, count, deduplicate, prefetch)?;
+
+        iterator.kind = kind.map(str::to_string);
+
+        Py::new(gil.python(), iterator)
+    }
+}
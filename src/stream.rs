@@ -0,0 +1,276 @@
+//! Implementation of commands streamed from a Python iterable.
+//!
+//! Elements are pulled from the iterable a chunk at a time and packed into one command per chunk.
+//! A window of chunks is written in a single batch, and their replies are folded into one.
+//! Only one window is held in memory at once, however large the iterable.
+//! Commands sent once per key, such as EXPIRE, are batched the same way by `each_command`.
+use crate::*;
+use crate::resp::{Argument, Arguments};
+use pyo3::{ffi, AsPyPointer};
+
+/// The most chunks written in a single batch.
+const WINDOW: usize = 8;
+
+/// How the replies of every chunk are folded into the reply of the whole command.
+#[derive(Clone, Copy)]
+pub enum Aggregate {
+    Sum,                               // The integer replies are added up. Ex, the members added by SADD.
+    Last,                              // The reply of the last chunk is kept. Ex, the length of the list after RPUSH.
+}
+
+/// The elements of one chunk, held until they are packed.
+struct Chunk<'a> {
+    py: Python<'a>,                    // The GIL, held while packing.
+    elements: &'a [PyObject],          // The elements pulled from the iterable.
+    pairs: bool,                       // Whether each element is a pair sent as two arguments.
+}
+
+impl Arguments for Chunk<'_> {
+    #[inline]
+    fn count(&self) -> usize {
+        self.elements.len() * if self.pairs { 2 } else { 1 }
+    }
+
+    fn write_args(&self, out: &mut Vec<u8>) -> PyResult<()> {
+        for element in self.elements {
+            let element = element.as_ref(self.py);
+
+            if self.pairs {
+                let (first, second): (&PyAny, &PyAny) = element.extract()?;
+                first.write_arg(out)?;
+                second.write_arg(out)?;
+            } else {
+                element.write_arg(out)?;
+            }
+        }
+
+        Ok(())
+    }
+}
+
+/// Raise unless `iterable` holds many elements rather than being one string.
+/// A `str` or `bytes` is iterable itself, so it would otherwise be sent one character at a time.
+///
+/// # Arguments
+/// * `iterable` - The object passed by the user.
+/// * `what` - What the iterable should hold, used in the error. Ex, `keys`.
+pub fn require_elements(iterable: &PyAny, what: &str) -> PyResult<()> {
+    if iterable.downcast::<PyString>().is_ok() || iterable.downcast::<PyBytes>().is_ok() {
+        return exceptions::TypeError::into(format!("expected an iterable of {}, not a single str or bytes", what));
+    }
+
+    Ok(())
+}
+
+/// Sends a command whose trailing arguments are pulled from an iterable, `chunk_size` at a time.
+///
+/// # Arguments
+/// * `inst` - The client to send the command with.
+/// * `cmd` - The command name. Ex, `SADD`.
+/// * `key` - The argument sent before the elements of each chunk, if any.
+/// * `iterable` - Any Python iterable. When `pairs` is set, a dictionary is read through its items.
+/// * `pairs` - Whether each element is a pair sent as two arguments. Ex, a field and its value.
+/// * `chunk_size` - The most elements sent in one command.
+/// * `aggregate` - How the replies of every chunk are folded together.
+///
+/// # Type Parameters
+/// * `ReturnType` - The type the folded reply is converted into before it reaches Python.
+pub fn stream_command<ReturnType>(
+    inst: &RedisClient, cmd: &str, key: Option<&str>, iterable: &PyAny,
+    pairs: bool, chunk_size: usize, aggregate: Aggregate
+) -> PyResult<PyObject>
+where
+    ReturnType: reply::ReplyType
+{
+    inst.require_direct("streamed commands", Some(chunk_size))?;
+
+    require_elements(iterable, if pairs { "pairs" } else { "elements" })?;
+
+    let gil = Python::acquire_gil();
+    let py = gil.python();
+    let convert = inst.converter::<ReturnType>();
+
+    let iterable = match iterable.downcast::<PyDict>() {
+        Ok(dict) if pairs => dict.call_method0("items")?,
+        _ => iterable
+    };
+
+    let iterator = iterate(py, iterable)?;
+
+    let mut chunk = Vec::with_capacity(chunk_size);
+    let mut packed = Vec::new();
+    let mut queued = 0;
+    let mut folded: Option<Value> = None;
+    let mut exhausted = false;
+
+    while !exhausted {
+        while chunk.len() < chunk_size {
+            match next(py, &iterator)? {
+                Some(element) => {
+                    if pairs {
+                        element.extract::<(&PyAny, &PyAny)>(py)?;
+                    }
+
+                    chunk.push(element);
+                },
+                None => {
+                    exhausted = true;
+                    break;
+                }
+            }
+        }
+
+        if !chunk.is_empty() {
+            if inst.noreply {
+                packed.extend_from_slice(pool::REPLY_SKIP);
+            }
+
+            resp::pack(&mut packed, cmd, &(key, Chunk { py, elements: &chunk, pairs }))?;
+            chunk.clear();
+            queued += 1;
+        }
+
+        if queued == WINDOW || (exhausted && queued > 0) {
+            let batch = &packed;
+            let pool = &inst.pool;
+            let timeouts = inst.timeouts;
+
+            if inst.noreply {
+                if let Err(v) = py.allow_threads(|| pool.send_only(batch, timeouts)) {
+                    return redis_error(v);
+                }
+            } else {
+                for reply in py.allow_threads(|| pool.send_batch(batch, queued, timeouts)) {
+                    let reply = match reply {
+                        Ok(v) => v,
+                        Err(v) => return redis_error(v)
+                    };
+
+                    folded = Some(match (aggregate, folded) {
+                        (Aggregate::Sum, Some(Value::Int(total))) => match reply {
+                            Value::Int(n) => Value::Int(total + n),
+                            other => other
+                        },
+                        _ => reply
+                    });
+                }
+            }
+
+            packed.clear();
+            queued = 0;
+        }
+    }
+
+    match (folded, aggregate) {
+        (Some(reply), _) => convert(py, reply),
+        (None, Aggregate::Sum) if !inst.noreply => convert(py, Value::Int(0)),
+        (None, _) => Ok(py.None())
+    }
+}
+
+/// Sends one command per key of an iterable, a chunk of commands per batch, and gathers whether each succeeded.
+///
+/// # Arguments
+/// * `inst` - The client to send the commands with.
+/// * `cmd` - The command name. Ex, `EXPIRE`.
+/// * `keys` - Any iterable of key names, or a dictionary of keys to the argument sent with each.
+/// * `argument` - The argument sent with every key, when `keys` is not a dictionary.
+/// * `chunk_size` - The most commands written in one batch.
+///
+/// # Returns
+/// A list of booleans, in the order of `keys`. True where Redis replied with 1.
+/// None for clients made by `RedisClient.noreply`.
+pub fn each_command(inst: &RedisClient, cmd: &str, keys: &PyAny, argument: Option<&PyAny>, chunk_size: usize) -> PyResult<PyObject> {
+    inst.require_direct("batched commands", Some(chunk_size))?;
+
+    require_elements(keys, "keys")?;
+
+    let gil = Python::acquire_gil();
+    let py = gil.python();
+    let pool = &inst.pool;
+    let timeouts = inst.timeouts;
+
+    let (iterable, pairs) = match keys.downcast::<PyDict>() {
+        Ok(_) if argument.is_some() => {
+            return exceptions::TypeError::into("pass a dictionary of keys to their arguments, or keys and one argument, not both");
+        },
+        Ok(dict) => (dict.call_method0("items")?, true),
+        Err(_) => (keys, false)
+    };
+
+    let results = PyList::empty(py);
+    let iterator = iterate(py, iterable)?;
+    let mut packed = Vec::new();
+
+    loop {
+        packed.clear();
+        let mut count = 0;
+
+        while count < chunk_size {
+            let element = match next(py, &iterator)? {
+                Some(element) => element,
+                None => break
+            };
+            let element = element.as_ref(py);
+
+            if inst.noreply {
+                packed.extend_from_slice(pool::REPLY_SKIP);
+            }
+
+            if pairs {
+                let (key, value): (&PyAny, &PyAny) = element.extract()?;
+                resp::pack(&mut packed, cmd, &(key, value))?;
+            } else {
+                resp::pack(&mut packed, cmd, &(element, argument))?;
+            }
+
+            count += 1;
+        }
+
+        if count == 0 {
+            break;
+        }
+
+        let batch = &packed;
+
+        if inst.noreply {
+            if let Err(v) = py.allow_threads(|| pool.send_only(batch, timeouts)) {
+                return redis_error(v);
+            }
+
+            continue;
+        }
+
+        for reply in py.allow_threads(|| pool.send_batch(batch, count, timeouts)) {
+            match reply {
+                Ok(Value::Int(n)) => results.append(n == 1)?,
+                Ok(_) => results.append(false)?,
+                Err(v) => return redis_error(v)
+            }
+        }
+    }
+
+    if inst.noreply {
+        Ok(py.None())
+    } else {
+        Ok(results.into_py(py))
+    }
+}
+
+/// An iterator over `iterable`, whose elements are read with `next`.
+#[inline]
+fn iterate(py: Python, iterable: &PyAny) -> PyResult<PyObject> {
+    unsafe { PyObject::from_owned_ptr_or_err(py, ffi::PyObject_GetIter(iterable.as_ptr())) }
+}
+
+/// The next element of an iterator made by `iterate`. None once it is exhausted.
+///
+/// Elements are owned here rather than by the GIL's pool, so each one is freed once it is packed,
+/// and memory stays bounded by the chunk size however long the iterable is.
+#[inline]
+fn next(py: Python, iterator: &PyObject) -> PyResult<Option<PyObject>> {
+    match unsafe { PyObject::from_owned_ptr_or_opt(py, ffi::PyIter_Next(iterator.as_ptr())) } {
+        None if PyErr::occurred(py) => Err(PyErr::fetch(py)),
+        element => Ok(element)
+    }
+}
@@ -9,7 +9,7 @@ try:
 except ImportError: 
     from suredis import * 
 
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, Iterator, List, Set, Tuple, Union
 
 # Workaround implementation for lack of OOP. 
 # Subclasses with Pyo3 prove to be a headache. They're nothing like subclasses inside of Python. 
@@ -162,10 +162,17 @@ class StringKey(GenericKey):
 
         return self.client.get(self._name)
 
-    def sset(self, value, no_overwrite=True) -> str: 
-        """Set the value of this key."""
+    def sset(self, value, no_overwrite=None, **options) -> str: 
+        """Set the value of this key. `options` are passed on, see `RedisClient.sset`.
+        Without any option, the key is only set if it does not exist yet, unless `no_overwrite=False`."""
 
-        return self.client.sset(self._name, value, no_overwrite=no_overwrite)
+        if no_overwrite is None and not options:
+            no_overwrite = True
+
+        if no_overwrite is not None:
+            options["no_overwrite"] = no_overwrite
+
+        return self.client.sset(self._name, value, **options)
 
     def getset(self, value: str) -> str: 
         """Set the value of this key and return the old value. Atomic."""
@@ -236,8 +243,8 @@ class HashKey(GenericKey):
 
         return self.client.hget(self._name, field)
 
-    def hgetall(self) -> List[str]: 
-        """Get a list of fields and their values."""
+    def hgetall(self) -> Dict[str, str]: 
+        """Get a dictionary of fields and their values."""
 
         return self.client.hgetall(self._name)
 
@@ -251,20 +258,20 @@ class HashKey(GenericKey):
 
         return self.client.hincrbyfloat(self._name, field, float(value))
 
-    def hkeys(self) -> List[str]:
-        """The fields in this hash."""
+    def hkeys(self, lazy: bool = False) -> List[str]:
+        """The fields in this hash. Pass `lazy=True` to convert them only when they are accessed."""
 
-        return self.client.hkeys(self._name)
+        return self.client.hkeys(self._name, lazy=lazy)
 
     def hlen(self) -> int: 
         """The amount of fields in this hash."""
 
         return self.client.hlen(self._name)
 
-    def hmget(self, *fields: List[str]) -> List[str]: 
-        """The values in the fields at this key."""
+    def hmget(self, *fields: List[str], dtype=None) -> List[str]: 
+        """The values in the fields at this key. Pass a NumPy `dtype` to get an array of numbers."""
 
-        return self.client.hmget(self._name, *fields)
+        return self.client.hmget(self._name, *fields, dtype=dtype)
 
     def hset(self, **fields: Dict[str, Any]) -> int: 
         """Set some fields and values on this hash."""
@@ -276,10 +283,20 @@ class HashKey(GenericKey):
 
         return self.client.hstrlen(self._name, field)
 
-    def hvals(self) -> List[str]: 
-        """A list of all the values at this hash."""
+    def hvals(self, dtype=None) -> List[str]: 
+        """A list of all the values at this hash. Pass a NumPy `dtype` to get an array of numbers."""
+
+        return self.client.hvals(self._name, dtype=dtype)
+
+    def hscan_iter(self, **options: Dict[str, Any]) -> Iterator[Tuple[str, str]]: 
+        """Iterate over the fields and values of this hash, a page at a time. See `RedisClient.hscan_iter`."""
+
+        return self.client.hscan_iter(self._name, **options)
 
-        return self.client.hvals(self._name)
+    def items(self) -> Iterator[Tuple[str, str]]: 
+        """Iterate over the fields and values of this hash without fetching it whole. Each field is returned once."""
+
+        return self.hscan_iter(deduplicate=True)
 
     def __len__(self) -> int: 
         return self.hlen()
@@ -325,10 +342,10 @@ class ListKey(GenericKey):
 
         return self.client.lset(self._name, int(index), element)
 
-    def lrange(self, start: int, stop: int) -> List[str]: 
-        """Get a range of elements from this list."""
+    def lrange(self, start: int, stop: int, dtype=None, lazy: bool = False) -> List[str]: 
+        """Get a range of elements from this list. Pass a NumPy `dtype` to get an array of numbers."""
 
-        return self.client.lrange(self._name, int(start), int(stop))
+        return self.client.lrange(self._name, int(start), int(stop), dtype=dtype, lazy=lazy)
 
     def lrem(self, amt: int, *elements: List[Any]) -> int: 
         """Remove elements from the left side of a list. Best suited for duplicate element removal, it seems."""
@@ -350,16 +367,21 @@ class ListKey(GenericKey):
 
         return self.client.rpoplpush(self._name, destination)
 
-    def lelements(self) -> List[str]: 
-        """Get the elements of this list."""
+    def lelements(self, dtype=None, lazy: bool = False) -> List[str]: 
+        """Get the elements of this list. Pass a NumPy `dtype` to get an array of numbers."""
+
+        return self.client.lelements(self._name, dtype=dtype, lazy=lazy)
+
+    def iter_list(self, chunk_size: int = 1000) -> Iterator[str]: 
+        """Iterate over the elements of this list, a window at a time. See `RedisClient.iter_list`."""
 
-        return self.client.lelements(self._name)
+        return self.client.iter_list(self._name, int(chunk_size))
 
     def __len__(self) -> int: 
         return self.llen()
 
-    def __iter__(self) -> List[str]: 
-        return iter(self.lelements())
+    def __iter__(self) -> Iterator[str]: 
+        return self.iter_list()
 
 class SetKey(GenericKey):
     __doc__ = GenericKey.__doc__
@@ -377,7 +399,7 @@ class SetKey(GenericKey):
 
         return self.client.scard(self._name)
 
-    def sdiff(self, *sets: List[str]) -> List[str]:
+    def sdiff(self, *sets: List[str]) -> Set[str]:
         """Calculate the difference between this set and `sets`."""
 
         return self.client.sdiff(self._name, *sets)
@@ -387,7 +409,7 @@ class SetKey(GenericKey):
 
         return self.client.sdiffstore(self._name, destination, *sets)
 
-    def sinter(self, *sets: List[str]) -> List[str]: 
+    def sinter(self, *sets: List[str]) -> Set[str]: 
         """Intersect this set with others."""
 
         return self.client.sinter(self._name, *sets)
@@ -402,18 +424,23 @@ class SetKey(GenericKey):
 
         return self.client.sismember(self._name, member)
 
-    def smembers(self) -> List[str]:
-        """Get the members of this set."""
+    def smembers(self, lazy: bool = False) -> Set[str]:
+        """Get the members of this set. Pass `lazy=True` to convert them only when they are accessed."""
 
-        return self.client.smembers(self._name)
+        return self.client.smembers(self._name, lazy=lazy)
 
     def smove(self, destination: str, member: Any) -> int: 
         """Move a member from this set to `destination` set."""
 
         return self.client.smove(self._name, destination, member)
 
+    def sscan_iter(self, **options: Dict[str, Any]) -> Iterator[str]: 
+        """Iterate over the members of this set, a page at a time. See `RedisClient.sscan_iter`."""
+
+        return self.client.sscan_iter(self._name, **options)
+
     def __len__(self) -> int: 
         return self.scard()
 
-    def __iter__(self) -> List[str]: 
-        return iter(self.smembers())
+    def __iter__(self) -> Iterator[str]: 
+        return self.sscan_iter(deduplicate=True)